@@ -0,0 +1,125 @@
+"""
+Cost of the hot lookups at 100k rows, before and after build_indexes adds the declared indexes.
+
+The tables are created without indexes the way older deployments have them, in a throwaway SQLite file.
+
+Usage: python benchmarks/bench_indexes.py [rows]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from peewee import SqliteDatabase
+
+from core import database, migrations
+
+MODELS = {
+    "ClassSchedule": database.ClassSchedule,
+    "EmailVerification": database.EmailVerification,
+    "FinalizedEmailVerification": database.FinalizedEmailVerification,
+    "AIContext": database.AIContext,
+    "TicketInfo": database.TicketInfo,
+    "CommandAnalytics": database.CommandAnalytics,
+}
+
+
+def populate(rows):
+    rng = random.Random(0)
+    users = [rng.randrange(10 ** 17, 10 ** 18) for _ in range(rows // 5)]
+    start = datetime.now() - timedelta(days=90)
+    tables = {
+        "ClassSchedule": [
+            {"discord_id": users[i % len(users)], "crn": 10000 + rng.randrange(5000)} for i in range(rows)
+        ],
+        "EmailVerification": [
+            {"discord_id": users[i % len(users)], "email": f"user{i}@rpi.edu", "verification_code": "000000",
+             "class_year": "2027"} for i in range(rows)
+        ],
+        "FinalizedEmailVerification": [
+            {"discord_id": users[i % len(users)], "email": f"user{i}@rpi.edu", "class_year": "2027"}
+            for i in range(rows)
+        ],
+        "AIContext": [
+            {"discord_id": users[i % len(users)], "context": "context", "global_context": i == 0} for i in range(rows)
+        ],
+        "TicketInfo": [{"channel_id": 10 ** 18 + i, "author_id": users[i % len(users)]} for i in range(rows)],
+        "CommandAnalytics": [
+            {"command": "ping", "user": users[i % len(users)], "date": start + timedelta(seconds=i * 77),
+             "command_type": "slash", "guild_id": 1} for i in range(rows)
+        ],
+    }
+    with database.db.atomic():
+        for name, data in tables.items():
+            for offset in range(0, rows, 1000):
+                MODELS[name].insert_many(data[offset:offset + 1000]).execute()
+    return users
+
+
+def lookups(users, rows):
+    user = users[len(users) // 2]
+    recent = datetime.now() - timedelta(days=1)
+    return {
+        "ClassSchedule by discord_id": lambda: list(
+            database.ClassSchedule.select().where(database.ClassSchedule.discord_id == user)),
+        "ClassSchedule by crn": lambda: list(
+            database.ClassSchedule.select().where(database.ClassSchedule.crn == 12345)),
+        "EmailVerification by discord_id": lambda: list(
+            database.EmailVerification.select().where(database.EmailVerification.discord_id == user)),
+        "FinalizedEmailVerification by email": lambda: database.FinalizedEmailVerification.select().where(
+            database.FinalizedEmailVerification.email == f"user{rows // 2}@rpi.edu").exists(),
+        "AIContext global": lambda: database.AIContext.select().where(
+            database.AIContext.global_context == True).first(),
+        "AIContext by discord_id": lambda: database.AIContext.select().where(
+            database.AIContext.discord_id == user).first(),
+        "TicketInfo by channel_id": lambda: database.TicketInfo.select().where(
+            database.TicketInfo.channel_id == 10 ** 18 + rows // 2).first(),
+        "CommandAnalytics past day": lambda: database.CommandAnalytics.select().where(
+            database.CommandAnalytics.date >= recent).count(),
+    }
+
+
+def time_lookups(queries, repeat=50):
+    results = {}
+    for name, query in queries.items():
+        start = time.perf_counter()
+        for _ in range(repeat):
+            query()
+        results[name] = (time.perf_counter() - start) / repeat
+    return results
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    with tempfile.TemporaryDirectory() as directory:
+        bench_db = SqliteDatabase(os.path.join(directory, "bench.db"))
+        database.db = bench_db
+        with bench_db.bind_ctx(list(MODELS.values())):
+            for model in MODELS.values():
+                # The unindexed layout older deployments have: only the columns.
+                bench_db.create_tables([model], safe=False)
+                for index in bench_db.get_indexes(model._meta.table_name):
+                    bench_db.execute_sql(f'DROP INDEX "{index.name}"')
+
+            users = populate(rows)
+            queries = lookups(users, rows)
+            before = time_lookups(queries)
+
+            start = time.perf_counter()
+            migrations.build_indexes(MODELS)
+            build = time.perf_counter() - start
+            after = time_lookups(queries)
+
+    print(f"{rows} rows per table, indexes built in {build:.2f}s\n")
+    print(f"{'lookup':<38}{'before':>10}{'after':>10}")
+    for name in queries:
+        print(f"{name:<38}{before[name] * 1000:>8.3f}ms{after[name] * 1000:>8.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
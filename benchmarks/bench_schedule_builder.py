@@ -0,0 +1,73 @@
+"""
+/schedule build over the courses with the most sections, bitmask backtracking vs trying every combination.
+
+Usage: python benchmarks/bench_schedule_builder.py
+"""
+
+import itertools
+import time
+from types import SimpleNamespace
+
+from semester import load_courses, section_count
+
+from core.rpi.course_data import CourseIndex
+from core.rpi.schedule_builder import build_for_courses, section_groups
+from core.rpi.schedule_conflicts import ConflictMatrix
+
+# The brute force baseline gives up after this many seconds.
+BRUTE_FORCE_BUDGET = 10.0
+
+
+def brute_force(course_data, course_ids):
+    """Every section of every course, keeping combinations whose masks are pairwise disjoint."""
+    deadline = time.monotonic() + BRUTE_FORCE_BUDGET
+    sections = [
+        [(group.mask, crn) for group in section_groups(course_data, course_id) for crn in group.crns]
+        for course_id in course_ids
+    ]
+    count = 0
+    for i, combination in enumerate(itertools.product(*sections)):
+        if i % 4096 == 0 and time.monotonic() > deadline:
+            return count, True
+        used = 0
+        for mask, _ in combination:
+            if mask & used:
+                break
+            used |= mask
+        else:
+            count += 1
+    return count, False
+
+
+def main():
+    courses, source = load_courses()
+    print(f"{source}: {section_count(courses)} sections\n")
+    course_data = SimpleNamespace(index=CourseIndex(courses), conflicts=ConflictMatrix(courses))
+
+    largest = sorted(
+        (course for subject in courses for course in subject["courses"]),
+        key=lambda course: len(course["sections"]),
+        reverse=True,
+    )
+    print(f"{'courses':<8}{'sections':>10}{'schedules':>12}{'backtracking':>14}{'brute force':>14}")
+    for size in range(2, 7):
+        course_ids = [course["id"] for course in largest[:size]]
+        sections = sum(len(course["sections"]) for course in largest[:size])
+
+        start = time.perf_counter()
+        result = build_for_courses(course_data, course_ids, time_budget=BRUTE_FORCE_BUDGET)
+        fast = time.perf_counter() - start
+
+        start = time.perf_counter()
+        count, gave_up = brute_force(course_data, course_ids)
+        slow = time.perf_counter() - start
+
+        schedules = f"{result.count}{'+' if result.timed_out else ''}"
+        baseline = f">{BRUTE_FORCE_BUDGET:.0f}s" if gave_up else f"{slow * 1000:.0f}ms"
+        print(f"{size:<8}{sections:>10}{schedules:>12}{fast * 1000:>12.1f}ms{baseline:>14}")
+    print(f"\nLargest courses: {', '.join(course['id'] for course in largest[:6])}")
+    print("Schedules counts distinct meeting patterns, sections that meet at the same times are merged.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Parsing the SIS schedule page: the old BeautifulSoup find_class_type vs the streaming SISBlockParser.
+
+The page is generated from the benchmark semester in the zsYYYYMM.htm layout. The old parser needs
+beautifulsoup4, which the bot itself no longer depends on.
+
+Usage: python benchmarks/bench_sis_parser.py
+"""
+
+import gc
+import html
+import time
+import tracemalloc
+
+from semester import load_courses, section_count
+
+from core.rpi.sis_blocks import SISBlockParser
+
+CHUNK_SIZE = 64 * 1024
+
+
+def sis_page(courses):
+    rows = ['<html><body><table border=1>', '<tr><th>CRN Course-Sec</th><th>Course Title</th></tr>']
+    for subject in courses:
+        for course in subject["courses"]:
+            for section in course["sections"]:
+                for i, timeslot in enumerate(section["timeslots"] or [{}]):
+                    first = f'{section["crn"]} {course["id"]}-{section["sec"]}' if i == 0 else ""
+                    title = html.escape(course["title"]) if i == 0 else ""
+                    cells = [first, title, "LEC" if i == 0 else "LAB", "4", "GR", "",
+                             " ".join(timeslot.get("days", [])), str(timeslot.get("timeStart", "")),
+                             str(timeslot.get("timeEnd", "")), html.escape(timeslot.get("location", "")),
+                             html.escape(timeslot.get("instructor", ""))]
+                    rows.append('<tr align=LEFT>' + "".join(f"<td>{cell}</td>" for cell in cells) + '</tr>')
+    rows.append('</table></body></html>')
+    return "\n".join(rows)
+
+
+def soup_find_class_type(html_content, crn):
+    """find_class_type as it was, minus the download."""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html_content, 'html.parser')
+    rows = soup.find_all('tr', {'align': 'LEFT'})
+    all_rows = []
+    for row in rows:
+        columns = [col.text.strip() for col in row.find_all('td')]
+        all_rows.append(columns)
+
+    section_blocks = []
+    capturing = False
+    for columns in all_rows:
+        if len(columns) == 0:
+            continue
+        first_column_text = columns[0]
+        if first_column_text.startswith(crn):
+            capturing = True
+            section_blocks.append(columns)
+            continue
+        if capturing and first_column_text == "":
+            section_blocks.append(columns)
+        elif capturing and first_column_text != "":
+            break
+    return section_blocks
+
+
+def streaming_blocks(body):
+    parser = SISBlockParser()
+    for i in range(0, len(body), CHUNK_SIZE):
+        parser.feed(body[i:i + CHUNK_SIZE])
+    parser.close()
+    return parser.blocks
+
+
+def measure(function, *args):
+    # Timed without tracemalloc, which slows allocation heavy code down several times over.
+    gc.collect()
+    start = time.perf_counter()
+    result = function(*args)
+    elapsed = time.perf_counter() - start
+    del result
+    gc.collect()
+    tracemalloc.start()
+    result = function(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, peak, elapsed
+
+
+def main():
+    courses, source = load_courses()
+    body = sis_page(courses)
+    print(f"{source}: {section_count(courses)} sections, {len(body) / 1e6:.1f} MB of HTML\n")
+    last_crn = str(courses[-1]["courses"][-1]["sections"][-1]["crn"])
+
+    print(f"{'parser':<36}{'peak':>12}{'time':>10}")
+    blocks, peak, elapsed = measure(streaming_blocks, body)
+    print(f"{'SISBlockParser, whole page':<36}{peak / 1e6:>10.2f}MB{elapsed * 1000:>8.0f}ms")
+
+    try:
+        import bs4  # noqa: F401
+    except ImportError:
+        print("\nInstall beautifulsoup4 to compare with the old find_class_type.")
+        return
+    rows, peak, elapsed = measure(soup_find_class_type, body, last_crn)
+    print(f"{'BeautifulSoup, one CRN':<36}{peak / 1e6:>10.2f}MB{elapsed * 1000:>8.0f}ms")
+    assert rows == blocks[last_crn]
+
+
+if __name__ == "__main__":
+    main()
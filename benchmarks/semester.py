@@ -0,0 +1,98 @@
+"""
+Semester data for the benchmarks.
+
+Uses the QuACS snapshot saved by the bot (cache/quacs) when there is one, then tries GitHub,
+and falls back to a generated semester of the same size and shape so the benchmarks still run offline.
+"""
+
+import json
+import os
+import random
+import sys
+import urllib.request
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.rpi.course_data import ACTIVE_TERM, CourseData
+from core.rpi.quacs_cache import DEFAULT_CACHE_DIR, SnapshotStore
+
+SUBJECTS = [
+    "ARCH", "ARTS", "ASTR", "BCBP", "BIOL", "BMED", "CHEM", "CHME", "CIVL", "COGS", "COMM", "CSCI", "ECON", "ECSE",
+    "ENGR", "ENVE", "ERTH", "GSAS", "IENV", "IHSS", "ISYE", "ITWS", "LANG", "LITR", "MANE", "MATH", "MGMT", "MTLE",
+    "PHIL", "PHYS", "PSYC", "STSO", "WRIT",
+]
+INSTRUCTORS = [f"Instructor {i}" for i in range(600)] + ["TBA"] * 50
+LOCATIONS = [f"{building} {room}" for building in ("DCC", "Sage", "Lally", "JEC", "Amos Eaton", "Walker", "Carnegie")
+             for room in range(300, 340)]
+PATTERNS = [["M", "R"], ["T", "F"], ["M", "W", "R"], ["W"], ["T"], ["F"], ["M", "W", "F"], []]
+STARTS = [800, 900, 1000, 1100, 1200, 1400, 1600, 1800]
+
+
+def _generated_timeslot(rng):
+    days = rng.choice(PATTERNS)
+    start = rng.choice(STARTS) if days else -1
+    return {
+        "dateEnd": "12/11",
+        "dateStart": "8/29",
+        "days": list(days),
+        "instructor": rng.choice(INSTRUCTORS),
+        "location": rng.choice(LOCATIONS),
+        "timeEnd": start + 150 if days else -1,
+        "timeStart": start,
+    }
+
+
+def generate_semester(seed=2024, courses_per_subject=45):
+    """Generate a courses.json shaped semester with roughly as many sections as a real fall term."""
+    rng = random.Random(seed)
+    crn = 60000
+    semester = []
+    for subj in SUBJECTS:
+        courses = []
+        for crse in sorted(rng.sample(range(1000, 6999), courses_per_subject)):
+            title = f"{subj} TOPICS {crse}"
+            # Most courses have a handful of sections, the big intro courses have dozens.
+            section_count = rng.choice([1, 1, 1, 2, 2, 3, 4, 6]) if rng.random() > 0.03 else rng.randint(20, 40)
+            sections = []
+            for sec in range(1, section_count + 1):
+                crn += 1
+                cap = rng.choice([20, 30, 40, 100, 200])
+                sections.append({
+                    "act": 0,
+                    "attribute": rng.choice(["", "Communication Intensive", "Data Intensive II"]),
+                    "cap": cap,
+                    "credMax": 4,
+                    "credMin": 4,
+                    "crn": crn,
+                    "crse": crse,
+                    "rem": rng.randint(0, cap),
+                    "sec": str(sec).zfill(2),
+                    "subj": subj,
+                    "timeslots": [_generated_timeslot(rng) for _ in range(rng.choice([1, 1, 2, 3]))],
+                    "title": title,
+                    "xl_rem": 0,
+                })
+            courses.append({"crse": crse, "id": f"{subj}-{crse}", "sections": sections, "subj": subj, "title": title})
+        semester.append({"code": subj, "name": subj, "courses": courses})
+    return semester
+
+
+def load_courses():
+    """
+    :return: A (courses.json data, description of where it came from) tuple
+    """
+    snapshot = SnapshotStore(os.path.join(DEFAULT_CACHE_DIR, ACTIVE_TERM)).read("courses")
+    if snapshot is not None:
+        return snapshot, "QuACS snapshot"
+
+    try:
+        with urllib.request.urlopen(CourseData.urls_for(ACTIVE_TERM)["courses"], timeout=10) as response:
+            return json.load(response), "QuACS (GitHub)"
+    except Exception:
+        pass
+
+    return generate_semester(), "generated semester"
+
+
+def section_count(courses):
+    return sum(len(course["sections"]) for subject in courses for course in subject["courses"])
@@ -0,0 +1,73 @@
+"""
+Runs peewee queries off the event loop.
+
+peewee is blocking, and against a remote MySQL server a slow query stalls every gateway event while it runs.
+Queries are built on the loop as usual (that's cheap) and executed on a small dedicated thread pool, with a
+timeout per query so a hung connection can't hold a command forever.
+
+    rows = await async_db.fetch(database.ClassSchedule.select().where(...))
+    watched = await async_db.run(some_blocking_function, user_id)
+"""
+
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from core import database
+from core.logging_module import get_log
+
+_log = get_log(__name__)
+
+DB_THREADS = int(os.getenv("DB_THREADS", "4"))
+QUERY_TIMEOUT = float(os.getenv("DB_QUERY_TIMEOUT", "10"))
+
+# Bounded, so at most DB_THREADS pooled connections are ever checked out by async queries.
+_executor = ThreadPoolExecutor(max_workers=DB_THREADS, thread_name_prefix="database")
+
+
+class DatabaseTimeout(Exception):
+    """A query took longer than its timeout. It may still complete in the background."""
+
+
+def _call(func, args, kwargs):
+    # Checked out of the connection pool for this call only, so stale or dropped connections get replaced.
+    with database.connection():
+        return func(*args, **kwargs)
+
+
+async def run(func, *args, timeout=QUERY_TIMEOUT, **kwargs):
+    """
+    Call a blocking database function on the database thread pool.
+    :param func: The function to call
+    :param timeout: Seconds to wait for it, None waits forever
+
+    :return: Whatever func returns
+    :raises DatabaseTimeout: If func didn't finish in time
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(_executor, functools.partial(_call, func, args, kwargs))
+    try:
+        return await asyncio.wait_for(future, timeout)
+    except asyncio.TimeoutError:
+        _log.warning(f"Database call {getattr(func, '__qualname__', func)} timed out after {timeout}s")
+        raise DatabaseTimeout(f"Database call timed out after {timeout}s") from None
+
+
+async def fetch(query, timeout=QUERY_TIMEOUT):
+    """:return: Every row of a select query as a list"""
+    return await run(list, query, timeout=timeout)
+
+
+async def first(query, timeout=QUERY_TIMEOUT):
+    """:return: The first row of a select query, or None"""
+    return await run(query.first, timeout=timeout)
+
+
+async def exists(query, timeout=QUERY_TIMEOUT):
+    return await run(query.exists, timeout=timeout)
+
+
+async def execute(query, timeout=QUERY_TIMEOUT):
+    """:return: The result of query.execute(), e.g. the number of rows an update or delete touched"""
+    return await run(query.execute, timeout=timeout)
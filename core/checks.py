@@ -10,124 +10,63 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 
-from core import database
+from core import async_db, database
 
 
-def predicate_LV1(ctx) -> bool:
-    adminIDs = []
+def is_admin(user_id: int, tier_level: int) -> bool:
+    """Whether a user is an Administrator of at least the given TierLevel."""
+    return database.Administrators.select().where(
+        database.Administrators.TierLevel >= tier_level,
+        database.Administrators.discordID == user_id
+    ).exists()
 
-    query = database.Administrators.select().where(
-        database.Administrators.TierLevel >= 1
-    )
-    for admin in query:
-        adminIDs.append(admin.discordID)
 
-    return ctx.author.id in adminIDs
+async def predicate_LV1(ctx) -> bool:
+    return await async_db.run(is_admin, ctx.author.id, 1)
 
 
 is_botAdmin = commands.check(predicate_LV1)
 
 
-def predicate_LV2(ctx) -> bool:
-    adminIDs = []
-
-    query = database.Administrators.select().where(
-        database.Administrators.TierLevel >= 2
-    )
-    for admin in query:
-        adminIDs.append(admin.discordID)
-
-    return ctx.author.id in adminIDs
+async def predicate_LV2(ctx) -> bool:
+    return await async_db.run(is_admin, ctx.author.id, 2)
 
 
 is_botAdmin2 = commands.check(predicate_LV2)
 
 
-def predicate_LV3(ctx):
-    adminIDs = []
-
-    query = database.Administrators.select().where(
-        database.Administrators.TierLevel >= 3
-    )
-    for admin in query:
-        adminIDs.append(admin.discordID)
-
-    return ctx.author.id in adminIDs
+async def predicate_LV3(ctx) -> bool:
+    return await async_db.run(is_admin, ctx.author.id, 3)
 
 
 is_botAdmin3 = commands.check(predicate_LV3)
 
 
-def predicate_LV4(ctx):
-    adminIDs = []
-
-    query = database.Administrators.select().where(
-        database.Administrators.TierLevel >= 4
-    )
-    for admin in query:
-        adminIDs.append(admin.discordID)
-
-    return ctx.author.id in adminIDs
+async def predicate_LV4(ctx) -> bool:
+    return await async_db.run(is_admin, ctx.author.id, 4)
 
 
 is_botAdmin4 = commands.check(predicate_LV4)
 
 
-def slash_is_bot_admin():
-    def predicate(interaction: discord.Interaction) -> bool:
-        admin_ids = []
-
-        query = database.Administrators.select().where(
-            database.Administrators.TierLevel >= 1
-        )
-        for admin in query:
-            admin_ids.append(admin.discordID)
-
-        return interaction.user.id in admin_ids
+def _slash_admin_check(tier_level: int):
+    async def predicate(interaction: discord.Interaction) -> bool:
+        return await async_db.run(is_admin, interaction.user.id, tier_level)
 
     return app_commands.check(predicate)
 
 
-def slash_is_bot_admin_2():
-    def predicate(interaction: discord.Interaction) -> bool:
-        admin_ids = []
-
-        query = database.Administrators.select().where(
-            database.Administrators.TierLevel >= 2
-        )
-        for admin in query:
-            admin_ids.append(admin.discordID)
+def slash_is_bot_admin():
+    return _slash_admin_check(1)
 
-        return interaction.user.id in admin_ids
 
-    return app_commands.check(predicate)
+def slash_is_bot_admin_2():
+    return _slash_admin_check(2)
 
 
 def slash_is_bot_admin_3():
-    def predicate(interaction: discord.Interaction) -> bool:
-        admin_ids = []
-
-        query = database.Administrators.select().where(
-            database.Administrators.TierLevel >= 3
-        )
-        for admin in query:
-            admin_ids.append(admin.discordID)
-
-        return interaction.user.id in admin_ids
-
-    return app_commands.check(predicate)
+    return _slash_admin_check(3)
 
 
 def slash_is_bot_admin_4():
-    def predicate(interaction: discord.Interaction) -> bool:
-        admin_ids = []
-
-        query = database.Administrators.select().where(
-            database.Administrators.TierLevel >= 4
-        )
-        for admin in query:
-            admin_ids.append(admin.discordID)
-
-        return interaction.user.id in admin_ids
-
-    return app_commands.check(predicate)
+    return _slash_admin_check(4)
@@ -0,0 +1,247 @@
+"""
+Write-behind buffer for CommandAnalytics.
+
+Recording a command used to be a database write inside the invoke path. Events are now appended to an
+in-memory buffer and written with one insert_many when the buffer fills up or every few seconds,
+whichever comes first, and once more on shutdown.
+
+    bot.analytics.record("ping", ctx.author.id, ctx.guild.id, "regular")
+
+Raw events are also rolled up into per hour and per day counts (CommandUsageHourly / CommandUsageDaily).
+`rollup` counts every raw row past the AnalyticsRollupState watermark, and `compact` deletes raw rows that
+are both counted and older than the retention window, so reports never have to scan CommandAnalytics.
+"""
+
+import asyncio
+import os
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+
+from peewee import fn
+
+from core import async_db, database
+from core.logging_module import get_log
+
+_log = get_log(__name__)
+
+ANALYTICS_BATCH_SIZE = int(os.getenv("ANALYTICS_BATCH_SIZE", "100"))
+ANALYTICS_FLUSH_INTERVAL = float(os.getenv("ANALYTICS_FLUSH_INTERVAL", "30"))
+# Raw CommandAnalytics rows older than this are deleted once they're counted, hourly rollups are kept longer.
+ANALYTICS_RETENTION_DAYS = int(os.getenv("ANALYTICS_RETENTION_DAYS", "30"))
+ANALYTICS_HOURLY_RETENTION_DAYS = int(os.getenv("ANALYTICS_HOURLY_RETENTION_DAYS", "90"))
+
+# /usage report and the maintenance loop can roll up at the same time on different database threads.
+_rollup_lock = threading.RLock()
+
+
+class CommandAnalyticsBuffer:
+    def __init__(self, batch_size=ANALYTICS_BATCH_SIZE, flush_interval=ANALYTICS_FLUSH_INTERVAL):
+        """
+        :param batch_size: Flush as soon as this many events are buffered
+        :param flush_interval: Seconds between timed flushes
+        """
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        # Events that failed to write are kept for the next flush, up to this many.
+        self.max_buffered = batch_size * 10
+        self._events = []
+        self._lock = asyncio.Lock()
+        self._task = None
+        self._size_flush = None
+
+    def __len__(self):
+        return len(self._events)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        """Stop the timed flushes and write out whatever is still buffered."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+
+    def record(self, command: str, user: int, guild_id: int, command_type: str):
+        """
+        Buffer one command use. Never touches the database itself.
+        :param command: The command's name
+        :param user: The ID of the user who ran it
+        :param guild_id: The guild it ran in, 0 in DMs
+        :param command_type: "regular" for prefix commands, "slash" or "context_menu" for app commands
+        """
+        self._events.append(
+            {
+                "command": command,
+                "user": user,
+                "date": datetime.now(),
+                "command_type": command_type,
+                "guild_id": guild_id or 0,
+            }
+        )
+        if len(self._events) >= self.batch_size and (self._size_flush is None or self._size_flush.done()):
+            self._size_flush = asyncio.create_task(self.flush())
+
+    async def flush(self):
+        """:return: How many events were written"""
+        async with self._lock:
+            events, self._events = self._events, []
+            if not events:
+                return 0
+            try:
+                # No timeout: a timed out insert could still commit in the background, re-queueing its events
+                # would then write them twice and let the next flush overlap it. Failed inserts roll back.
+                await async_db.run(self._insert, events, timeout=None)
+            except Exception as e:
+                # Keep the newest events for the next attempt rather than losing a whole batch.
+                kept = (events + self._events)[-self.max_buffered:]
+                _log.warning(
+                    f"Unable to write {len(events)} analytics events, keeping {len(kept)} for the next flush: {e}"
+                )
+                self._events = kept
+                return 0
+            return len(events)
+
+    @staticmethod
+    def _insert(events):
+        with database.db.atomic():
+            for start in range(0, len(events), 500):
+                database.CommandAnalytics.insert_many(events[start:start + 500]).execute()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+
+def _hour(date: datetime) -> datetime:
+    return date.replace(minute=0, second=0, microsecond=0)
+
+
+def _day(date: datetime) -> datetime:
+    return date.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _add_counts(model, counts: Counter):
+    """Add counts keyed by (bucket, guild_id, command, command_type) to a rollup table."""
+    for (bucket, guild_id, command, command_type), uses in counts.items():
+        updated = (
+            model.update(uses=model.uses + uses)
+            .where(
+                model.bucket == bucket,
+                model.guild_id == guild_id,
+                model.command == command,
+                model.command_type == command_type,
+            )
+            .execute()
+        )
+        if not updated:
+            model.create(bucket=bucket, guild_id=guild_id, command=command, command_type=command_type, uses=uses)
+
+
+def _rollup_state():
+    """The AnalyticsRollupState row, locked (SELECT ... FOR UPDATE) until the transaction ends where supported."""
+    state_model = database.AnalyticsRollupState
+    query = state_model.select().where(state_model.id == 1)
+    if database.db.for_update:
+        query = query.for_update()
+    state = query.first()
+    if state is None:
+        state = state_model.create(id=1)
+    return state
+
+
+def rollup(batch_size=5000) -> int:
+    """
+    Count raw CommandAnalytics rows that haven't been rolled up yet. Blocking, run it through async_db.
+    Rows are written in id order by the buffer, so everything up to the watermark has been counted.
+    :param batch_size: How many raw rows to count per transaction
+    :return: How many raw rows were counted
+    """
+    raw = database.CommandAnalytics
+    total = 0
+    while True:
+        with _rollup_lock, database.db.atomic():
+            state = _rollup_state()
+            rows = list(
+                raw.select(raw.id, raw.date, raw.guild_id, raw.command, raw.command_type)
+                .where(raw.id > state.last_id)
+                .order_by(raw.id)
+                .limit(batch_size)
+                .tuples()
+            )
+            if not rows:
+                return total
+
+            hourly, daily = Counter(), Counter()
+            for _, date, guild_id, command, command_type in rows:
+                key = (guild_id or 0, command, command_type)
+                hourly[(_hour(date), *key)] += 1
+                daily[(_day(date), *key)] += 1
+            _add_counts(database.CommandUsageHourly, hourly)
+            _add_counts(database.CommandUsageDaily, daily)
+
+            state.last_id = rows[-1][0]
+            state.save()
+        total += len(rows)
+        if len(rows) < batch_size:
+            return total
+
+
+def compact(retention_days=ANALYTICS_RETENTION_DAYS, hourly_retention_days=ANALYTICS_HOURLY_RETENTION_DAYS) -> int:
+    """
+    Roll up, then delete raw rows older than retention_days and hourly rollups older than
+    hourly_retention_days. Daily rollups are kept forever. Blocking, run it through async_db.
+    :return: How many raw rows were deleted
+    """
+    rollup()
+    now = datetime.now()
+    with _rollup_lock, database.db.atomic():
+        state = _rollup_state()
+        deleted = (
+            database.CommandAnalytics.delete()
+            .where(
+                database.CommandAnalytics.id <= state.last_id,
+                database.CommandAnalytics.date < now - timedelta(days=retention_days),
+            )
+            .execute()
+        )
+        database.CommandUsageHourly.delete().where(
+            database.CommandUsageHourly.bucket < _hour(now - timedelta(days=hourly_retention_days))
+        ).execute()
+    return deleted
+
+
+def usage_report(since: datetime, guild_id: int = None, command: str = None, limit=10):
+    """
+    Command usage since a point in time, read from the rollups only. Blocking, run it through async_db.
+    Windows that fit in the hourly retention are read from hourly buckets, longer ones from daily buckets.
+    :param since: Start of the window
+    :param guild_id: Only count this guild
+    :param command: Only count this command
+    :param limit: How many commands to return
+    :return: (total uses, [(command, uses), ...] most used first)
+    """
+    hourly_cutoff = datetime.now() - timedelta(days=ANALYTICS_HOURLY_RETENTION_DAYS)
+    if since >= hourly_cutoff:
+        model, start = database.CommandUsageHourly, _hour(since)
+    else:
+        model, start = database.CommandUsageDaily, _day(since)
+
+    conditions = [model.bucket >= start]
+    if guild_id is not None:
+        conditions.append(model.guild_id == guild_id)
+    if command is not None:
+        conditions.append(model.command == command)
+
+    uses = fn.SUM(model.uses)
+    rows = list(
+        model.select(model.command, uses.alias("uses"))
+        .where(*conditions)
+        .group_by(model.command)
+        .order_by(uses.desc(), model.command)
+        .tuples()
+    )
+    return sum(int(count) for _, count in rows), [(name, int(count)) for name, count in rows[:limit]]
@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import datetime
 import os
 import re
 import sys
@@ -18,7 +17,6 @@ import discord
 from discord import ButtonStyle, SelectOption, ui
 from dotenv import load_dotenv
 from github import Github
-from openai import OpenAI
 
 from core.logging_module import get_log
 
@@ -362,24 +360,6 @@ class Emoji:
     turtle_smirk = "<:TurtleSmirk:879119619737124914>"
 
 
-def get_chat_response(message):
-    response = OpenAI.ChatCompletion.create(
-        model="gpt-3.5-turbo",
-        messages=[
-            {"role": "system", "content": f"You are charlotte, you currently attend Rensselaer Polytechnic Institute "
-                                          f"as a architecture major. you're also oiled up. Answer as"
-                                          f"concisely as possible. Current date: {datetime.datetime.now()}"},
-            {"role": "user", "content": message}
-        ],
-        temperature=0,
-        max_tokens=258,
-        top_p=1.0,
-        frequency_penalty=0.0,
-        presence_penalty=0.0,
-    )
-    return response
-
-
 class TicTacToeButton(discord.ui.Button["TicTacToe"]):
     def __init__(self, x: int, y: int, xUser: discord.User, yUser: discord.User):
         super().__init__(style=discord.ButtonStyle.secondary, label="\u200b", row=y)
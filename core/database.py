@@ -1,3 +1,4 @@
+import contextlib
 import os
 from datetime import datetime
 
@@ -7,56 +8,84 @@ from peewee import (
     AutoField,
     BigIntegerField,
     BooleanField,
+    CharField,
     DateTimeField,
     IntegerField,
     Model,
-    MySQLDatabase,
-    SqliteDatabase,
     TextField,
 )
+from playhouse.pool import PooledMySQLDatabase, PooledSqliteDatabase
+from playhouse.shortcuts import ReconnectMixin
+
 from core.logging_module import get_log
 
 load_dotenv()
 _log = get_log(__name__)
 
 """
-Change to a SqliteDatabase if you don't have any MySQL Credentials.
-If you do switch, comment/remove the MySQLDatabase variable and uncomment/remove the # from the SqliteDatabase instance. 
+Uses a pooled MySQL database when DATABASE_IP is set in .env, otherwise a pooled SQLite database (data.db).
+Don't call db.connect()/db.close() around queries yourself, use `connection()` below or core.async_db.
 """
 
+# Connections are pooled: closing one returns it to the pool, and pooled MySQL connections are pinged
+# before they're handed out again. Connections idle for longer than DB_STALE_TIMEOUT seconds are recycled.
+DB_MAX_CONNECTIONS = int(os.getenv("DB_MAX_CONNECTIONS", "8"))
+DB_STALE_TIMEOUT = int(os.getenv("DB_STALE_TIMEOUT", "300"))
+# Seconds to wait for a free connection before giving up.
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "10"))
+
+
+class ReconnectPooledMySQLDatabase(ReconnectMixin, PooledMySQLDatabase):
+    """Pooled MySQL connections that reconnect and retry once if the server dropped them mid-flight."""
+
+
+def _sqlite_database():
+    # Pooled connections are handed to whichever thread asks next, so sqlite3's same-thread check must be off.
+    return PooledSqliteDatabase(
+        "data.db",
+        max_connections=DB_MAX_CONNECTIONS,
+        stale_timeout=DB_STALE_TIMEOUT,
+        timeout=DB_POOL_TIMEOUT,
+        check_same_thread=False,
+    )
+
+
 if os.getenv("DATABASE_IP") is None:
-    db = SqliteDatabase("data.db")
+    db = _sqlite_database()
     _log.info("No Database IP found in .env file, using SQLite!")
 
 elif os.getenv("DATABASE_IP") is not None:
     try:
-        db = MySQLDatabase(
+        db = ReconnectPooledMySQLDatabase(
             os.getenv("DATABASE_COLLECTION"),
             user=os.getenv("DATABASE_USERNAME"),
             password=os.getenv("DATABASE_PASSWORD"),
             host=os.getenv("DATABASE_IP"),
             port=int(os.getenv("DATABASE_PORT")),
+            max_connections=DB_MAX_CONNECTIONS,
+            stale_timeout=DB_STALE_TIMEOUT,
+            timeout=DB_POOL_TIMEOUT,
         )
         _log.info("Successfully connected to the MySQL Database")
     except Exception as e:
         _log.warning(
             f"Unable to connect to the MySQL Database:\n    > {e}\n\nSwitching to SQLite..."
         )
-        db = SqliteDatabase("data.db")
+        db = _sqlite_database()
 
 
-def iter_table(model_dict: dict):
-    """Iterates through a dictionary of tables, confirming they exist and creating them if necessary."""
-    for key in model_dict:
-        if not db.table_exists(key):
-            db.connect(reuse_if_open=True)
-            db.create_tables([model_dict[key]])
-            db.close()
-        else:
-            db.connect(reuse_if_open=True)
-            for column in model_dict[key]._meta.sorted_fields:
-                if not db.column_exists(key, column.name):
-                    db.create_column(key, column.name)
+@contextlib.contextmanager
+def connection():
+    """
+    Hold a pooled connection for the duration of a block: `with database.connection(): ...`
+    Nested blocks on the same thread share the outer block's connection, which is returned to the pool
+    when the outermost block exits. Prefer core.async_db from async code, it does this for you.
+    """
+    opened = db.connect(reuse_if_open=True)
+    try:
+        yield db
+    finally:
+        if opened:
             db.close()
 
 
@@ -186,12 +215,107 @@ class CommandAnalytics(BaseModel):
 
     id = AutoField()
     command = TextField()
-    date = DateTimeField()
+    date = DateTimeField(index=True)
     command_type = TextField()
     guild_id = BigIntegerField()
     user = BigIntegerField()
 
 
+class CommandUsageHourly(BaseModel):
+    """
+    # CommandUsageHourly
+    CommandAnalytics rolled up per hour, see core.command_analytics.
+
+    `id`: AutoField()
+    Database Entry ID
+
+    `bucket`: DateTimeField()
+    The start of the hour
+
+    `guild_id`: BigIntegerField()
+    The guild the commands were used in, 0 for DMs
+
+    `command`: TextField()
+    The command that was used
+
+    `command_type`: TextField()
+    "regular", "slash" or "context_menu"
+
+    `uses`: IntegerField()
+    How many times it was used in that hour
+    """
+
+    id = AutoField()
+    bucket = DateTimeField()
+    guild_id = BigIntegerField()
+    command = CharField(max_length=100)
+    command_type = CharField(max_length=20)
+    uses = IntegerField(default=0)
+
+    class Meta:
+        indexes = ((("bucket", "guild_id", "command", "command_type"), True),)
+
+
+class CommandUsageDaily(BaseModel):
+    """
+    # CommandUsageDaily
+    CommandAnalytics rolled up per day, same columns as CommandUsageHourly with `bucket` at midnight.
+    """
+
+    id = AutoField()
+    bucket = DateTimeField()
+    guild_id = BigIntegerField()
+    command = CharField(max_length=100)
+    command_type = CharField(max_length=20)
+    uses = IntegerField(default=0)
+
+    class Meta:
+        indexes = ((("bucket", "guild_id", "command", "command_type"), True),)
+
+
+class SchemaVersion(BaseModel):
+    """
+    # SchemaVersion
+    Migrations applied by core.migrations, one row per version.
+
+    `version`: IntegerField()
+    Migration version, 0 for databases that predate migrations
+
+    `description`: TextField()
+    What the migration did
+
+    `fingerprint`: CharField()
+    Fingerprint of the models' schema, only kept up to date on the newest row
+
+    `applied_at`: DateTimeField()
+    When the migration ran
+    """
+
+    version = IntegerField(primary_key=True)
+    description = TextField()
+    fingerprint = CharField(max_length=64, default="")
+    applied_at = DateTimeField(default=datetime.now)
+
+    class Meta:
+        table_name = "schema_version"
+
+
+class AnalyticsRollupState(BaseModel):
+    """
+    # AnalyticsRollupState
+    How far the CommandAnalytics rollups have got.
+
+    `id`: AutoField()
+    Database Entry ID, always 1
+
+    `last_id`: BigIntegerField()
+    The highest CommandAnalytics ID already counted in the rollups
+    """
+
+    id = AutoField()
+    last_id = BigIntegerField(default=0)
+
+
 class CheckInformation(BaseModel):
     """
     # CheckInformation:
@@ -259,7 +383,37 @@ class ClassSchedule(BaseModel):
     """
     id = AutoField()
     discord_id = BigIntegerField()
-    crn = IntegerField()
+    crn = IntegerField(index=True)
+
+    class Meta:
+        # A class can only be on someone's schedule once.
+        indexes = ((("discord_id", "crn"), True),)
+
+class SeatWatch(BaseModel):
+    """
+    # SeatWatch
+    Users waiting for a seat to open up in a full section.
+
+    `id`: AutoField()
+    Database Entry
+
+    `discord_id`: BigIntegerField()
+    Discord ID
+
+    `crn`: IntegerField()
+    Class Identification Number
+
+    `created_at`: DateTimeField()
+    When the user started watching
+    """
+    id = AutoField()
+    discord_id = BigIntegerField()
+    crn = IntegerField(index=True)
+    created_at = DateTimeField(default=datetime.now)
+
+    class Meta:
+        # Duplicate watches would each send their own DM.
+        indexes = ((("discord_id", "crn"), True),)
 
 class EmailVerification(BaseModel):
     """
@@ -283,7 +437,7 @@ class EmailVerification(BaseModel):
 
     """
     id = AutoField()
-    discord_id = BigIntegerField()
+    discord_id = BigIntegerField(index=True)
     email = TextField()
     verification_code = TextField()
     class_year = TextField()
@@ -299,7 +453,7 @@ class FinalizedEmailVerification(BaseModel):
     `discord_id`: BigIntegerField()
     Discord ID
 
-    `email`: TextField()
+    `email`: CharField()
     Email Address
 
     `class_year`: TextField()
@@ -308,7 +462,8 @@ class FinalizedEmailVerification(BaseModel):
     """
     id = AutoField()
     discord_id = BigIntegerField()
-    email = TextField()
+    # VARCHAR rather than TEXT so MySQL can index it.
+    email = CharField(max_length=255, index=True)
     class_year = TextField()
 
 class StarboardMessage(BaseModel):
@@ -335,9 +490,9 @@ class AIContext(BaseModel):
     Global Context
     """
     id = AutoField()
-    discord_id = BigIntegerField(default=0)
+    discord_id = BigIntegerField(default=0, index=True)
     context = TextField()
-    global_context = BooleanField()
+    global_context = BooleanField(index=True)
 
 
 class TicketInfo(BaseModel):
@@ -355,7 +510,7 @@ class TicketInfo(BaseModel):
     """
 
     id = AutoField()
-    channel_id = BigIntegerField()
+    channel_id = BigIntegerField(index=True)
     author_id = BigIntegerField()
 
 
@@ -375,8 +530,8 @@ class BaseTickerInfo(BaseModel):
 
 # Function to initialize the database
 def initialize_db():
-    db.connect()
-    db.create_tables([ColorUser], safe=True)
+    with connection():
+        db.create_tables([ColorUser], safe=True)
 
 # Function to get or create a user record
 def get_or_create_user(user_id):
@@ -423,9 +578,13 @@ tables = {
     "Blacklist": Blacklist,
     "BaseQueue": BaseQueue,
     "CommandAnalytics": CommandAnalytics,
+    "CommandUsageHourly": CommandUsageHourly,
+    "CommandUsageDaily": CommandUsageDaily,
+    "AnalyticsRollupState": AnalyticsRollupState,
     "CheckInformation": CheckInformation,
     "ColorUser": ColorUser,
     "ClassSchedule": ClassSchedule,
+    "SeatWatch": SeatWatch,
     "EmailVerification": EmailVerification,
     "FinalizedEmailVerification": FinalizedEmailVerification,
     "StarboardMessage": StarboardMessage,
@@ -435,9 +594,6 @@ tables = {
 }
 
 """
-This function automatically adds tables to the database if they do not exist,
-however it does take a significant amount of time to run so the env variable 'ITER_TABLES' should be 'False'
-in development. 
+Tables, columns and indexes are created and migrated by core.migrations.migrate(), which runs once on startup
+(see initialize_database) and costs a single query when the schema hasn't changed.
 """
-
-iter_table(tables)
\ No newline at end of file
@@ -0,0 +1,125 @@
+"""
+The bot's shared outbound HTTP client.
+
+Every cog talks to the outside world (QuACS on GitHub, SIS, SendGrid, OpenAI) through one pooled aiohttp
+session owned by the Charlotte instance, so connections are kept alive between requests, each host gets a
+bounded number of concurrent connections, and transient failures are retried with backoff in one place.
+"""
+
+import asyncio
+import contextlib
+import random
+
+import aiohttp
+
+from core.logging_module import get_log
+
+_log = get_log(__name__)
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class HTTPSessionManager:
+    """
+    A lazily created aiohttp session with a shared connection pool.
+
+    `request()`, `get()` and `post()` are used like their aiohttp.ClientSession counterparts
+    (`async with http.get(url) as response:`), but retry connection errors, timeouts and
+    429/5xx responses with exponential backoff. Only idempotent methods are retried unless
+    `retries` is given explicitly.
+    """
+
+    def __init__(self, limit=100, limit_per_host=10, timeout=30, retries=3, backoff=0.5):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.timeout = aiohttp.ClientTimeout(total=timeout, sock_connect=10)
+        self.retries = retries
+        self.backoff = backoff
+        self._session = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        # Created on first use so it binds to the running event loop, not the one at import time.
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit, limit_per_host=self.limit_per_host, ttl_dns_cache=300
+            )
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+        return self._session
+
+    @property
+    def closed(self):
+        return self._session is None or self._session.closed
+
+    def _delay(self, attempt, response=None):
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after is not None and retry_after.isdigit():
+            return min(float(retry_after), 30.0)
+        return self.backoff * (2 ** attempt) * (0.5 + random.random())
+
+    async def _send(self, method, url, retries, **kwargs):
+        if retries is None:
+            retries = self.retries if method in IDEMPOTENT_METHODS else 0
+        attempt = 0
+        while True:
+            try:
+                response = await self.session.request(method, url, **kwargs)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if attempt >= retries:
+                    raise
+                delay = self._delay(attempt)
+                _log.warning(f"{method} {url} failed ({e!r}), retrying in {delay:.1f}s")
+            else:
+                if response.status not in RETRY_STATUSES or attempt >= retries:
+                    return response
+                delay = self._delay(attempt, response)
+                response.release()
+                _log.warning(f"{method} {url} returned {response.status}, retrying in {delay:.1f}s")
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    @contextlib.asynccontextmanager
+    async def request(self, method, url, *, retries=None, **kwargs):
+        """
+        Send a request, retrying transient failures.
+        :param method: The HTTP method
+        :param url: The URL to request
+        :param retries: How many times to retry, defaults to `self.retries` for idempotent methods and 0 otherwise
+        :param kwargs: Passed on to aiohttp.ClientSession.request
+
+        :return: An async context manager yielding the aiohttp.ClientResponse
+        """
+        response = await self._send(method.upper(), url, retries, **kwargs)
+        try:
+            yield response
+        finally:
+            response.release()
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+_fallback = None
+
+
+def get_http_session(bot=None) -> HTTPSessionManager:
+    """
+    Get the bot's HTTPSessionManager, or a process wide one when there is no bot (tests, scripts).
+    :param bot: The bot instance, if any
+    """
+    global _fallback
+    http = getattr(bot, "http_session", None)
+    if http is not None:
+        return http
+    if _fallback is None:
+        _fallback = HTTPSessionManager()
+    return _fallback
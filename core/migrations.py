@@ -0,0 +1,238 @@
+"""
+Versioned schema migrations.
+
+`migrate()` runs once on startup. It fingerprints the models' schema (the CREATE TABLE and CREATE INDEX
+statements peewee would issue, plus the newest migration version) and compares it with the fingerprint stored
+in schema_version. When they match, that single query is all startup costs. Otherwise it:
+
+1. creates missing tables and adds missing nullable/defaulted columns,
+2. runs every migration newer than the recorded version, in order, recording each one,
+3. builds declared indexes the tables don't have yet (online on MySQL),
+4. stores the new fingerprint.
+
+New tables, new columns and new indexes only need the model change. Anything else (type changes, renames,
+dropping things, fixing data) gets a migration:
+
+    @migration(2, "Widen TicketInfo.author_id")
+    def widen_ticket_author(ops: MigrationOps):
+        ops.alter_column_type(database.TicketInfo, "author_id")
+
+Databases created from scratch already match the models, so they're recorded at the newest version and
+their migrations are skipped.
+"""
+
+import hashlib
+from typing import Callable, NamedTuple
+
+from peewee import DatabaseError, MySQLDatabase, fn
+from playhouse.migrate import SchemaMigrator
+
+from core import database
+from core.logging_module import get_log
+
+_log = get_log(__name__)
+
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    apply: Callable
+
+
+MIGRATIONS = []
+
+
+def migration(version: int, description: str):
+    """Register a migration, versions must be added in increasing order."""
+
+    def register(func):
+        if MIGRATIONS and version <= MIGRATIONS[-1].version:
+            raise ValueError(f"Migration {version} must come after {MIGRATIONS[-1].version}")
+        MIGRATIONS.append(Migration(version, description, func))
+        return func
+
+    return register
+
+
+def latest_version() -> int:
+    return MIGRATIONS[-1].version if MIGRATIONS else 0
+
+
+class MigrationOps:
+    """Schema changes for migrations to use. MySQL changes are made online where MySQL allows it."""
+
+    def __init__(self, db):
+        self.db = db
+        self.mysql = isinstance(db, MySQLDatabase)
+        self.migrator = SchemaMigrator.from_database(db)
+
+    def column_type(self, model, field_name: str):
+        """:return: The column's current type as the database reports it, lower case, e.g. "varchar" """
+        column_name = model._meta.fields[field_name].column_name
+        for column in self.db.get_columns(model._meta.table_name):
+            if column.name == column_name:
+                return column.data_type.lower().split("(")[0]
+        return None
+
+    def add_column(self, model, field_name: str):
+        """Add a column as declared on the model. It has to be nullable or have a default."""
+        field = model._meta.fields[field_name]
+        self.migrator.add_column(model._meta.table_name, field.column_name, field).run()
+
+    def alter_column_type(self, model, field_name: str):
+        """Change a column to the type declared on the model."""
+        field = model._meta.fields[field_name]
+        table = model._meta.table_name
+        if not self.mysql:
+            # SQLite can't alter columns, peewee rebuilds the table instead.
+            self.migrator.alter_column_type(table, field.column_name, field).run()
+            return
+        ctx = self.db.get_sql_context()
+        definition, _ = ctx.sql(field.ddl(ctx)).query()
+        # A type change rewrites the table, LOCK=SHARED keeps it readable while that happens.
+        self.db.execute_sql(f"ALTER TABLE `{table}` MODIFY {definition}, ALGORITHM=COPY, LOCK=SHARED")
+
+    def drop_index(self, model, index_name: str):
+        self.migrator.drop_index(model._meta.table_name, index_name).run()
+
+    def execute(self, sql: str, params=None):
+        return self.db.execute_sql(sql, params)
+
+
+@migration(1, "Make FinalizedEmailVerification.email a VARCHAR so MySQL can index it")
+def email_varchar(ops: MigrationOps):
+    # SQLite doesn't enforce column types, only MySQL needs the change.
+    if ops.mysql and ops.column_type(database.FinalizedEmailVerification, "email") != "varchar":
+        ops.alter_column_type(database.FinalizedEmailVerification, "email")
+
+
+def fingerprint(model_dict: dict) -> str:
+    """Hash of the DDL peewee would generate for the models, and of the newest migration version."""
+    digest = hashlib.sha256(f"migrations:{latest_version()}".encode())
+    for key in sorted(model_dict):
+        model = model_dict[key]
+        sql, _ = model._schema._create_table(safe=False).query()
+        digest.update(sql.encode())
+        for index in model._meta.fields_to_index():
+            sql, _ = model._schema._create_index(index, safe=False).query()
+            digest.update(sql.encode())
+    return digest.hexdigest()
+
+
+def _recorded():
+    """:return: The newest schema_version row, or None if there isn't one (or no table yet)"""
+    try:
+        return database.SchemaVersion.select().order_by(database.SchemaVersion.version.desc()).first()
+    except DatabaseError:
+        return None
+
+
+def sync_tables(model_dict: dict, ops: MigrationOps):
+    """Create missing tables, and add missing columns to existing ones where that needs no migration."""
+    db = database.db
+    existing = set(db.get_tables())
+    for model in model_dict.values():
+        table = model._meta.table_name
+        if table not in existing:
+            _log.info(f"Creating table {table}...")
+            db.create_tables([model])
+            continue
+        columns = {column.name for column in db.get_columns(table)}
+        for field in model._meta.sorted_fields:
+            if field.column_name in columns:
+                continue
+            if not field.null and field.default is None:
+                _log.warning(f"{table}.{field.column_name} is missing and NOT NULL without a default, add a migration.")
+                continue
+            _log.info(f"Adding column {table}.{field.column_name}...")
+            ops.add_column(model, field.name)
+
+
+def _remove_duplicates(model, fields):
+    """Delete all but the oldest row of every group of rows that share the given fields' values."""
+    primary_key = model._meta.primary_key
+    duplicates = (
+        model.select(*fields, fn.MIN(primary_key))
+        .group_by(*fields)
+        .having(fn.COUNT(primary_key) > 1)
+        .tuples()
+    )
+    for *values, keep in list(duplicates):
+        removed = (
+            model.delete()
+            .where(*[field == value for field, value in zip(fields, values)], primary_key != keep)
+            .execute()
+        )
+        _log.info(f"Removed {removed} duplicate {model.__name__} rows for {dict(zip([f.name for f in fields], values))}")
+
+
+def build_indexes(model_dict: dict):
+    """
+    Builds the indexes declared on each model that its table doesn't have yet, i.e. on tables created before
+    the index was declared. Rows that would break a unique index are removed first, keeping the oldest.
+    On MySQL indexes are built online (ALGORITHM=INPLACE, LOCK=NONE) so the bot keeps working meanwhile.
+    """
+    db = database.db
+    mysql = isinstance(db, MySQLDatabase)
+    with database.connection():
+        for model in model_dict.values():
+            table = model._meta.table_name
+            existing = {index.name for index in db.get_indexes(table)}
+            for index in model._meta.fields_to_index():
+                if index._name in existing:
+                    continue
+                fields = list(index._expressions)
+                if index._unique:
+                    _remove_duplicates(model, fields)
+                _log.info(f"Building index {index._name} on {table}...")
+                if not mysql:
+                    db.execute(model._schema._create_index(index, safe=True))
+                    continue
+                column_list = ", ".join(f"`{field.column_name}`" for field in fields)
+                db.execute_sql(
+                    f"ALTER TABLE `{table}` ADD {'UNIQUE ' if index._unique else ''}INDEX `{index._name}` "
+                    f"({column_list}), ALGORITHM=INPLACE, LOCK=NONE"
+                )
+
+
+def migrate(model_dict: dict = None) -> bool:
+    """
+    Bring the database up to date with the models. Blocking.
+    :param model_dict: The models to manage, database.tables by default
+    :return: False if the schema was already up to date
+    """
+    model_dict = model_dict if model_dict is not None else database.tables
+    expected = fingerprint(model_dict)
+    db = database.db
+    with database.connection():
+        recorded = _recorded()
+        if recorded is not None and recorded.version == latest_version() and recorded.fingerprint == expected:
+            return False
+
+        _log.info("Database schema changed, migrating...")
+        ops = MigrationOps(db)
+        if recorded is None:
+            tables = {model._meta.table_name for model in model_dict.values()}
+            fresh = not tables & set(db.get_tables())
+            db.create_tables([database.SchemaVersion])
+            # Databases from before migrations existed need all of them, new ones are created up to date.
+            recorded = database.SchemaVersion.create(
+                version=latest_version() if fresh else 0,
+                description="Created up to date" if fresh else "Baseline",
+            )
+
+        sync_tables(model_dict, ops)
+        for pending in MIGRATIONS:
+            if pending.version <= recorded.version:
+                continue
+            _log.info(f"Applying migration {pending.version}: {pending.description}")
+            with db.atomic():
+                pending.apply(ops)
+                recorded = database.SchemaVersion.create(version=pending.version, description=pending.description)
+        build_indexes(model_dict)
+
+        database.SchemaVersion.update(fingerprint=expected).where(
+            database.SchemaVersion.version == recorded.version
+        ).execute()
+        _log.info(f"Database schema is at version {recorded.version}.")
+    return True
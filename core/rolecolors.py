@@ -15,7 +15,7 @@ import discord
 from discord import SelectOption
 from discord.ui import View, Modal, TextInput, Select
 
-from core import database
+from core import async_db, database
 
 
 class RoleColorModal(Modal):
@@ -28,11 +28,13 @@ class RoleColorModal(Modal):
             await interaction.response.send_message("Invalid hex code. Please use the format #123abc.", ephemeral=True)
             return
 
-        user_record = database.ColorUser.select().where(database.ColorUser.user_id == interaction.user.id)
+        user_record = await async_db.first(
+            database.ColorUser.select().where(database.ColorUser.user_id == interaction.user.id)
+        )
         reference_role = interaction.guild.get_role(1216596310619328642)
 
-        if user_record.exists():
-            role = interaction.guild.get_role(user_record.get().role_id)
+        if user_record is not None:
+            role = interaction.guild.get_role(user_record.role_id)
             if role:
                 await role.edit(colour=discord.Colour(int(hex_code[1:], 16)), reason=f"{interaction.user.name} requested color change to {hex_code}")
                 await interaction.response.send_message(f"Role {role.name} edited.", ephemeral=True)
@@ -40,16 +42,14 @@ class RoleColorModal(Modal):
                 role_name = interaction.user.name + f"'s Role ({hex_code})"
                 role = await interaction.guild.create_role(name=role_name, colour=discord.Colour(int(hex_code[1:], 16)), reason=f"{interaction.user.name} requested color change to {hex_code}")
                 await role.edit(position=reference_role.position + 1)
-                database.update_user_role(interaction.user.id, role.id)
+                await async_db.run(database.update_user_role, interaction.user.id, role.id)
                 await interaction.response.send_message(f"Role {role.name} assigned.", ephemeral=True)
         else:
             role_name = interaction.user.name + f"'s Role ({hex_code})"
             role = await interaction.guild.create_role(name=role_name, colour=discord.Colour(int(hex_code[1:], 16)), reason=f"{interaction.user.name} requested color change to {hex_code}")
             await role.edit(position=reference_role.position + 1)
 
-            query = database.ColorUser.create(user_id=interaction.user.id, role_id=role.id)
-            query.save()
-            database.update_user_role(interaction.user.id, role.id)
+            await async_db.run(database.ColorUser.create, user_id=interaction.user.id, role_id=role.id)
             await interaction.user.add_roles(role, reason=f"{interaction.user.name} requested color change to {hex_code}")
             await interaction.response.send_message(f"Role {role.name} given!", ephemeral=True)
 
@@ -67,11 +67,13 @@ class RoleNameModal(Modal):
     async def on_submit(self, interaction: discord.Interaction):
         role_name = self.role_name.value
 
-        user_record = database.ColorUser.select().where(database.ColorUser.user_id == interaction.user.id)
+        user_record = await async_db.first(
+            database.ColorUser.select().where(database.ColorUser.user_id == interaction.user.id)
+        )
         reference_role = interaction.guild.get_role(1216596310619328642)
 
-        if user_record.exists():
-            role = interaction.guild.get_role(user_record.get().role_id)
+        if user_record is not None:
+            role = interaction.guild.get_role(user_record.role_id)
             if role:
                 await role.edit(name=role_name, reason=f"{interaction.user.name} requested name change to {role_name}")
                 await interaction.response.send_message(f"Role {role.name} edited.", ephemeral=True)
@@ -81,7 +83,7 @@ class RoleNameModal(Modal):
                 role = await interaction.guild.create_role(name=role_name, colour=random_hex_code, reason=f"{interaction.user.name} requested name change to {role_name}")
                 await role.edit(position=reference_role.position + 1)
 
-                database.update_user_role(interaction.user.id, role.id)
+                await async_db.run(database.update_user_role, interaction.user.id, role.id)
                 await interaction.response.send_message(f"Role {role.name} assigned.", ephemeral=True)
         else:
             random_hex_code = discord.Color.random()
@@ -89,9 +91,7 @@ class RoleNameModal(Modal):
             role = await interaction.guild.create_role(name=role_name, colour=random_hex_code, reason=f"{interaction.user.name} requested name change to {role_name}")
             await role.edit(position=reference_role.position + 1)
             
-            query = database.ColorUser.create(user_id=interaction.user.id, role_id=role.id)
-            query.save()
-            database.update_user_role(interaction.user.id, role.id)
+            await async_db.run(database.ColorUser.create, user_id=interaction.user.id, role_id=role.id)
             await interaction.user.add_roles(role, reason=f"{interaction.user.name} requested name change to {role_name}")
             await interaction.response.send_message(f"Role {role.name} given!", ephemeral=True)
 
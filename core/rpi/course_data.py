@@ -1,36 +1,434 @@
+import asyncio
+import codecs
+import functools
+import itertools
+import json
+import os
+import re
+import time
+from typing import NamedTuple
+
 import aiohttp
-import requests
-from bs4 import BeautifulSoup
 
-from core.rpi.quacs_base import Course, Prerequisite, CourseCatalog, Section, Restriction
+from core.http_session import HTTPSessionManager, get_http_session
+from core.logging_module import get_log
+from core.cache import LRUCache
+from core.rpi.quacs_base import CompactCourse, CompactCourseCatalog, CompactSection
+from core.rpi.course_search import CourseSearchIndex
+from core.rpi.prereqs import compile_prereqs
+from core.rpi.schedule_conflicts import ConflictMatrix
+from core.rpi.sis_blocks import SISBlockParser
+from core.rpi.static_responses import StaticResponses, build_static_responses
+from core.rpi.quacs_cache import DEFAULT_CACHE_DIR, SnapshotStore
+
+_log = get_log(__name__)
+
+# The term commands default to, as a QuACS/SIS term code (YYYYMM of the semester start).
+ACTIVE_TERM = os.getenv("QUACS_TERM", "202409")
+TERM_PATTERN = re.compile(r"^\d{4}(0[1-9]|1[0-2])$")
+# Data versions are shared by every term and every CourseData instance, so a term that's evicted and loaded
+# again never reuses a version something may still have cached.
+_versions = itertools.count(1)
+
+
+def next_version():
+    """:return: A data version no course data in this process has been published as yet"""
+    return next(_versions)
+
+
+def validate_term(term):
+    """
+    Check a user supplied term code before it ends up in a URL or a file path.
+    :param term: A term code, e.g. 202409
+
+    :return: The term as a string
+    :raises ValueError: If the term isn't a YYYYMM code
+    """
+    term = str(term).strip()
+    if not TERM_PATTERN.match(term):
+        raise ValueError(f"{term!r} is not a term code like 202409")
+    return term
+
+
+class SeatChange(NamedTuple):
+    """A section whose seat counts moved between two versions of the course data."""
+    crn: int
+    old_rem: int
+    new_rem: int
+    old_cap: int
+    new_cap: int
+    old_xl_rem: int
+    new_xl_rem: int
+
+
+class CourseIndex:
+    """
+    Hash indexes over the raw QuACS ``courses.json`` rows.
+
+    Built once whenever course data is loaded so lookups by CRN, course or subject
+    are dictionary hits instead of walking every subject/course/section.
+    An index is never modified after it's built, refreshes build a new one and swap it in.
+
+    `version`: Unique to this index in the process (see next_version), 0 while nothing is loaded
+    `by_crn`: CRN -> (course row, section row)
+    `by_course`: (subject code, course number) -> course row
+    `by_subject`: subject code -> list of course rows
+    """
+
+    def __init__(self, courses_data, version=0):
+        self.version = version
+        self.by_crn = {}
+        self.by_course = {}
+        self.by_subject = {}
+
+        for subject in courses_data or []:
+            subject_courses = self.by_subject.setdefault(subject['code'], [])
+            for course in subject['courses']:
+                subject_courses.append(course)
+                self.by_course[(subject['code'], int(course['crse']))] = course
+                for section in course['sections']:
+                    self.by_crn[int(section['crn'])] = (course, section)
+
+    def course(self, course_key, course_num):
+        try:
+            return self.by_course.get((course_key, int(course_num)))
+        except (TypeError, ValueError):
+            return None
+
+    def crn(self, crn):
+        try:
+            return self.by_crn.get(int(crn), (None, None))
+        except (TypeError, ValueError):
+            return None, None
+
+    def diff(self, courses_data):
+        """
+        Compare this index against a newer copy of ``courses.json``.
+        :param courses_data: The newer courses.json
+
+        :return: A (seat changes, changed courses, structural) tuple. Changed courses maps
+            (subject code, course number) to the new course row. Structural is True when sections
+            were added or removed, in which case the index has to be rebuilt from scratch. Seat changes
+            cover every section in both copies either way.
+        """
+        seat_changes = []
+        changed_courses = {}
+        structural = False
+        # Sections found in both the old and new data, anything else in the old index was removed.
+        kept = 0
+        for subject in courses_data:
+            for course in subject['courses']:
+                key = (subject['code'], int(course['crse']))
+                old_course = self.by_course.get(key)
+                if old_course is None:
+                    structural = True
+                elif old_course['title'] != course['title']:
+                    changed_courses[key] = course
+
+                # Keep scanning after a structural change, seat changes elsewhere still have to be reported.
+                for section in course['sections']:
+                    _, old_section = self.by_crn.get(int(section['crn']), (None, None))
+                    if old_section is None:
+                        structural = True
+                        continue
+                    kept += 1
+                    if old_section == section:
+                        continue
+
+                    changed_courses[key] = course
+                    if (
+                        old_section['rem'] != section['rem']
+                        or old_section['cap'] != section['cap']
+                        or old_section.get('xl_rem') != section.get('xl_rem')
+                    ):
+                        seat_changes.append(SeatChange(
+                            crn=int(section['crn']),
+                            old_rem=old_section['rem'],
+                            new_rem=section['rem'],
+                            old_cap=old_section['cap'],
+                            new_cap=section['cap'],
+                            old_xl_rem=old_section.get('xl_rem'),
+                            new_xl_rem=section.get('xl_rem'),
+                        ))
+
+        return seat_changes, changed_courses, structural or kept != len(self.by_crn)
+
+    def updated(self, changed_courses, version):
+        """
+        Build the next index, re-pointing only the courses that changed and sharing every other row.
+        :param changed_courses: (subject code, course number) -> new course row, as returned by diff()
+        :param version: The version of the new index
+        """
+        index = CourseIndex(None, version)
+        index.by_crn = dict(self.by_crn)
+        index.by_course = dict(self.by_course)
+        index.by_subject = dict(self.by_subject)
+
+        for (subj, crse), course in changed_courses.items():
+            index.by_course[(subj, crse)] = course
+            index.by_subject[subj] = [
+                course if int(row['crse']) == crse else row for row in index.by_subject[subj]
+            ]
+            for section in course['sections']:
+                index.by_crn[int(section['crn'])] = (course, section)
+        return index
+
+
+class Derived(NamedTuple):
+    """Everything CourseData computes from a set of QuACS files."""
+    index: CourseIndex
+    prereqs: dict
+    search: CourseSearchIndex
+    conflicts: ConflictMatrix
+    responses: StaticResponses
 
 
 class CourseData:
-    GITHUB_BASE_URL = 'https://raw.githubusercontent.com/quacs/quacs-data/master/semester_data/202409/'
-
-    FILE_URLS = {
-        'catalog': GITHUB_BASE_URL + 'catalog.json',
-        'courses': GITHUB_BASE_URL + 'courses.json',
-        'prereqs': GITHUB_BASE_URL + 'prerequisites.json',
-        'registration_dates': GITHUB_BASE_URL + 'registration_dates.json',
-        'schools': GITHUB_BASE_URL + 'schools.json'
+    GITHUB_BASE_URL = 'https://raw.githubusercontent.com/quacs/quacs-data/master/semester_data/{term}/'
+
+    FILES = {
+        'catalog': 'catalog.json',
+        'courses': 'courses.json',
+        'prereqs': 'prerequisites.json',
+        'registration_dates': 'registration_dates.json',
+        'schools': 'schools.json'
     }
 
-    def __init__(self):
-        self.catalog_data = self.fetch_data(self.FILE_URLS['catalog'])
-        self.courses_data = self.fetch_data(self.FILE_URLS['courses'])
-        self.prereqs_data = self.fetch_data(self.FILE_URLS['prereqs'])
-        self.registration_data = self.fetch_data(self.FILE_URLS['registration_dates'])
-        self.school_data = self.fetch_data(self.FILE_URLS['schools'])
-
-    def fetch_data(self, url):
-        response = requests.get(url)
-        if response.status_code == 200:
-            return response.json()
+    def __init__(self, term=ACTIVE_TERM):
+        self.term = validate_term(term)
+        self.file_urls = self.urls_for(self.term)
+        self.catalog_data = None
+        self.courses_data = None
+        self.prereqs_data = None
+        self.registration_data = None
+        self.school_data = None
+        # Files the published data had to go without, see publish().
+        self.missing = set()
+        self.index = CourseIndex(None)
+        self.prereqs = {}
+        self.search = CourseSearchIndex(None)
+        self.conflicts = ConflictMatrix(None)
+        self.responses = StaticResponses([], "")
+        self.ready = asyncio.Event()
+        self.snapshots = SnapshotStore(os.path.join(DEFAULT_CACHE_DIR, self.term))
+        # Built objects are immutable and shared between commands, keyed by data version so a refresh
+        # never serves stale seat counts.
+        self._objects = LRUCache(maxsize=2048)
+
+    @classmethod
+    def urls_for(cls, term):
+        base_url = cls.GITHUB_BASE_URL.format(term=term)
+        return {name: base_url + file for name, file in cls.FILES.items()}
+
+    async def load(self, session: HTTPSessionManager = None):
+        """
+        Publish the QuACS files, starting from the on-disk snapshots and revalidating every file
+        against GitHub at the same time. Unchanged files are answered with a 304 and never re-downloaded,
+        and files GitHub can't serve fall back to the last good snapshot.
+        :param session: The HTTPSessionManager to use, defaults to the shared one.
+
+        :return: True if course data is available, otherwise False
+        """
+        loop = asyncio.get_running_loop()
+        snapshot, validators = await loop.run_in_executor(None, self._read_snapshots)
+        if not self.is_ready and all(value is not None for value in snapshot.values()):
+            derived = await loop.run_in_executor(None, self.derive, snapshot, next_version())
+            self.publish(snapshot, derived)
+
+        session = session or get_http_session()
+        results = await asyncio.gather(
+            *(self.fetch_data(session, name, validators[name]) for name in self.file_urls)
+        )
+
+        data = {}
+        changed = False
+        for name, fresh in zip(self.file_urls, results):
+            if fresh is None:
+                data[name] = snapshot[name]
+            else:
+                data[name] = fresh
+                changed = True
+
+        if data['courses'] is None:
+            _log.error("Unable to load QuACS course data, commands will stay unavailable.")
+            return self.is_ready
+
+        if changed or not self.is_ready:
+            derived = await loop.run_in_executor(None, self.derive, data, next_version())
+            self.publish(data, derived)
+        return True
+
+    async def refresh(self, session: HTTPSessionManager = None):
+        """
+        Re-download courses.json and publish a new index if any section changed.
+        Only the courses with a changed section are re-pointed in the new index, and the new index is
+        swapped in with a single assignment so running commands never see a half-updated structure.
+        :param session: The HTTPSessionManager to use, defaults to the shared one.
+
+        :return: A list of SeatChange for every section whose seat counts moved
+        """
+        if not self.is_ready:
+            return []
+
+        loop = asyncio.get_running_loop()
+        headers = await loop.run_in_executor(None, self.snapshots.conditional_headers, 'courses')
+        courses = await self.fetch_data(session or get_http_session(), 'courses', headers)
+        if courses is None:
+            return []
+
+        index = self.index
+        seat_changes, changed_courses, structural = await loop.run_in_executor(None, index.diff, courses)
+        search, conflicts = self.search, self.conflicts
+        if structural:
+            new_index = await loop.run_in_executor(
+                None, functools.partial(CourseIndex, courses, next_version())
+            )
+            search = await loop.run_in_executor(None, CourseSearchIndex, courses, self.catalog_data)
+            conflicts = await loop.run_in_executor(None, ConflictMatrix, courses)
+        elif changed_courses:
+            new_index = await loop.run_in_executor(None, index.updated, changed_courses, next_version())
+            retimed, retitled = self._changed_details(index, changed_courses)
+            if retimed:
+                conflicts = await loop.run_in_executor(None, self.conflicts.updated, retimed)
+            if retitled:
+                search = await loop.run_in_executor(None, CourseSearchIndex, courses, self.catalog_data)
         else:
-            print(f"Failed to fetch data from {url}: {response.status_code}")
+            return []
+
+        if self.index is not index:
+            # Something else published while we were diffing, our diff is against stale data.
+            return []
+        self.courses_data = courses
+        self.index = new_index
+        self.search = search
+        self.conflicts = conflicts
+        return seat_changes
+
+    @staticmethod
+    def _changed_details(index, changed_courses):
+        """
+        Work out which derived structures a non-structural refresh has to update.
+        :return: (sections whose timeslots changed, whether any course title changed)
+        """
+        retimed = []
+        retitled = False
+        for key, course in changed_courses.items():
+            retitled = retitled or index.by_course[key]['title'] != course['title']
+            for section in course['sections']:
+                if index.by_crn[int(section['crn'])][1]['timeslots'] != section['timeslots']:
+                    retimed.append(section)
+        return retimed, retitled
+
+    def _read_snapshots(self):
+        snapshot = {name: self.snapshots.read(name) for name in self.file_urls}
+        # Only revalidate files we can actually fall back to, otherwise a 304 would leave us with nothing.
+        validators = {
+            name: self.snapshots.conditional_headers(name) if snapshot[name] is not None else {}
+            for name in self.file_urls
+        }
+        return snapshot, validators
+
+    async def fetch_data(self, session: HTTPSessionManager, name, headers=None):
+        """
+        Download one QuACS file if it changed since the last snapshot.
+        :param session: The HTTPSessionManager to use
+        :param name: The file to fetch, a key of FILES
+        :param headers: The snapshot's conditional request headers, if any
+
+        :return: The decoded JSON if GitHub sent a new copy, None if it's unchanged or couldn't be fetched
+        """
+        url = self.file_urls[name]
+        loop = asyncio.get_running_loop()
+        try:
+            async with session.get(url, headers=headers or {}) as response:
+                if response.status == 304:
+                    return None
+                if response.status == 200:
+                    body = await response.read()
+                    # courses.json is several megabytes, decoding it on the loop stalls the gateway.
+                    data = await loop.run_in_executor(None, json.loads, body)
+                    etag = response.headers.get("ETag")
+                    last_modified = response.headers.get("Last-Modified")
+                else:
+                    _log.warning(f"Failed to fetch data from {url}: {response.status}")
+                    return None
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            _log.warning(f"Failed to fetch data from {url}: {e!r}")
             return None
 
+        try:
+            await loop.run_in_executor(None, self.snapshots.write, name, body, etag, last_modified)
+        except OSError as e:
+            _log.warning(f"Unable to save QuACS snapshot {name}: {e!r}")
+        return data
+
+    @staticmethod
+    def derive(data, version):
+        """
+        Build everything computed from a set of QuACS files. This walks the whole semester,
+        so load() runs it in an executor to keep it off the event loop.
+        :param data: A dict keyed like FILES holding the decoded JSON files
+        :param version: The data version the result will be published as
+
+        :return: A Derived tuple
+        """
+        return Derived(
+            index=CourseIndex(data['courses'], version),
+            prereqs=compile_prereqs(data['prereqs']),
+            search=CourseSearchIndex(data['courses'], data['catalog']),
+            conflicts=ConflictMatrix(data['courses']),
+            responses=build_static_responses(data),
+        )
+
+    def publish(self, data, derived=None):
+        """
+        Swap in a freshly loaded set of QuACS files.
+        :param data: A dict keyed like FILES holding the decoded JSON files
+        :param derived: The result of derive() for data, built here if not given
+        """
+        if derived is None:
+            derived = self.derive(data, next_version())
+        self.missing = {name for name, value in data.items() if value is None}
+        if self.missing:
+            # A cold start where some file couldn't be fetched. Courses are usable without the rest,
+            # the missing files stay empty until a later load fetches them.
+            _log.warning(f"Publishing course data for {self.term} without {', '.join(sorted(self.missing))}.")
+        self.catalog_data = data['catalog'] or {}
+        self.courses_data = data['courses']
+        self.prereqs_data = data['prereqs'] or {}
+        self.registration_data = data['registration_dates'] or {}
+        self.school_data = data['schools'] or []
+        self.index, self.prereqs, self.search, self.conflicts, self.responses = derived
+        self.ready.set()
+
+    @property
+    def is_ready(self):
+        return self.ready.is_set()
+
+    @property
+    def is_complete(self):
+        """:return: True once every QuACS file has been published"""
+        return self.is_ready and not self.missing
+
+    @property
+    def version(self):
+        return self.index.version
+
+    async def wait_until_ready(self, timeout=None):
+        """
+        Wait for the course data to finish loading.
+        :param timeout: Seconds to wait before giving up, waits forever if None
+
+        :return: True if the data is loaded, otherwise False
+        """
+        if self.ready.is_set():
+            return True
+        try:
+            await asyncio.wait_for(self.ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
     def get_course_catalog(self, course_key, course_num):
         """
         Get a course from the course catalog data.
@@ -41,7 +439,9 @@ class CourseData:
         """
         key = f"{course_key}-{course_num}"
         if key in self.catalog_data:
-            return CourseCatalog(**self.catalog_data[key])
+            return self._objects.get_or_create(
+                ("catalog", self.version, key), lambda: CompactCourseCatalog(**self.catalog_data[key])
+            )
         return None
 
     def get_course(self, course_key, course_num):
@@ -50,119 +450,330 @@ class CourseData:
         :param course_key: The course key (e.g., CSCI)
         :param course_num: The course number (e.g., 1100)
 
-        :return: A Course object if found, otherwise None
+        :return: A CompactCourse object if found, otherwise None
+        """
+        index = self.index
+        course = index.course(course_key, course_num)
+        if course is not None:
+            return self._course(index, course)
+        return None
+
+    def get_section(self, course_key, course_num, section_num):
+        """
+        Get a single section of a course.
+        :param course_key: The course key (e.g., CSCI)
+        :param course_num: The course number (e.g., 1100)
+        :param section_num: The section number (e.g., 1 or "01")
+
+        :return: A CompactSection object if found, otherwise None
         """
-        for subject in self.courses_data:
-            if subject['code'] == course_key:
-                for course in subject['courses']:
-                    if course['crse'] == course_num:
-                        return Course(**course)
+        index = self.index
+        course = index.course(course_key, course_num)
+        if course is None:
+            return None
+        sec = str(section_num).zfill(2)
+        for section in course['sections']:
+            if section['sec'] == sec:
+                return self._section(index, section)
         return None
 
-    def get_prereqs(self, crn):
-        if str(crn) in self.prereqs_data:
-            prereqs_data = self.prereqs_data[str(crn)].get('prerequisites')
-            restrictions_data = self.prereqs_data[str(crn)].get('restrictions')
-
-            prereqs = None
-            if prereqs_data:
-                if 'course' in prereqs_data:
-                    prereqs = Prerequisite(
-                        course=prereqs_data['course'],
-                        min_grade=prereqs_data['min_grade'],
-                        type=prereqs_data['type']
-                    )
-                elif 'nested' in prereqs_data:
-                    nested_reqs = [Prerequisite(**req) for req in prereqs_data['nested']]
-                    prereqs = Prerequisite(
-                        course=nested_reqs,
-                        min_grade=None,
-                        type=prereqs_data['type']
-                    )
-
-            restrictions = None
-            if restrictions_data:
-                major = restrictions_data.get('major')
-                classification = restrictions_data.get('classification')
-                restrictions = Restriction(major=major, classification=classification)
-
-            return prereqs, restrictions
-        return None, None
-
-    def get_prerequisites(self, course_key, course_num):
-        course = self.get_course(course_key, course_num)
-        if course:
-            prereqs_list = []
-            restrictions_list = []
-            for section in course.sections:
-                prereq, restriction = self.get_prereqs(section.crn)
-                if prereq:
-                    prereqs_list.append(str(prereq))
-                if restriction:
-                    restrictions_list.append(str(restriction))
-            return prereqs_list, restrictions_list
-        return None, None
+    def get_subject_courses(self, course_key):
+        """
+        Get every course offered under a subject.
+        :param course_key: The course key (e.g., CSCI)
+
+        :return: A list of CompactCourse objects, empty if the subject doesn't exist
+        """
+        index = self.index
+        return [self._course(index, course) for course in index.by_subject.get(course_key, [])]
+
+    def _course(self, index, course):
+        return self._objects.get_or_create(
+            ("course", index.version, course['id']), lambda: CompactCourse(**course)
+        )
+
+    def _section(self, index, section):
+        return self._objects.get_or_create(
+            ("section", index.version, int(section['crn'])), lambda: CompactSection(**section)
+        )
+
+    def get_compiled_prereqs(self, crn):
+        """
+        Get the precompiled prerequisites and restrictions of a section.
+        :param crn: The CRN of the section
+
+        :return: A CompiledPrereqs if the section has prerequisites or restrictions, otherwise None
+        """
+        try:
+            return self.prereqs.get(int(crn))
+        except (TypeError, ValueError):
+            return None
 
     def get_registration_dates(self):
-        open_date = self.registration_data['registration_opens']
-        close_date = self.registration_data['registration_closes']
+        """:return: (opens, closes), either is None if registration_dates.json hasn't loaded"""
+        open_date = self.registration_data.get('registration_opens')
+        close_date = self.registration_data.get('registration_closes')
         return open_date, close_date
 
     def get_schools(self):
         return self.school_data
 
     def get_course_by_crn(self, crn):
-        for subject in self.courses_data:
-            for course in subject['courses']:
-                for section in course['sections']:
-                    if section['crn'] == crn:
-                        course_obj = Course(**course)
-                        section_obj = Section(**section)
-                        return course_obj, section_obj
-        return None, None
+        """
+        Get the course and section a CRN belongs to.
+        :param crn: The CRN of the section
 
-class BlockLocation:
-    def __init__(self):
-        self.block_url = "https://sis.rpi.edu/reg/zs202409.htm"
+        :return: A (CompactCourse, CompactSection) tuple if found, otherwise (None, None)
+        """
+        index = self.index
+        course, section = index.crn(crn)
+        if course is None:
+            return None, None
+        return self._course(index, course), self._section(index, section)
 
-    async def fetch_html(self):
-        async with aiohttp.ClientSession() as session:
-            async with session.get(self.block_url) as response:
-                return await response.text()
+    def get_courses_by_crns(self, crns):
+        """
+        Resolve a batch of CRNs against a single index snapshot.
+        :param crns: An iterable of CRNs
 
-    async def find_class_type(self, crn):
-        html_content = await self.fetch_html()
+        :return: A dict of {CRN: (CompactCourse, CompactSection)} for every CRN that was found
+        """
+        index = self.index
+        resolved = {}
+        for crn in crns:
+            course, section = index.crn(crn)
+            if course is not None:
+                resolved[crn] = (self._course(index, course), self._section(index, section))
+        return resolved
 
-        soup = BeautifulSoup(html_content, 'html.parser')
+class CourseDataRegistry:
+    """
+    Holds one CourseData per term so the current and next semester can be live at the same time.
 
-        rows = soup.find_all('tr', {'align': 'LEFT'})
-        all_rows = []
+    Terms are loaded the first time they're asked for, and terms other than the active one are dropped
+    once they've gone unused for `idle_timeout` seconds or more than `max_terms` are loaded.
+    SIS block pages are cached per term the same way, independently of the course data.
+    """
 
-        for row in rows:
-            columns = [col.text.strip() for col in row.find_all('td')]
-            all_rows.append(columns)
+    def __init__(self, active_term=ACTIVE_TERM, max_terms=3, idle_timeout=60 * 60, http=None):
+        self.active_term = validate_term(active_term)
+        self.http = http
+        self.max_terms = max_terms
+        self.idle_timeout = idle_timeout
+        self._terms = {}
+        self._last_used = {}
+        self._loads = {}
+        # SIS block pages, separate from _terms so looking up blocks never loads a term's QuACS data.
+        self._block_locations = {}
+        self._block_last_used = {}
 
-        section_blocks = []
-        capturing = False
+    @property
+    def active(self):
+        return self.get(self.active_term)
 
-        for columns in all_rows:
-            if len(columns) == 0:
-                continue
+    @property
+    def terms(self):
+        return list(self._terms)
+
+    def get(self, term=None):
+        """
+        Get the CourseData for a term, starting to load it in the background if it isn't loaded yet.
+        Use CourseData.wait_until_ready() before reading from it.
+        :param term: The term code, defaults to the active term
 
-            first_column_text = columns[0]
+        :return: The CourseData for the term
+        :raises ValueError: If the term isn't a valid term code
+        """
+        term = validate_term(term or self.active_term)
+        course_data = self._terms.get(term)
+        if course_data is None:
+            course_data = CourseData(term)
+            self._terms[term] = course_data
+            self._start_load(course_data)
+        self._last_used[term] = time.monotonic()
+        self.evict()
+        return course_data
+
+    def block_location(self, term=None):
+        """
+        Get the SIS block page for a term. Never loads or registers the term's course data.
+        :param term: The term code, defaults to the active term
+
+        :return: The BlockLocation for the term
+        :raises ValueError: If the term isn't a valid term code
+        """
+        term = validate_term(term or self.active_term)
+        block_location = self._block_locations.get(term)
+        if block_location is None:
+            block_location = BlockLocation(term, http=self.http)
+            self._block_locations[term] = block_location
+        self._block_last_used[term] = time.monotonic()
+        self.evict()
+        return block_location
+
+    def peek(self, term=None):
+        """
+        Get the CourseData for a term only if it's already registered. Never starts a load or evicts anything,
+        so it's safe for autocomplete, where every keystroke would otherwise register whatever was typed.
+        :param term: The term code, defaults to the active term
+
+        :return: The CourseData for the term, or None if it isn't registered or isn't a valid term code
+        """
+        try:
+            term = validate_term(term or self.active_term)
+        except ValueError:
+            return None
+        return self._terms.get(term)
+
+    def _start_load(self, course_data):
+        task = self._loads.get(course_data.term)
+        if task is None or task.done():
+            self._loads[course_data.term] = asyncio.create_task(self._load(course_data))
+
+    async def _load(self, course_data):
+        try:
+            await course_data.load(self.http)
+        except Exception as e:
+            _log.exception(f"Failed to load course data for {course_data.term}: {e}")
 
-            if first_column_text.startswith(crn):
-                capturing = True
-                section_blocks.append(columns)
+    def evict(self):
+        """
+        Drop idle terms and SIS block pages, then the least recently used ones while over max_terms.
+        The active term is kept.
+        """
+        now = time.monotonic()
+        for term in self._evictable(self._terms, self._last_used, now):
+            self._drop(term)
+        for term in self._evictable(self._block_locations, self._block_last_used, now):
+            self._block_locations.pop(term, None)
+            self._block_last_used.pop(term, None)
+
+    def _evictable(self, entries, last_used, now):
+        """:return: The terms of entries to drop, least recently used first"""
+        candidates = sorted(
+            (term for term in entries if term != self.active_term),
+            key=lambda term: last_used.get(term, 0),
+        )
+        remaining = len(entries)
+        evictable = []
+        for term in candidates:
+            if now - last_used.get(term, 0) > self.idle_timeout or remaining > self.max_terms:
+                evictable.append(term)
+                remaining -= 1
+        return evictable
+
+    def _drop(self, term):
+        self._terms.pop(term, None)
+        self._last_used.pop(term, None)
+        task = self._loads.pop(term, None)
+        if task is not None:
+            task.cancel()
+        _log.info(f"Evicted course data for {term}.")
+
+    async def refresh(self):
+        """
+        Refresh every loaded term, retrying the initial load of terms that failed to load or loaded partially.
+
+        :return: A dict of term -> list of SeatChange
+        """
+        self.evict()
+        changes = {}
+        for term, course_data in list(self._terms.items()):
+            if not course_data.is_ready:
+                self._start_load(course_data)
                 continue
+            if not course_data.is_complete:
+                # Published without some files on a partial cold start, try fetching them again.
+                self._start_load(course_data)
+            changes[term] = await course_data.refresh(self.http)
+        return changes
+
+    def close(self):
+        for task in self._loads.values():
+            task.cancel()
+        self._loads.clear()
 
-            if capturing and first_column_text == "":
-                section_blocks.append(columns)
 
-            elif capturing and first_column_text != "":
-                break
+class BlockLocation:
+    """
+    The SIS class schedule page for a term, parsed once into a CRN -> blocks dictionary.
+    The page is re-checked with a conditional GET once it's older than ttl seconds, so most lookups never
+    touch the network and an unchanged page is never downloaded or parsed again.
+    """
+
+    def __init__(self, term=ACTIVE_TERM, ttl=30 * 60, http=None):
+        self.term = validate_term(term)
+        self.http = http
+        self.block_url = f"https://sis.rpi.edu/reg/zs{self.term}.htm"
+        self.ttl = ttl
+        self.blocks = {}
+        self.fetched_at = None
+        self.etag = None
+        self.last_modified = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def is_stale(self):
+        return self.fetched_at is None or time.monotonic() - self.fetched_at > self.ttl
+
+    async def fetch_blocks(self):
+        """
+        Stream the page through SISBlockParser as it downloads.
+
+        :return: A dict of {CRN: list of rows}, or None if the page hasn't changed since the last fetch
+        """
+        headers = {}
+        if self.blocks and self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.blocks and self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        async with (self.http or get_http_session()).get(self.block_url, headers=headers) as response:
+            if response.status == 304:
+                return None
+            response.raise_for_status()
+            decoder = codecs.getincrementaldecoder(response.charset or "latin-1")(errors="replace")
+            parser = SISBlockParser()
+
+            def feed(chunk, final=False):
+                parser.feed(decoder.decode(chunk, final=final))
+                if final:
+                    parser.close()
+
+            # Parsing the whole page takes most of a second, so each chunk is parsed in an executor as it
+            # arrives rather than on the event loop. Chunks are fed one at a time, in order.
+            loop = asyncio.get_running_loop()
+            async for chunk in response.content.iter_chunked(64 * 1024):
+                await loop.run_in_executor(None, feed, chunk)
+            await loop.run_in_executor(None, feed, b"", True)
+            self.etag = response.headers.get("ETag")
+            self.last_modified = response.headers.get("Last-Modified")
+            return parser.blocks
+
+    async def refresh(self):
+        """
+        Re-download and re-parse the page if it's stale. Concurrent callers share one download.
+        """
+        async with self._lock:
+            if not self.is_stale:
+                return
+            try:
+                blocks = await self.fetch_blocks()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                _log.warning(f"Failed to fetch {self.block_url}: {e!r}")
+                if not self.blocks:
+                    return
+                # Keep serving the last good copy, and don't retry on every command.
+                blocks = None
+            if blocks is not None:
+                self.blocks = blocks
+            self.fetched_at = time.monotonic()
+
+    async def find_class_type(self, crn):
+        if self.is_stale:
+            await self.refresh()
 
+        section_blocks = self.blocks.get(str(crn).strip())
         if section_blocks:
             return section_blocks
         else:
-            return "CRN not found or no blocks associated."
\ No newline at end of file
+            return "CRN not found or no blocks associated."
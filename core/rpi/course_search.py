@@ -0,0 +1,119 @@
+"""
+In-memory search over subject codes, course numbers and titles, used to autocomplete the QuACS commands.
+
+The index is built once per set of courses (off the event loop, with the rest of CourseData.derive()) and
+answers in well under a millisecond, so it keeps up with Discord's autocomplete requests while people type.
+"""
+
+import re
+from collections import Counter
+
+from core.cache import LRUCache
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+_COURSE_ID = re.compile(r"^([a-z]{2,4})[\s-]*(\d{0,4})$")
+
+
+def normalize(text):
+    return _NON_ALNUM.sub(" ", str(text).lower()).strip()
+
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class CourseEntry:
+    __slots__ = ("id", "subj", "crse", "title")
+
+    def __init__(self, subj, crse, title):
+        self.id = f"{subj}-{crse}"
+        self.subj = subj
+        self.crse = crse
+        self.title = title
+
+    @property
+    def label(self):
+        # Autocomplete choice names are capped at 100 characters.
+        return f"{self.id} · {self.title}"[:100]
+
+
+class CourseSearchIndex:
+    """
+    `subjects`: Every subject code, sorted
+    `entries`: Every course as a CourseEntry, sorted by course ID
+    """
+
+    def __init__(self, courses_data, catalog_data=None):
+        catalog_data = catalog_data or {}
+        self.subjects = sorted(subject['code'] for subject in courses_data or [])
+        self.entries = []
+        self._by_subject = {}
+        self._postings = {}
+        self._results = LRUCache(maxsize=4096)
+
+        for subject in courses_data or []:
+            for course in subject['courses']:
+                catalog = catalog_data.get(f"{subject['code']}-{course['crse']}") or {}
+                self.entries.append(CourseEntry(subject['code'], int(course['crse']), catalog.get('name') or course['title']))
+        self.entries.sort(key=lambda entry: (entry.subj, entry.crse))
+
+        for position, entry in enumerate(self.entries):
+            self._by_subject.setdefault(entry.subj, []).append(entry)
+            for gram in trigrams(normalize(f"{entry.subj} {entry.crse} {entry.title}")):
+                self._postings.setdefault(gram, []).append(position)
+
+    def match_subjects(self, query, limit=25):
+        prefix = query.strip().upper()
+        return [subj for subj in self.subjects if subj.startswith(prefix)][:limit]
+
+    def course_numbers(self, subj, prefix="", limit=25):
+        """
+        Courses of one subject whose number starts with prefix.
+        :param subj: The subject code (e.g., CSCI)
+        :param prefix: What the user typed so far
+
+        :return: A list of CourseEntry
+        """
+        prefix = str(prefix).strip()
+        entries = self._by_subject.get(str(subj).strip().upper(), [])
+        return [entry for entry in entries if str(entry.crse).startswith(prefix)][:limit]
+
+    def search(self, query, limit=25):
+        """
+        Find courses by ID prefix (CSCI-12, math 20) or fuzzily by title (data struct, calclus).
+        :param query: What the user typed so far
+
+        :return: A list of CourseEntry, best match first
+        """
+        query = normalize(query)
+        key = (query, limit)
+        cached = self._results.get(key)
+        if cached is not None:
+            return cached
+
+        results = self._search(query, limit)
+        self._results.put(key, results)
+        return results
+
+    def _search(self, query, limit):
+        if not query:
+            return self.entries[:limit]
+
+        id_match = _COURSE_ID.match(query)
+        if id_match:
+            subj, number = id_match.group(1).upper(), id_match.group(2)
+            if subj in self._by_subject:
+                return self.course_numbers(subj, number, limit)
+
+        grams = trigrams(query)
+        hits = Counter()
+        for gram in grams:
+            hits.update(self._postings.get(gram, ()))
+        # Require about half of the query's trigrams so typos still match but noise doesn't.
+        threshold = max(1, len(grams) // 2)
+        ranked = sorted(
+            (position for position, count in hits.items() if count >= threshold),
+            key=lambda position: (-hits[position], position),
+        )
+        return [self.entries[position] for position in ranked[:limit]]
@@ -6,15 +6,45 @@ import time
 
 import discord
 from discord.ui import Modal, TextInput, View, Button
-from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail
 
-from core import database
+from core import async_db, database
+from core.http_session import get_http_session
+
+SENDGRID_URL = "https://api.sendgrid.com/v3/mail/send"
+VERIFICATION_TEMPLATE_ID = "d-18c06f10e9164d0cb22a2c3d77cee2c6"
+
 
 def generate_verification_code():
     return str(random.randint(100000, 999999))
 
 
+def store_verification_code(discord_id, email, verification_code, class_year):
+    """Replace any pending verification code of a user with a new one."""
+    with database.db.atomic():
+        database.EmailVerification.delete().where(database.EmailVerification.discord_id == discord_id).execute()
+        database.EmailVerification.create(
+            discord_id=discord_id, email=email, verification_code=verification_code, class_year=class_year
+        )
+
+
+async def send_template_email(http, to_email, template_id, template_data, subject='Verification Email'):
+    """
+    Send a SendGrid dynamic template email through the bot's HTTP session.
+    :raises aiohttp.ClientError: If SendGrid can't be reached or rejects the email
+    """
+    payload = {
+        "from": {"email": "no-reply@charlotteverifies.site"},
+        "personalizations": [
+            {"to": [{"email": to_email}], "subject": subject, "dynamic_template_data": template_data}
+        ],
+        "template_id": template_id,
+    }
+    headers = {"Authorization": f"Bearer {os.getenv('SENDGRID')}"}
+    # A retried send could deliver the code twice, so SendGrid requests are never retried.
+    async with http.post(SENDGRID_URL, json=payload, headers=headers, retries=0) as response:
+        response.raise_for_status()
+
+
 class EmailVerificationModal(Modal):
     email = TextInput(label="RPI Email", placeholder="Enter your @rpi.edu email", required=True, max_length=50)
     class_year = TextInput(label="Class Year", placeholder="Enter your class year (e.g., 2025)", required=True, max_length=4)
@@ -33,15 +63,15 @@ class EmailVerificationModal(Modal):
             await interaction.response.send_message("Please use a valid @rpi.edu email address.", ephemeral=True)
             return
 
-        check = database.FinalizedEmailVerification.select().where(database.FinalizedEmailVerification.email == rpi_email)
-        if check.exists():
-            for record in check:
-                print("e:" + str(record.discord_id) + ":" + str(interaction.user.id))
-                if record.discord_id != interaction.user.id:
-                    await interaction.response.send_message(
-                        "This email has already been used for verification. Please use a different email.",
-                        ephemeral=True)
-                    return
+        used_elsewhere = await async_db.exists(database.FinalizedEmailVerification.select().where(
+            database.FinalizedEmailVerification.email == rpi_email,
+            database.FinalizedEmailVerification.discord_id != interaction.user.id
+        ))
+        if used_elsewhere:
+            await interaction.response.send_message(
+                "This email has already been used for verification. Please use a different email.",
+                ephemeral=True)
+            return
         #return await interaction.response.send_message("Please wait while we send a verification email to your RPI email...", ephemeral=True)
 
         if not self.class_year.value.isdigit() or len(self.class_year.value) != 4 or int(self.class_year.value) < 2022 or int(self.class_year.value) > 2030:
@@ -49,31 +79,20 @@ class EmailVerificationModal(Modal):
             return
 
         verification_code = generate_verification_code()
-        check = database.EmailVerification.select().where(database.EmailVerification.discord_id == interaction.user.id)
-        if check.count() > 0:
-            for record in check:
-                record.delete_instance()
-
-        q = database.EmailVerification.create(discord_id=interaction.user.id, email=rpi_email, verification_code=verification_code, class_year=self.class_year.value)
-        q.save()
-
-        message = Mail(
-            from_email='no-reply@charlotteverifies.site',
-            to_emails=rpi_email,
-            subject='Verification Email'
+        await async_db.run(
+            store_verification_code, interaction.user.id, rpi_email, verification_code, self.class_year.value
         )
-        message.dynamic_template_data = {
+
+        template_data = {
             'twilio_code': str(verification_code),
             'discord_username': interaction.user.name,
             'discord_id': interaction.user.id,
             'timestamp': datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
         }
-        message.template_id = "d-18c06f10e9164d0cb22a2c3d77cee2c6"
 
         try:
-            sendgrid_client = SendGridAPIClient(os.getenv("SENDGRID"))
-            response = sendgrid_client.send(message)
-        except:
+            await send_template_email(get_http_session(self.bot), rpi_email, VERIFICATION_TEMPLATE_ID, template_data)
+        except Exception:
             await interaction.response.send_message("Looks like the SendGrid API is down. Please try again later. (Contact <@409152798609899530> if this keeps happening.)", ephemeral=True)
             return
         await interaction.response.send_message(
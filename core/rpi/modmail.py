@@ -5,7 +5,7 @@ import asyncio
 import io
 import chat_exporter
 from chat_exporter import AttachmentToDiscordChannelHandler
-from core import database
+from core import async_db, database
 from core.logging_module import get_log
 
 
@@ -43,10 +43,10 @@ class CloseButton(discord.ui.Button):
 
 
         channel = interaction.channel
-        ticket: database.TicketInfo = database.TicketInfo.select().where(
-            database.TicketInfo.channel_id == channel.id).get()
+        ticket: database.TicketInfo = await async_db.run(database.TicketInfo.select().where(
+            database.TicketInfo.channel_id == channel.id).get)
 
-        ticket.delete_instance()
+        await async_db.run(ticket.delete_instance)
 
         transcript = await chat_exporter.export(interaction.channel)
 
@@ -99,17 +99,9 @@ class TicketCreateButton(discord.ui.Button):
         # Update the cooldown timestamp
         self.cooldowns[user_id] = current_time
 
-        base_info: database.BaseTickerInfo = database.BaseTickerInfo.select().where(database.BaseTickerInfo.id == 1)
-        if not base_info.exists():
-            base_info = database.BaseTickerInfo.create(counter=1)
-        else:
-            base_info = base_info.get()
-
+        ticket_number = await async_db.run(self._next_ticket_number)
         guild = interaction.guild
         author = interaction.user
-        ticket_number = base_info.counter
-        base_info.counter += 1
-        base_info.save()
 
         # Create a new text channel for the ticket
         channel_name = f"ticket-{author.name}-{ticket_number}"
@@ -138,11 +130,19 @@ class TicketCreateButton(discord.ui.Button):
             f"Hello {author.mention}!\nPlease describe your issue here and we'll be with you shortly.")
 
         # Update the database
-        ticket: database.TicketInfo = database.TicketInfo.create(
-            channel_id=ticket_channel.id,
-            author_id=author.id
-        )
-        ticket.save()
+        await async_db.run(database.TicketInfo.create, channel_id=ticket_channel.id, author_id=author.id)
+
+    @staticmethod
+    def _next_ticket_number():
+        """Take the next ticket number from the BaseTickerInfo counter. Blocking, run it through async_db."""
+        with database.db.atomic():
+            base_info = database.BaseTickerInfo.select().where(database.BaseTickerInfo.id == 1).first()
+            if base_info is None:
+                base_info = database.BaseTickerInfo.create(counter=1)
+            ticket_number = base_info.counter
+            base_info.counter += 1
+            base_info.save()
+        return ticket_number
 
     async def on_error(self, interaction: discord.Interaction, error: Exception) -> None:
         _log = get_log(__name__)
@@ -0,0 +1,129 @@
+"""
+Prerequisite expressions compiled from QuACS ``prerequisites.json``.
+
+Each CRN's prerequisites are turned into a normalized and/or tree once per data version (nested groups using the
+same operator are flattened, duplicate courses dropped and single-child groups collapsed), and the text shown in
+Discord is rendered at the same time so commands only do a dictionary lookup.
+"""
+
+from core.rpi.quacs_base import CompactRestriction
+
+# Discord rejects embed field values longer than this.
+FIELD_LIMIT = 1024
+
+
+class PrereqCourse:
+    __slots__ = ("course", "min_grade")
+
+    def __init__(self, course, min_grade=None):
+        self.course = course
+        self.min_grade = min_grade
+
+    def __eq__(self, other):
+        return isinstance(other, PrereqCourse) and (self.course, self.min_grade) == (other.course, other.min_grade)
+
+    def __hash__(self):
+        return hash((self.course, self.min_grade))
+
+    def render(self, parent_op=None):
+        if self.min_grade:
+            return f"{self.course} (min grade: {self.min_grade})"
+        return self.course
+
+
+class PrereqGroup:
+    __slots__ = ("op", "children")
+
+    def __init__(self, op, children):
+        self.op = op
+        self.children = tuple(children)
+
+    def render(self, parent_op=None):
+        text = f" {self.op} ".join(child.render(self.op) for child in self.children)
+        # Only parenthesize where precedence would otherwise be ambiguous.
+        return f"({text})" if parent_op is not None and parent_op != self.op else text
+
+
+class CompiledPrereqs:
+    """
+    `tree`: The normalized PrereqCourse/PrereqGroup expression, or None
+    `restrictions`: A CompactRestriction, or None
+    `text`: The rendered prerequisites, "None" if there aren't any
+    `restrictions_text`: The rendered restrictions, "None" if there aren't any
+    `summary`: Prerequisites and restrictions together, as shown by /quacs class_info
+    """
+    __slots__ = ("tree", "restrictions", "text", "restrictions_text", "summary")
+
+    def __init__(self, tree, restrictions):
+        self.tree = tree
+        self.restrictions = restrictions
+        self.text = _truncate(tree.render()) if tree is not None else "None"
+        self.restrictions_text = _truncate(str(restrictions)) if restrictions is not None else "None"
+        if restrictions is not None:
+            self.summary = _truncate(f"{self.text}\n\n**Restrictions:** {self.restrictions_text}")
+        else:
+            self.summary = self.text
+
+
+def _truncate(text, limit=FIELD_LIMIT):
+    return text if len(text) <= limit else text[:limit - 3] + "..."
+
+
+def compile_expression(raw):
+    """
+    Compile one QuACS prerequisite expression.
+    :param raw: A {"type": "course", ...} leaf or a {"type": "and"/"or", "nested": [...]} group
+
+    :return: A PrereqCourse/PrereqGroup, or None if the expression is empty
+    """
+    if not raw:
+        return None
+    if "nested" not in raw:
+        course = raw.get("course")
+        return PrereqCourse(course, raw.get("min_grade")) if course else None
+
+    op = raw.get("type", "and")
+    children = []
+    for item in raw["nested"]:
+        child = compile_expression(item)
+        if child is None:
+            continue
+        if isinstance(child, PrereqGroup) and child.op == op:
+            children.extend(child.children)
+        else:
+            children.append(child)
+
+    unique = []
+    for child in children:
+        if isinstance(child, PrereqCourse) and child in unique:
+            continue
+        unique.append(child)
+
+    if not unique:
+        return None
+    if len(unique) == 1:
+        return unique[0]
+    return PrereqGroup(op, unique)
+
+
+def compile_prereqs(prereqs_data):
+    """
+    Compile every CRN in prerequisites.json.
+    :param prereqs_data: The decoded prerequisites.json
+
+    :return: A dict of CRN (int) -> CompiledPrereqs, CRNs without prerequisites or restrictions are left out
+    """
+    compiled = {}
+    for crn, entry in (prereqs_data or {}).items():
+        tree = compile_expression(entry.get("prerequisites"))
+        restrictions_data = entry.get("restrictions")
+        restrictions = None
+        if restrictions_data and (restrictions_data.get("major") or restrictions_data.get("classification")):
+            restrictions = CompactRestriction(
+                major=restrictions_data.get("major"),
+                classification=restrictions_data.get("classification"),
+            )
+        if tree is None and restrictions is None:
+            continue
+        compiled[int(crn)] = CompiledPrereqs(tree, restrictions)
+    return compiled
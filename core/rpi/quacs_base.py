@@ -1,3 +1,6 @@
+import sys
+from types import MappingProxyType
+
 class TimeSlot:
     def __init__(self, dateEnd, dateStart, days, instructor, location, timeEnd, timeStart):
         self.date_end = dateEnd
@@ -91,4 +94,153 @@ class Restriction:
         if self.classification:
             must_be_str = ', '.join(self.classification.get('must_be', []))
             restriction_strs.append(f"Must be classified as: {must_be_str}")
-        return "; ".join(restriction_strs) if restriction_strs else "No restrictions"
\ No newline at end of file
+        return "; ".join(restriction_strs) if restriction_strs else "No restrictions"
+
+
+"""
+COMPACT MODELS
+
+Slotted, immutable versions of the models above for holding a whole semester in memory.
+Repeated strings (subjects, instructors, locations, dates, ...) are interned so every section shares one copy,
+and meeting days are stored as a bitmask instead of a list. They take the same arguments as the models above
+(so `CompactCourse(**row)` works on a raw QuACS row) and render the same text.
+"""
+
+DAY_BITS = {"M": 1, "T": 2, "W": 4, "R": 8, "F": 16, "S": 32, "U": 64}
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def days_to_mask(days):
+    mask = 0
+    for day in days:
+        mask |= DAY_BITS.get(day, 0)
+    return mask
+
+
+def mask_to_days(mask):
+    return [day for day, bit in DAY_BITS.items() if mask & bit]
+
+
+class _Compact:
+    __slots__ = ()
+
+    def _set(self, name, value):
+        object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+
+class CompactTimeSlot(_Compact):
+    __slots__ = ("date_end", "date_start", "day_mask", "instructor", "location", "time_end", "time_start")
+
+    def __init__(self, dateEnd, dateStart, days, instructor, location, timeEnd, timeStart):
+        self._set("date_end", _intern(dateEnd))
+        self._set("date_start", _intern(dateStart))
+        self._set("day_mask", days_to_mask(days))
+        self._set("instructor", _intern(instructor))
+        self._set("location", _intern(location))
+        self._set("time_end", timeEnd)
+        self._set("time_start", timeStart)
+
+    @property
+    def days(self):
+        return mask_to_days(self.day_mask)
+
+    __str__ = TimeSlot.__str__
+    convert_to_12hr_format = TimeSlot.convert_to_12hr_format
+
+
+class CompactSection(_Compact):
+    __slots__ = (
+        "act", "attribute", "cap", "cred_max", "cred_min", "crn", "crse", "rem", "sec", "subj", "timeslots", "title",
+        "xl_rem",
+    )
+
+    def __init__(self, act, attribute, cap, credMax, credMin, crn, crse, rem, sec, subj, timeslots, title, xl_rem=None):
+        self._set("act", act)
+        self._set("attribute", _intern(attribute))
+        self._set("cap", cap)
+        self._set("cred_max", credMax)
+        self._set("cred_min", credMin)
+        self._set("crn", crn)
+        self._set("crse", crse)
+        self._set("rem", rem)
+        self._set("sec", _intern(sec))
+        self._set("subj", _intern(subj))
+        self._set("timeslots", tuple(CompactTimeSlot(**timeslot) for timeslot in timeslots))
+        self._set("title", _intern(title))
+        self._set("xl_rem", xl_rem)
+
+    __str__ = Section.__str__
+
+
+class CompactCourse(_Compact):
+    """Sections are only built the first time they're accessed, most lookups just need the course title."""
+    __slots__ = ("crse", "id", "subj", "title", "_section_rows", "_sections")
+
+    def __init__(self, crse, id, sections, subj, title):
+        self._set("crse", crse)
+        self._set("id", _intern(id))
+        self._set("subj", _intern(subj))
+        self._set("title", _intern(title))
+        self._set("_section_rows", sections)
+        self._set("_sections", None)
+
+    @property
+    def sections(self):
+        if self._sections is None:
+            self._set("_sections", tuple(CompactSection(**section) for section in self._section_rows))
+            self._set("_section_rows", None)
+        return self._sections
+
+    __str__ = Course.__str__
+
+
+class CompactCourseCatalog(_Compact):
+    __slots__ = ("subj", "crse", "name", "description", "source")
+
+    def __init__(self, subj, crse, name, description, source):
+        self._set("subj", _intern(subj))
+        self._set("crse", _intern(crse))
+        self._set("name", name)
+        self._set("description", description)
+        self._set("source", _intern(source))
+
+    __str__ = CourseCatalog.__str__
+
+
+class CompactPrerequisite(_Compact):
+    __slots__ = ("course", "min_grade", "type")
+
+    def __init__(self, course, min_grade, type):
+        if isinstance(course, list):
+            course = tuple(course)
+        self._set("course", _intern(course))
+        self._set("min_grade", _intern(min_grade))
+        self._set("type", _intern(type))
+
+    __str__ = Prerequisite.__str__
+
+
+class CompactRestriction(_Compact):
+    __slots__ = ("major", "classification")
+
+    def __init__(self, major=None, classification=None):
+        self._set("major", self._freeze(major))
+        self._set("classification", self._freeze(classification))
+
+    @staticmethod
+    def _freeze(restriction):
+        return MappingProxyType({
+            _intern(key): tuple(_intern(value) for value in values) if isinstance(values, list) else _intern(values)
+            for key, values in (restriction or {}).items()
+        })
+
+    __str__ = Restriction.__str__
@@ -0,0 +1,110 @@
+"""
+On-disk snapshots of the QuACS data files.
+
+Every file downloaded from GitHub is kept next to the validators (ETag/Last-Modified) it was served with,
+so restarts can start from the local copy and only ask GitHub whether anything changed.
+"""
+
+import json
+import os
+from pathlib import Path
+
+from core.logging_module import get_log
+
+_log = get_log(__name__)
+
+DEFAULT_CACHE_DIR = os.getenv("QUACS_CACHE_DIR", "cache/quacs")
+
+
+class SnapshotStore:
+    """
+    Stores the last good copy of each QuACS file under ``directory``.
+
+    `<name>.json`: The raw response body.
+    `<name>.meta.json`: The ETag and Last-Modified headers the body was served with, and the size and mtime
+    of the body they belong to. Metadata that doesn't match the body on disk is ignored.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = Path(directory or DEFAULT_CACHE_DIR)
+
+    def _body_path(self, name):
+        return self.directory / f"{name}.json"
+
+    def _meta_path(self, name):
+        return self.directory / f"{name}.meta.json"
+
+    def read(self, name):
+        """
+        Read and decode a snapshot.
+        :param name: The file name, a key of CourseData.FILES
+
+        :return: The decoded JSON, or None if there's no usable snapshot
+        """
+        try:
+            with open(self._body_path(name), "rb") as f:
+                return json.loads(f.read())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            _log.warning(f"Ignoring unreadable QuACS snapshot {name}: {e!r}")
+            return None
+
+    def read_meta(self, name):
+        """:return: The snapshot's validators, empty if they're missing or belong to a different body"""
+        try:
+            with open(self._meta_path(name), "r") as f:
+                meta = json.load(f)
+            body = os.stat(self._body_path(name))
+        except (OSError, ValueError):
+            return {}
+        if meta.get("size") != body.st_size or meta.get("mtime_ns") != body.st_mtime_ns:
+            _log.warning(f"Ignoring QuACS snapshot metadata for {name}, it doesn't match the snapshot.")
+            return {}
+        return meta
+
+    def conditional_headers(self, name):
+        """
+        Build the revalidation headers for a snapshot.
+        :param name: The file name, a key of CourseData.FILES
+
+        :return: A dict with If-None-Match/If-Modified-Since, empty if nothing is known about the file
+        """
+        meta = self.read_meta(name)
+        headers = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    def write(self, name, body, etag=None, last_modified=None):
+        """
+        Replace a snapshot. The body and metadata are written to temporary files and renamed into place,
+        so a crash mid-write never leaves a truncated snapshot behind. The old metadata is removed before the
+        body is replaced and the new one written last, so validators never outlive the body they describe.
+        :param name: The file name, a key of CourseData.FILES
+        :param body: The raw response body
+        :param etag: The ETag header of the response
+        :param last_modified: The Last-Modified header of the response
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        body_path = self._body_path(name)
+        meta_path = self._meta_path(name)
+
+        tmp_body = body_path.with_suffix(".json.tmp")
+        with open(tmp_body, "wb") as f:
+            f.write(body)
+        try:
+            os.remove(meta_path)
+        except FileNotFoundError:
+            pass
+        os.replace(tmp_body, body_path)
+
+        stat = os.stat(body_path)
+        tmp_meta = meta_path.with_suffix(".tmp")
+        with open(tmp_meta, "w") as f:
+            json.dump(
+                {"etag": etag, "last_modified": last_modified, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}, f
+            )
+        os.replace(tmp_meta, meta_path)
@@ -0,0 +1,137 @@
+"""
+Enumerates conflict-free section combinations for a list of courses.
+
+Sections are reduced to their weekly bitmask from ConflictMatrix as a Python int, and sections of a course
+that meet at exactly the same times are merged, so the search branches over distinct meeting patterns
+instead of every section. Courses with the fewest patterns are placed first, every partial schedule is
+checked for a course that no longer fits, and the search stops at a hard deadline so a command with several
+large courses can't run away.
+"""
+
+import re
+import time
+from typing import NamedTuple
+
+# "CSCI-1200", "CSCI 1200", "csci1200"
+_COURSE_ID = re.compile(r"\b([A-Za-z]{4})\s*-?\s*(\d{4})\b")
+
+# Check the clock every this many search nodes, time.monotonic() is slower than a mask AND.
+_CLOCK_INTERVAL = 256
+
+
+class SectionGroup(NamedTuple):
+    """Sections of one course that meet at identical times."""
+    course_id: str
+    mask: int
+    crns: tuple
+
+
+class BuildResult(NamedTuple):
+    schedules: list
+    count: int
+    timed_out: bool
+    missing: list
+
+
+def section_groups(course_data, course_id, open_only=False):
+    """
+    Group a course's sections by meeting pattern.
+    :param course_data: A ready CourseData
+    :param course_id: The course, e.g. CSCI-1200
+    :param open_only: Skip sections with no seats left
+
+    :return: A list of SectionGroup, or None if the course doesn't exist
+    """
+    subj, _, crse = course_id.strip().upper().partition("-")
+    course = course_data.index.course(subj, crse)
+    if course is None:
+        return None
+
+    conflicts = course_data.conflicts
+    groups = {}
+    for section in course['sections']:
+        if open_only and section['rem'] <= 0:
+            continue
+        mask = conflicts.mask(section['crn'])
+        if mask is None:
+            continue
+        groups.setdefault(int.from_bytes(mask.tobytes(), "little"), []).append(section['crn'])
+    return [SectionGroup(course['id'], mask, tuple(crns)) for mask, crns in groups.items()]
+
+
+def build_schedules(course_groups, limit=25, time_budget=2.0):
+    """
+    Enumerate every combination of one SectionGroup per course with no overlapping meetings.
+    :param course_groups: A list with each course's list of SectionGroup
+    :param limit: How many schedules to keep, the rest are only counted
+    :param time_budget: Seconds to search before giving up with a partial count
+
+    :return: A (schedules, count, timed out) tuple, each schedule being a list of SectionGroup
+    """
+    deadline = time.monotonic() + time_budget
+    ordered = sorted(course_groups, key=len)
+    schedules = []
+    count = 0
+    nodes = 0
+    timed_out = False
+    chosen = []
+
+    def search(depth, used):
+        nonlocal count, nodes, timed_out
+        if depth == len(ordered):
+            count += 1
+            if len(schedules) < limit:
+                schedules.append(list(chosen))
+            return
+        for group in ordered[depth]:
+            if group.mask & used:
+                continue
+            nodes += 1
+            if nodes % _CLOCK_INTERVAL == 0 and time.monotonic() > deadline:
+                timed_out = True
+            if timed_out:
+                return
+            combined = used | group.mask
+            # Prune as soon as some later course has no pattern left that fits.
+            if any(all(other.mask & combined for other in later) for later in ordered[depth + 1:]):
+                continue
+            chosen.append(group)
+            search(depth + 1, combined)
+            chosen.pop()
+
+    if ordered and all(ordered):
+        search(0, 0)
+    return schedules, count, timed_out
+
+
+def parse_course_ids(text):
+    """
+    Pull course IDs out of a user's list, normalized to SUBJ-NNNN.
+    :param text: e.g. "CSCI-1200, math 2010 CSCI1100"
+
+    :return: (course IDs without duplicates, anything left over that isn't a course ID)
+    """
+    course_ids = list(dict.fromkeys(f"{subj.upper()}-{crse}" for subj, crse in _COURSE_ID.findall(text)))
+    leftover = [part for part in re.split(r"[\s,;]+", _COURSE_ID.sub(" ", text)) if part]
+    return course_ids, leftover
+
+
+def build_for_courses(course_data, course_ids, open_only=False, limit=25, time_budget=2.0):
+    """
+    Look up a list of course IDs and enumerate their conflict-free schedules.
+    This can take up to time_budget seconds, run it in an executor.
+
+    :return: A BuildResult, missing lists the course IDs that don't exist
+    """
+    course_groups = []
+    missing = []
+    for course_id in course_ids:
+        groups = section_groups(course_data, course_id, open_only)
+        if groups is None:
+            missing.append(course_id)
+        else:
+            course_groups.append(groups)
+    if missing:
+        return BuildResult([], 0, False, missing)
+    schedules, count, timed_out = build_schedules(course_groups, limit, time_budget)
+    return BuildResult(schedules, count, timed_out, [])
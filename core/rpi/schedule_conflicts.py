@@ -0,0 +1,115 @@
+"""
+Precomputed weekly meeting patterns for every section, used to find schedule conflicts.
+
+Each section's timeslots are rasterized once into a fixed-width bitmask of 5 weekdays x 288 five-minute slots,
+packed into NUM_WORDS uint64 words. Two sections overlap exactly when their masks share a bit, so checking a
+section against a whole schedule is a single vectorized AND instead of comparing start/end pairs.
+"""
+
+import numpy as np
+
+SLOT_MINUTES = 5
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+WEEKDAYS = "MTWRF"
+NUM_WORDS = -(-len(WEEKDAYS) * SLOTS_PER_DAY // 64)
+
+
+def _minutes(hhmm):
+    return (hhmm // 100) * 60 + hhmm % 100
+
+
+def section_bits(timeslots):
+    """
+    Rasterize a section's timeslots into a flat boolean week.
+    :param timeslots: The raw QuACS timeslot dicts of a section
+
+    :return: A bool array of NUM_WORDS * 64 slots
+    """
+    week = np.zeros(NUM_WORDS * 64, dtype=bool)
+    for timeslot in timeslots:
+        start, end = timeslot['timeStart'], timeslot['timeEnd']
+        # TBA sections are listed with -1 times.
+        if start is None or end is None or start < 0 or end <= start:
+            continue
+        first = _minutes(start) // SLOT_MINUTES
+        last = -(-_minutes(end) // SLOT_MINUTES)
+        for day in timeslot['days']:
+            offset = WEEKDAYS.find(day)
+            if offset >= 0:
+                week[offset * SLOTS_PER_DAY + first:offset * SLOTS_PER_DAY + last] = True
+    return week
+
+
+def pack(bits):
+    return np.packbits(bits, axis=-1).view(np.uint64)
+
+
+class ConflictMatrix:
+    """
+    `masks`: A (sections, NUM_WORDS) uint64 array, one weekly bitmask per section
+    `rows`: Maps a CRN to its row in masks
+    """
+
+    def __init__(self, courses_data):
+        sections = [
+            section
+            for subject in courses_data or []
+            for course in subject['courses']
+            for section in course['sections']
+        ]
+        self.rows = {int(section['crn']): row for row, section in enumerate(sections)}
+        bits = np.zeros((len(sections), NUM_WORDS * 64), dtype=bool)
+        for row, section in enumerate(sections):
+            bits[row] = section_bits(section['timeslots'])
+        self.masks = pack(bits) if sections else np.zeros((0, NUM_WORDS), dtype=np.uint64)
+
+    def updated(self, sections):
+        """
+        Build the next matrix with some sections' meeting times replaced, leaving this one untouched.
+        :param sections: The raw QuACS section dicts whose timeslots changed, all already in this matrix
+
+        :return: A new ConflictMatrix sharing rows with this one
+        """
+        matrix = ConflictMatrix(None)
+        matrix.rows = self.rows
+        matrix.masks = self.masks.copy()
+        for section in sections:
+            matrix.masks[self.rows[int(section['crn'])]] = pack(section_bits(section['timeslots']))
+        return matrix
+
+    def mask(self, crn):
+        row = self.rows.get(int(crn))
+        return None if row is None else self.masks[row]
+
+    def _known(self, crns):
+        return [int(crn) for crn in crns if int(crn) in self.rows]
+
+    def conflicts_with(self, crn, crns):
+        """
+        Find which of a set of sections overlap one section.
+        :param crn: The section to check
+        :param crns: The sections to check it against, e.g. a user's schedule
+
+        :return: A list of the CRNs in crns that meet at the same time as crn
+        """
+        mask = self.mask(crn)
+        others = [other for other in self._known(crns) if other != int(crn)]
+        if mask is None or not others:
+            return []
+        overlaps = np.any(self.masks[[self.rows[other] for other in others]] & mask, axis=1)
+        return [other for other, overlap in zip(others, overlaps) if overlap]
+
+    def conflicting_pairs(self, crns):
+        """
+        Find every overlapping pair in a schedule.
+        :param crns: The sections in the schedule
+
+        :return: A list of (crn, crn) tuples, each pair listed once
+        """
+        crns = list(dict.fromkeys(self._known(crns)))
+        if len(crns) < 2:
+            return []
+        masks = self.masks[[self.rows[crn] for crn in crns]]
+        overlaps = np.any(masks[:, None, :] & masks[None, :, :], axis=2)
+        first, second = np.nonzero(np.triu(overlaps, k=1))
+        return [(crns[a], crns[b]) for a, b in zip(first.tolist(), second.tolist())]
@@ -0,0 +1,66 @@
+"""
+An in-memory view of every ClassSchedule row, indexed both ways.
+
+The roster is loaded once at startup and then kept in sync write-through by the schedule commands,
+so "who else is in my sections" is a few set lookups instead of a table scan.
+"""
+
+from collections import defaultdict
+
+
+class ScheduleRoster:
+    """
+    `members`: A dict of {CRN: set of discord IDs}
+    `schedules`: A dict of {discord ID: set of CRNs}
+    """
+
+    def __init__(self):
+        self.members = defaultdict(set)
+        self.schedules = defaultdict(set)
+        self.loaded = False
+
+    def load(self, rows):
+        """
+        Replace the roster with a fresh copy of the table.
+        :param rows: An iterable of (discord_id, crn) tuples
+        """
+        members = defaultdict(set)
+        schedules = defaultdict(set)
+        for discord_id, crn in rows:
+            members[crn].add(discord_id)
+            schedules[discord_id].add(crn)
+        self.members, self.schedules = members, schedules
+        self.loaded = True
+
+    def add(self, discord_id, crn):
+        self.members[crn].add(discord_id)
+        self.schedules[discord_id].add(crn)
+
+    def remove(self, discord_id, crn):
+        self.schedules.get(discord_id, set()).discard(crn)
+        members = self.members.get(crn)
+        if members is not None:
+            members.discard(discord_id)
+            if not members:
+                del self.members[crn]
+
+    def clear(self, discord_id):
+        for crn in self.schedules.pop(discord_id, set()):
+            self.remove(discord_id, crn)
+
+    def classmates(self, discord_id, candidates=None):
+        """
+        Find who shares sections with a user.
+        :param discord_id: The user to look up
+        :param candidates: If given, only count these discord IDs (e.g. the members of a server)
+
+        :return: A dict of {CRN: set of discord IDs} for every section of the user with at least one classmate
+        """
+        shared = {}
+        for crn in self.schedules.get(discord_id, ()):
+            others = self.members.get(crn, set()) - {discord_id}
+            if candidates is not None:
+                others &= candidates
+            if others:
+                shared[crn] = others
+        return shared
@@ -0,0 +1,91 @@
+"""
+Fan-out of "a seat opened up" DMs.
+
+Refreshes can open many watched sections at once, each watched by many people. The dispatcher collects
+openings per CRN (a CRN that opens again before its alerts go out is merged, not queued twice), groups them
+into one DM per user, and sends those DMs at a fixed rate so a popular section doesn't get the bot throttled.
+Once a DM is delivered (or can never be, e.g. closed DMs) `on_sent` is called so the caller can drop the watches.
+"""
+
+import asyncio
+from collections import OrderedDict
+
+import discord
+
+from core.logging_module import get_log
+
+_log = get_log(__name__)
+
+
+class SeatAlertDispatcher:
+    def __init__(self, bot, per_second=1.0, on_sent=None):
+        """
+        :param bot: The bot to send DMs with
+        :param per_second: How many DMs to send per second at most
+        :param on_sent: Optional coroutine function called with (discord_id, CRNs) once a user's alert is done with
+        """
+        self.bot = bot
+        self.on_sent = on_sent
+        self.interval = 1 / per_second
+        self._pending = OrderedDict()
+        self._wake = asyncio.Event()
+        self._task = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    @property
+    def pending(self):
+        return sum(len(discord_ids) for _, discord_ids in self._pending.values())
+
+    def notify(self, crn, message, discord_ids):
+        """
+        Queue a seat alert for a section.
+        :param crn: The section that opened
+        :param message: The line to send about it, replaces any queued line for the same CRN
+        :param discord_ids: Who to tell
+        """
+        _, queued = self._pending.pop(crn, (None, set()))
+        self._pending[crn] = (message, queued | set(discord_ids))
+        self._wake.set()
+
+    def _drain(self):
+        """Take every queued alert, grouped into one list of (CRN, line) per user."""
+        batches = {}
+        while self._pending:
+            crn, (message, discord_ids) = self._pending.popitem(last=False)
+            for discord_id in discord_ids:
+                batches.setdefault(discord_id, []).append((crn, message))
+        return batches
+
+    async def _run(self):
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+            for discord_id, alerts in self._drain().items():
+                try:
+                    await self._send(discord_id, [message for _, message in alerts])
+                    if self.on_sent is not None:
+                        await self.on_sent(discord_id, [crn for crn, _ in alerts])
+                except Exception as e:
+                    # One bad alert mustn't stop the rest. Its watches are kept, so the next opening alerts again.
+                    _log.exception(f"Failed to deliver a seat alert to {discord_id}: {e}")
+                await asyncio.sleep(self.interval)
+
+    async def _send(self, discord_id, lines):
+        """Send one user their alerts. Raises on failures that might work later."""
+        message = "🔔 **Seats opened up!**\n" + "\n".join(lines)
+        if len(message) > 2000:
+            message = message[:1997] + "..."
+        try:
+            user = self.bot.get_user(discord_id) or await self.bot.fetch_user(discord_id)
+            await user.send(message)
+        except (discord.Forbidden, discord.NotFound) as e:
+            # Closed DMs and deleted accounts, nothing to retry.
+            _log.info(f"Unable to send a seat alert to {discord_id}: {e}")
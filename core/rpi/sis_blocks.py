@@ -0,0 +1,92 @@
+"""
+An incremental parser for the SIS class schedule page (zsYYYYMM.htm).
+
+The page is one large table where a section's first <tr align=LEFT> row starts with its CRN and the rows
+after it with an empty first cell are its other blocks (labs, tests, ...). SISBlockParser is fed the page
+a chunk at a time as it downloads and keeps only the row it's currently reading, so the multi-megabyte
+page is never held in memory or turned into a tree.
+"""
+
+from html.parser import HTMLParser
+
+
+class SISBlockParser(HTMLParser):
+    """
+    `blocks`: A dict of {CRN: list of rows} built so far, each row being the list of its cell texts
+    """
+
+    def __init__(self, on_block=None):
+        """
+        :param on_block: Called with (crn, row) for every block as soon as its row is complete
+        """
+        super().__init__()
+        self.on_block = on_block
+        self.blocks = {}
+        self._current = None
+        self._row = None
+        self._cell = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "tr":
+            # SIS leaves some rows unclosed, a new row ends the previous one.
+            self._end_row()
+            if (dict(attrs).get("align") or "").upper() == "LEFT":
+                self._row = []
+        elif tag == "td" and self._row is not None:
+            self._end_cell()
+            self._cell = []
+
+    def handle_endtag(self, tag):
+        if tag == "td":
+            self._end_cell()
+        elif tag in ("tr", "table"):
+            self._end_row()
+
+    def handle_data(self, data):
+        if self._cell is not None:
+            self._cell.append(data)
+
+    def close(self):
+        super().close()
+        self._end_row()
+
+    def _end_cell(self):
+        if self._cell is not None:
+            self._row.append("".join(self._cell).strip())
+            self._cell = None
+
+    def _end_row(self):
+        if self._row is None:
+            return
+        self._end_cell()
+        columns, self._row = self._row, None
+        if len(columns) == 0:
+            return
+
+        if columns[0] == "":
+            if self._current is None:
+                return
+            crn = self._current
+        else:
+            crn = columns[0].split()[0]
+            if not crn.isdigit():
+                # A note or header row ends the previous section.
+                self._current = None
+                return
+            self._current = crn
+        self.blocks.setdefault(crn, []).append(columns)
+        if self.on_block is not None:
+            self.on_block(crn, columns)
+
+
+def parse_blocks(html_content):
+    """
+    Parse a whole SIS schedule page at once.
+    :param html_content: The page's HTML
+
+    :return: A dict of {CRN: list of rows}
+    """
+    parser = SISBlockParser()
+    parser.feed(html_content)
+    parser.close()
+    return parser.blocks
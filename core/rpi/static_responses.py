@@ -0,0 +1,75 @@
+"""
+Responses of the informational QuACS commands that only depend on the loaded course data.
+
+They're rendered once per data version in CourseData.derive() and sent as is.
+"""
+
+import time
+from datetime import datetime
+from typing import NamedTuple
+
+MESSAGE_LIMIT = 2000
+
+
+class StaticResponses(NamedTuple):
+    departments: list
+    registration_dates: str
+
+
+def split_message(text, limit=MESSAGE_LIMIT):
+    """
+    Split text on line boundaries into messages of at most limit characters.
+    Lines longer than limit on their own are hard wrapped.
+
+    :return: A list of strings
+    """
+    messages = []
+    current = ""
+    for line in text.splitlines(keepends=True):
+        while len(line) > limit:
+            if current:
+                messages.append(current)
+                current = ""
+            messages.append(line[:limit])
+            line = line[limit:]
+        if len(current) + len(line) > limit:
+            messages.append(current)
+            current = ""
+        current += line
+    if current.strip():
+        messages.append(current)
+    return messages
+
+
+def departments_messages(school_data):
+    dept_message = "**Departments and Codes:**\n"
+    for school in school_data or []:
+        dept_message += f"\n**{school['name']}**\n"
+        for dept in school['depts']:
+            dept_message += f"{dept['code']}: {dept['name']}\n"
+    return split_message(dept_message)
+
+
+def registration_dates_message(registration_data):
+    if not registration_data:
+        return "Registration dates aren't available for this term."
+    open_date = registration_data['registration_opens']
+    close_date = registration_data['registration_closes']
+    s_unix_timestamp = int(time.mktime(datetime.strptime(open_date, '%Y-%m-%d').timetuple()))
+    e_unix_timestamp = int(time.mktime(datetime.strptime(close_date, '%Y-%m-%d').timetuple()))
+    return (
+        f"**Registration Dates:**\nOpens: {open_date} | <t:{s_unix_timestamp}:R>\n"
+        f"Closes: {close_date} | <t:{e_unix_timestamp}:R>"
+    )
+
+
+def build_static_responses(data):
+    """
+    :param data: A dict keyed like CourseData.FILES holding the decoded JSON files
+
+    :return: A StaticResponses
+    """
+    return StaticResponses(
+        departments=departments_messages(data['schools']),
+        registration_dates=registration_dates_message(data['registration_dates']),
+    )
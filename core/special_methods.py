@@ -3,7 +3,7 @@ This module provides special methods for a Discord bot, including command analyt
 and database initialization.
 
 Functions:
-    before_invoke_(ctx: commands.Context): Logs command usage and sets user context in Sentry.
+    before_invoke_(ctx: commands.Context): Buffers command analytics and sets user context in Sentry.
     on_ready_(bot): Executes tasks when the bot is ready, including database checks and logging.
     on_command_(bot, ctx: commands.Context): Handles command usage, enforcing slash commands if necessary.
     main_mode_check_(ctx: commands.Context) -> bool: Checks various conditions to determine if a command can be executed.
@@ -12,7 +12,6 @@ Functions:
 
 from __future__ import annotations
 
-import collections
 import os
 import subprocess
 from datetime import datetime
@@ -21,7 +20,7 @@ import discord
 import sentry_sdk
 from discord.ext import commands
 
-from core import database
+from core import async_db, database, migrations
 from core.common import (
     ConsoleColors,
 )
@@ -31,13 +30,9 @@ _log = get_log(__name__)
 
 
 async def before_invoke_(ctx: commands.Context):
-    q = database.CommandAnalytics.create(
-        command=ctx.command.name,
-        user=ctx.author.id,
-        date=datetime.now(),
-        command_type="regular",
-        guild_id=ctx.guild.id,
-    ).save()
+    ctx.bot.analytics.record(
+        ctx.command.name, ctx.author.id, ctx.guild.id if ctx.guild else 0, "regular"
+    )
 
     sentry_sdk.set_user(None)
     sentry_sdk.set_user({"id": ctx.author.id, "username": ctx.author.name})
@@ -73,17 +68,17 @@ async def before_invoke_(ctx: commands.Context):
 async def on_ready_(bot):
     
     now = datetime.now()
-    query: database.CheckInformation = (
+    query: database.CheckInformation = await async_db.run(
         database.CheckInformation.select()
         .where(database.CheckInformation.id == 1)
-        .get()
+        .get
     )
 
     if not query.persistent_change:
         # bot.add_view(ViewClass(bot))
 
         query.persistent_change = True
-        query.save()
+        await async_db.run(query.save)
 
     if not os.getenv("USEREAL"):
         IP = os.getenv("DATABASE_IP")
@@ -145,23 +140,26 @@ async def on_command_(bot, ctx: commands.Context):
     )
 
 
-async def main_mode_check_(ctx: commands.Context) -> bool:
+def _mode_check_state(user_id: int):
+    """
+    Everything main_mode_check_ needs from the database, fetched in one trip to the database thread pool.
+
+    :return: A (CheckInformation, is owner, is blacklisted) tuple
+    """
     CI_query: database.CheckInformation = database.CheckInformation.select().where(database.CheckInformation.id == 1).get()
+    is_owner = database.Administrators.select().where(
+        database.Administrators.TierLevel == 4,
+        database.Administrators.discordID == user_id
+    ).exists()
+    is_blacklisted = database.Blacklist.select().where(database.Blacklist.discordID == user_id).exists()
+    return CI_query, is_owner, is_blacklisted
 
-    blacklisted_users = []
-    db_blacklist: collections.Iterable = database.Blacklist
-    for p in db_blacklist:
-        blacklisted_users.append(p.discordID)
 
-    admins = []
-    query = database.Administrators.select().where(
-        database.Administrators.TierLevel == 4
-    )
-    for admin in query:
-        admins.append(admin.discordID)
+async def main_mode_check_(ctx: commands.Context) -> bool:
+    CI_query, is_owner, is_blacklisted = await async_db.run(_mode_check_state, ctx.author.id)
 
     # Permit 4 Check
-    if ctx.author.id in admins:
+    if is_owner:
         return True
 
     # Maintenance Check
@@ -179,7 +177,7 @@ async def main_mode_check_(ctx: commands.Context) -> bool:
         return False
 
     # Blacklist Check
-    elif ctx.author.id in blacklisted_users:
+    elif is_blacklisted:
         return False
 
     # DM Check
@@ -195,30 +193,30 @@ def initialize_database(bot):
     """
     Initializes the database, and creates the needed table data if they don't exist.
     """
-    database.db.connect(reuse_if_open=True)
-    CIQ = database.CheckInformation.select().where(database.CheckInformation.id == 1)
-
-    if not CIQ.exists():
-        database.CheckInformation.create(
-            maintenance_mode=False,
-            no_guild=False,
-            else_situation=True,
-            persistent_change=False,
+    migrations.migrate()
+    with database.connection():
+        CIQ = database.CheckInformation.select().where(database.CheckInformation.id == 1)
+
+        if not CIQ.exists():
+            database.CheckInformation.create(
+                maintenance_mode=False,
+                no_guild=False,
+                else_situation=True,
+                persistent_change=False,
+            )
+            _log.info("Created CheckInformation Entry.")
+
+        if len(database.Administrators) == 0:
+            for person in bot.owner_ids:
+                database.Administrators.create(discordID=person, TierLevel=4)
+                _log.info("Created Administrator Entry.")
+
+        query: database.CheckInformation = (
+            database.CheckInformation.select()
+            .where(database.CheckInformation.id == 1)
+            .get()
         )
-        _log.info("Created CheckInformation Entry.")
-
-    if len(database.Administrators) == 0:
-        for person in bot.owner_ids:
-            database.Administrators.create(discordID=person, TierLevel=4)
-            _log.info("Created Administrator Entry.")
-
-    query: database.CheckInformation = (
-        database.CheckInformation.select()
-        .where(database.CheckInformation.id == 1)
-        .get()
-    )
-    query.persistent_change = False
-    query.save()
-    database.db.close()
+        query.persistent_change = False
+        query.save()
 
 
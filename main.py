@@ -22,8 +22,11 @@ from pygit2 import Repository, GIT_DESCRIBE_TAGS
 from sentry_sdk.integrations.flask import FlaskIntegration
 from sentry_sdk.integrations.logging import LoggingIntegration
 
-from core import database
+from core import async_db, database
+from core.checks import is_admin
+from core.command_analytics import CommandAnalyticsBuffer
 from core.common import get_extensions
+from core.http_session import HTTPSessionManager
 from core.logging_module import get_log
 from core.rolecolors import CustomizeView
 from core.rpi.email_verification import EmailVerificationView
@@ -52,8 +55,10 @@ class CharlotteCommandTree(app_commands.CommandTree):
         self.bot = bot
 
     async def interaction_check(self, interaction: discord.Interaction, /) -> bool:
-        blacklisted_users = [p.discordID for p in database.Blacklist]
-        if interaction.user.id in blacklisted_users:
+        blacklisted = await async_db.exists(
+            database.Blacklist.select().where(database.Blacklist.discordID == interaction.user.id)
+        )
+        if blacklisted:
             await interaction.response.send_message(
                 "You have been blacklisted from using commands!", ephemeral=True
             )
@@ -80,20 +85,40 @@ class Charlotte(commands.Bot):
         self.before_invoke(self.analytics_before_invoke)
         self.add_check(self.check)
         self._start_time = uptime
+        # Pooled HTTP client shared by every cog for outbound requests.
+        self.http_session = HTTPSessionManager()
+        # Command usage is written to CommandAnalytics in batches, see core.command_analytics.
+        self.analytics = CommandAnalyticsBuffer()
 
     async def on_ready(self):
         await on_ready_(self)
 
+    async def close(self):
+        await super().close()
+        await self.analytics.close()
+        await self.http_session.close()
+
     async def on_command(self, ctx: commands.Context):
         await on_command_(self, ctx)
 
     async def analytics_before_invoke(self, ctx: commands.Context):
         await before_invoke_(ctx)
 
+    async def on_app_command_completion(
+        self, interaction: discord.Interaction, command: app_commands.Command | app_commands.ContextMenu
+    ):
+        self.analytics.record(
+            command.qualified_name,
+            interaction.user.id,
+            interaction.guild_id,
+            "context_menu" if isinstance(command, app_commands.ContextMenu) else "slash",
+        )
+
     async def check(self, ctx: commands.Context):
         return await main_mode_check_(ctx)
 
     async def setup_hook(self) -> None:
+        self.analytics.start()
         bot.add_view(CustomizeView())
         bot.add_view(DormRoleView())
         bot.add_view(ClassYearRoleView())
@@ -164,14 +189,7 @@ class Charlotte(commands.Bot):
         :param user: discord.User: The user to check.
         :return: bool: True if the user is the owner, False otherwise.
         """
-        admin_ids = []
-        query = database.Administrators.select().where(
-            database.Administrators.TierLevel >= 3
-        )
-        for admin in query:
-            admin_ids.append(admin.discordID)
-
-        if user.id in admin_ids:
+        if await async_db.run(is_admin, user.id, 3):
             return True
 
         return await super().is_owner(user)
@@ -0,0 +1,141 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+@pytest.fixture(scope="session", autouse=True)
+def test_database(tmp_path_factory):
+    """
+    Point every model at a throwaway pooled SQLite database for the whole session, never at the database
+    configured in .env, and create the tables in it the way the bot does on startup.
+    """
+    from playhouse.pool import PooledSqliteDatabase
+
+    from core import database, migrations
+
+    db = PooledSqliteDatabase(
+        str(tmp_path_factory.mktemp("database") / "test.db"), max_connections=8, check_same_thread=False
+    )
+    configured = database.db
+    database.db = db
+    try:
+        with db.bind_ctx(list(database.tables.values()) + [database.SchemaVersion]):
+            migrations.migrate()
+            yield db
+    finally:
+        database.db = configured
+        db.close_all()
+
+
+def make_section(crn, subj, crse, sec, days, time_start, time_end, rem=10, cap=30, title=None):
+    return {
+        "act": cap - rem,
+        "attribute": "",
+        "cap": cap,
+        "credMax": 4,
+        "credMin": 4,
+        "crn": crn,
+        "crse": crse,
+        "rem": rem,
+        "sec": sec,
+        "subj": subj,
+        "timeslots": [
+            {
+                "dateEnd": "12/11",
+                "dateStart": "8/29",
+                "days": days,
+                "instructor": "Staff",
+                "location": "DCC 308",
+                "timeEnd": time_end,
+                "timeStart": time_start,
+            }
+        ],
+        "title": title or f"{subj} {crse}",
+        "xl_rem": 0,
+    }
+
+
+@pytest.fixture
+def quacs_data():
+    """A tiny semester in the same shape as the QuACS JSON files."""
+    courses = [
+        {
+            "code": "CSCI",
+            "name": "Computer Science",
+            "courses": [
+                {
+                    "crse": 1100,
+                    "id": "CSCI-1100",
+                    "subj": "CSCI",
+                    "title": "COMPUTER SCIENCE I",
+                    "sections": [
+                        make_section(10001, "CSCI", 1100, "01", ["M", "R"], 1000, 1150, title="COMPUTER SCIENCE I"),
+                        make_section(10002, "CSCI", 1100, "02", ["T", "F"], 1200, 1350, rem=0, title="COMPUTER SCIENCE I"),
+                    ],
+                },
+                {
+                    "crse": 1200,
+                    "id": "CSCI-1200",
+                    "subj": "CSCI",
+                    "title": "DATA STRUCTURES",
+                    "sections": [
+                        make_section(10003, "CSCI", 1200, "01", ["M", "R"], 1100, 1250, title="DATA STRUCTURES"),
+                    ],
+                },
+            ],
+        },
+        {
+            "code": "MATH",
+            "name": "Mathematics",
+            "courses": [
+                {
+                    "crse": 2010,
+                    "id": "MATH-2010",
+                    "subj": "MATH",
+                    "title": "MULTIVAR CALC & MATRIX ALGEBRA",
+                    "sections": [
+                        make_section(20001, "MATH", 2010, "01", ["M", "R"], 1000, 1150, title="MULTIVAR CALC & MATRIX ALGEBRA"),
+                        make_section(20002, "MATH", 2010, "02", ["T", "F"], 1000, 1150, title="MULTIVAR CALC & MATRIX ALGEBRA"),
+                    ],
+                },
+            ],
+        },
+    ]
+    catalog = {
+        "CSCI-1100": {"subj": "CSCI", "crse": "1100", "name": "Computer Science I", "description": "Intro to programming.", "source": "catalog"},
+        "CSCI-1200": {"subj": "CSCI", "crse": "1200", "name": "Data Structures", "description": "Data structures in C++.", "source": "catalog"},
+        "MATH-2010": {"subj": "MATH", "crse": "2010", "name": "Multivariable Calculus and Matrix Algebra", "description": "Calculus.", "source": "catalog"},
+    }
+    prereqs = {
+        "10003": {
+            "prerequisites": {
+                "type": "and",
+                "nested": [
+                    {"type": "course", "course": "CSCI 1100", "min_grade": "D"},
+                    {
+                        "type": "or",
+                        "nested": [
+                            {"type": "course", "course": "MATH 1010", "min_grade": "D"},
+                            {"type": "course", "course": "MATH 1500", "min_grade": "D"},
+                        ],
+                    },
+                ],
+            },
+            "restrictions": {"classification": {"must_be": ["Undergraduate"]}},
+        },
+        "20001": {"prerequisites": {"type": "course", "course": "MATH 1010", "min_grade": "D"}},
+    }
+    registration = {"registration_opens": "2024-04-08", "registration_closes": "2024-09-06"}
+    schools = [
+        {"name": "Science", "depts": [{"code": "CSCI", "name": "Computer Science"}, {"code": "MATH", "name": "Mathematics"}]},
+    ]
+    return {
+        "catalog": catalog,
+        "courses": courses,
+        "prereqs": prereqs,
+        "registration_dates": registration,
+        "schools": schools,
+    }
@@ -0,0 +1,43 @@
+import threading
+import time
+
+import pytest
+
+from core import async_db, database
+
+
+@pytest.mark.asyncio
+async def test_queries_run_off_the_loop():
+    loop_thread = threading.get_ident()
+    assert await async_db.run(threading.get_ident) != loop_thread
+
+    query = database.Blacklist.select().where(database.Blacklist.discordID == 1234)
+    assert await async_db.fetch(query) == []
+    assert not await async_db.exists(query)
+    assert await async_db.first(query) is None
+
+
+@pytest.mark.asyncio
+async def test_query_timeout():
+    with pytest.raises(async_db.DatabaseTimeout):
+        await async_db.run(time.sleep, 0.5, timeout=0.05)
+
+
+def test_connection_nests_and_returns_to_pool():
+    in_use = len(database.db._in_use)
+    assert database.db.is_closed()
+    with database.connection():
+        with database.connection():
+            database.Blacklist.select().count()
+        assert not database.db.is_closed()
+    assert database.db.is_closed()
+    assert len(database.db._in_use) == in_use
+
+
+@pytest.mark.asyncio
+async def test_pooled_connections_are_shared_between_threads():
+    in_use = len(database.db._in_use)
+    # Every executor thread can pick up a connection another thread returned to the pool.
+    for _ in range(async_db.DB_THREADS * 2):
+        assert await async_db.run(database.Blacklist.select().count) == 0
+    assert len(database.db._in_use) == in_use
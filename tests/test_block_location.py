@@ -0,0 +1,100 @@
+import threading
+
+import pytest
+
+from core.rpi import course_data
+from core.rpi.course_data import BlockLocation
+from core.rpi.sis_blocks import SISBlockParser, parse_blocks
+
+SIS_PAGE = """
+<html><body><table>
+<tr><th>CRN Course-Sec</th><th>Course Title</th></tr>
+<tr align=LEFT><td>10001 CSCI-1100-01</td><td>COMPUTER SCIENCE I</td><td>LEC</td><td>4</td><td>GR</td><td></td><td>M R</td><td>10:00AM</td><td>11:50AM</td><td>DCC 308</td><td>Staff</td></tr>
+<tr align=LEFT><td></td><td></td><td>LAB</td><td></td><td></td><td></td><td>W</td><td>12:00PM</td><td>1:50PM</td><td>SAGE 2211</td><td>Staff</td></tr>
+<tr align=LEFT><td>10003 CSCI-1200-01</td><td>DATA STRUCTURES</td><td>LEC</td><td>4</td><td>GR</td><td></td><td>M R</td><td>11:00AM</td><td>12:50PM</td><td>DCC 318</td><td>Staff</td></tr>
+<tr align=LEFT><td>Note: meets in person</td></tr>
+<tr align=LEFT><td></td><td></td><td>TES</td><td></td><td></td><td></td><td>R</td><td>6:00PM</td><td>7:50PM</td><td>DCC 308</td><td>Staff</td></tr>
+</table></body></html>
+"""
+
+
+def test_parse_blocks():
+    blocks = parse_blocks(SIS_PAGE)
+    assert set(blocks) == {"10001", "10003"}
+    assert [row[2] for row in blocks["10001"]] == ["LEC", "LAB"]
+    assert [row[2] for row in blocks["10003"]] == ["LEC"]
+    assert blocks["10001"][0][:2] == ["10001 CSCI-1100-01", "COMPUTER SCIENCE I"]
+
+
+def test_parser_is_incremental():
+    emitted = []
+    parser = SISBlockParser(on_block=lambda crn, row: emitted.append((crn, row[2])))
+    # Chunk boundaries land inside tags and cells.
+    for i in range(0, len(SIS_PAGE), 7):
+        parser.feed(SIS_PAGE[i:i + 7])
+    parser.close()
+
+    assert parser.blocks == parse_blocks(SIS_PAGE)
+    assert emitted == [("10001", "LEC"), ("10001", "LAB"), ("10003", "LEC")]
+
+
+@pytest.mark.asyncio
+async def test_find_class_type_parses_once():
+    block_location = BlockLocation("202409")
+    fetches = []
+
+    async def fetch_blocks():
+        fetches.append(1)
+        return parse_blocks(SIS_PAGE) if len(fetches) == 1 else None
+
+    block_location.fetch_blocks = fetch_blocks
+    assert [row[2] for row in await block_location.find_class_type("10001")] == ["LEC", "LAB"]
+    assert await block_location.find_class_type("99999") == "CRN not found or no blocks associated."
+    assert len(fetches) == 1
+
+    # A stale page is revalidated, and a 304 keeps the parsed blocks.
+    block_location.fetched_at -= block_location.ttl + 1
+    assert len(await block_location.find_class_type("10003")) == 1
+    assert len(fetches) == 2
+
+
+class StreamedPage:
+    status = 200
+    charset = "latin-1"
+    headers = {"ETag": '"sis"'}
+
+    def __init__(self, body):
+        self.content = self
+        self.body = body
+
+    async def iter_chunked(self, size):
+        for i in range(0, len(self.body), 50):
+            yield self.body[i:i + 50]
+
+    def raise_for_status(self):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+@pytest.mark.asyncio
+async def test_fetch_blocks_parses_off_the_event_loop(monkeypatch):
+    threads = set()
+
+    class RecordingParser(SISBlockParser):
+        def feed(self, data):
+            threads.add(threading.get_ident())
+            super().feed(data)
+
+    class Session:
+        def get(self, url, headers=None):
+            return StreamedPage(SIS_PAGE.encode("latin-1"))
+
+    monkeypatch.setattr(course_data, "SISBlockParser", RecordingParser)
+    blocks = await BlockLocation("202409", http=Session()).fetch_blocks()
+    assert blocks == parse_blocks(SIS_PAGE)
+    assert threads and threading.get_ident() not in threads
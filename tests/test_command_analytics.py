@@ -0,0 +1,93 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from core import async_db, command_analytics, database
+from core.command_analytics import CommandAnalyticsBuffer
+
+
+@pytest.fixture(autouse=True)
+def empty_analytics(test_database):
+    """Start each test from empty analytics tables in the session's scratch database."""
+    assert database.db is test_database and database.CommandAnalytics._meta.database is test_database
+    with database.connection():
+        for model in (database.CommandAnalytics, database.CommandUsageHourly, database.CommandUsageDaily,
+                      database.AnalyticsRollupState):
+            model.delete().execute()
+
+
+def _rows(command):
+    with database.connection():
+        return list(database.CommandAnalytics.select().where(database.CommandAnalytics.command == command))
+
+
+@pytest.mark.asyncio
+async def test_events_are_written_in_batches():
+    buffer = CommandAnalyticsBuffer(batch_size=3, flush_interval=60)
+    buffer.record("analytics-test", 1, 10, "slash")
+    buffer.record("analytics-test", 2, None, "regular")
+    assert len(buffer) == 2
+    assert _rows("analytics-test") == []
+
+    # Filling the batch schedules a flush without waiting on it.
+    buffer.record("analytics-test", 3, 10, "context_menu")
+    await asyncio.sleep(0.1)
+    assert len(buffer) == 0
+    rows = _rows("analytics-test")
+    assert sorted(row.user for row in rows) == [1, 2, 3]
+    assert {row.guild_id for row in rows} == {0, 10}
+
+
+@pytest.mark.asyncio
+async def test_close_flushes_what_is_left():
+    buffer = CommandAnalyticsBuffer(batch_size=100, flush_interval=60)
+    buffer.start()
+    buffer.record("analytics-close", 1, 10, "slash")
+    await buffer.close()
+    assert len(_rows("analytics-close")) == 1
+    assert await buffer.flush() == 0
+
+
+def test_rollup_compact_and_report():
+    now = datetime.now()
+    old = now - timedelta(days=45)
+    events = [
+        {"command": "rollup-a", "user": 1, "date": now, "command_type": "slash", "guild_id": 7},
+        {"command": "rollup-a", "user": 2, "date": now, "command_type": "slash", "guild_id": 7},
+        {"command": "rollup-b", "user": 1, "date": now, "command_type": "regular", "guild_id": 8},
+        {"command": "rollup-a", "user": 1, "date": old, "command_type": "slash", "guild_id": 7},
+    ]
+    with database.connection():
+        database.CommandAnalytics.insert_many(events).execute()
+        command_analytics.rollup(batch_size=2)
+        # Already counted rows are never counted twice.
+        assert command_analytics.rollup() == 0
+
+        assert command_analytics.usage_report(now - timedelta(days=1), guild_id=7) == (2, [("rollup-a", 2)])
+        total, top = command_analytics.usage_report(datetime.min)
+        assert ("rollup-a", 3) in top and ("rollup-b", 1) in top
+
+        assert command_analytics.compact(retention_days=30) >= 1
+        assert not database.CommandAnalytics.select().where(database.CommandAnalytics.date < now - timedelta(days=30)).exists()
+        # The compacted row is still in the daily rollup.
+        assert command_analytics.usage_report(datetime.min, guild_id=7, command="rollup-a") == (3, [("rollup-a", 3)])
+
+
+@pytest.mark.asyncio
+async def test_concurrent_rollups_count_each_row_once():
+    now = datetime.now()
+    events = [
+        {"command": f"rollup-{i % 3}", "user": i, "date": now, "command_type": "slash", "guild_id": 7}
+        for i in range(300)
+    ]
+    with database.connection():
+        database.CommandAnalytics.insert_many(events).execute()
+
+    counted = await asyncio.gather(
+        *[async_db.run(command_analytics.rollup, 25, timeout=None) for _ in range(4)]
+    )
+    assert sum(counted) == 300
+    with database.connection():
+        assert command_analytics.usage_report(now - timedelta(days=1), guild_id=7)[0] == 300
+        assert sum(row.uses for row in database.CommandUsageDaily.select()) == 300
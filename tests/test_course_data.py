@@ -0,0 +1,305 @@
+import copy
+import hashlib
+import json
+
+import aiohttp
+import pytest
+
+from core.rpi.course_data import ACTIVE_TERM, CourseData, CourseDataRegistry, CourseIndex
+from core.rpi.prereqs import compile_expression
+from core.rpi.quacs_cache import SnapshotStore
+
+
+def make_course_data(data):
+    course_data = CourseData()
+    course_data.publish(data)
+    return course_data
+
+
+def test_index_lookups(quacs_data):
+    index = CourseIndex(quacs_data["courses"])
+
+    course, section = index.crn(10003)
+    assert course["id"] == "CSCI-1200"
+    assert section["sec"] == "01"
+    assert index.crn("10003")[0] is course
+    assert index.crn(99999) == (None, None)
+
+    assert index.course("CSCI", 1100)["title"] == "COMPUTER SCIENCE I"
+    assert index.course("CSCI", "1100") is index.course("CSCI", 1100)
+    assert index.course("CSCI", "abc") is None
+    assert [c["crse"] for c in index.by_subject["CSCI"]] == [1100, 1200]
+
+
+def test_course_data_accessors(quacs_data):
+    course_data = make_course_data(quacs_data)
+    assert course_data.is_ready
+
+    course, section = course_data.get_course_by_crn(20002)
+    assert course.id == "MATH-2010"
+    assert section.sec == "02"
+    assert course_data.get_course_by_crn(1) == (None, None)
+
+    assert course_data.get_course("CSCI", 1200).title == "DATA STRUCTURES"
+    assert course_data.get_course("ECON", 1200) is None
+    assert course_data.get_section("CSCI", 1100, 2).crn == 10002
+    assert course_data.get_section("CSCI", 1100, 7) is None
+    assert len(course_data.get_subject_courses("CSCI")) == 2
+
+
+def test_objects_are_memoized_per_version(quacs_data):
+    course_data = make_course_data(quacs_data)
+
+    course, section = course_data.get_course_by_crn(10001)
+    assert course_data.get_course("CSCI", 1100) is course
+    assert course_data.get_course_by_crn(10001)[1] is section
+    assert course_data.get_course_catalog("CSCI", 1100) is course_data.get_course_catalog("CSCI", "1100")
+
+    course_data.publish(quacs_data)
+    assert course_data.get_course("CSCI", 1100) is not course
+
+
+class FakeResponse:
+    def __init__(self, status, body=b"", headers=None):
+        self.status = status
+        self.body = body
+        self.headers = headers or {}
+
+    async def read(self):
+        return self.body
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeSession:
+    """Serves QuACS files from a dict, answering 304 when the ETag matches."""
+
+    def __init__(self, data, fail=False):
+        self.files = {CourseData.urls_for(ACTIVE_TERM)[name]: json.dumps(value).encode() for name, value in data.items()}
+        self.fail = fail
+        self.requests = []
+
+    def get(self, url, headers=None):
+        headers = headers or {}
+        self.requests.append((url, headers))
+        if self.fail:
+            raise aiohttp.ClientConnectionError("GitHub is down")
+        etag = f'"{hashlib.md5(self.files[url]).hexdigest()}"'
+        if headers.get("If-None-Match") == etag:
+            return FakeResponse(304)
+        return FakeResponse(200, self.files[url], {"ETag": etag})
+
+
+@pytest.mark.asyncio
+async def test_load_uses_snapshots(quacs_data, tmp_path):
+    first = CourseData()
+    first.snapshots = SnapshotStore(tmp_path)
+    assert await first.load(FakeSession(quacs_data))
+    assert first.get_course("CSCI", 1100) is not None
+    assert (tmp_path / "courses.json").exists()
+
+    # A restart revalidates instead of re-downloading.
+    session = FakeSession(quacs_data)
+    second = CourseData()
+    second.snapshots = SnapshotStore(tmp_path)
+    assert await second.load(session)
+    assert all("If-None-Match" in headers for _, headers in session.requests)
+    assert second.get_course_by_crn(10003)[0].id == "CSCI-1200"
+
+    # GitHub being unreachable falls back to the last good snapshot.
+    third = CourseData()
+    third.snapshots = SnapshotStore(tmp_path)
+    assert await third.load(FakeSession(quacs_data, fail=True))
+    assert third.get_registration_dates() == ("2024-04-08", "2024-09-06")
+
+
+@pytest.mark.asyncio
+async def test_load_without_snapshot_or_network(tmp_path):
+    course_data = CourseData()
+    course_data.snapshots = SnapshotStore(tmp_path)
+    assert not await course_data.load(FakeSession({name: {} for name in CourseData.FILES}, fail=True))
+    assert not course_data.is_ready
+
+
+@pytest.mark.asyncio
+async def test_refresh_swaps_in_changed_sections(quacs_data, tmp_path):
+    course_data = CourseData()
+    course_data.snapshots = SnapshotStore(tmp_path)
+    assert await course_data.load(FakeSession(quacs_data))
+    old_index = course_data.index
+    version = course_data.version
+
+    # Nothing changed upstream: 304, same index.
+    assert await course_data.refresh(FakeSession(quacs_data)) == []
+    assert course_data.index is old_index
+
+    updated = copy.deepcopy(quacs_data)
+    updated["courses"][0]["courses"][0]["sections"][1]["rem"] = 3
+    changes = await course_data.refresh(FakeSession(updated))
+
+    assert [(c.crn, c.old_rem, c.new_rem) for c in changes] == [(10002, 0, 3)]
+    assert course_data.version > version
+    assert course_data.get_course_by_crn(10002)[1].rem == 3
+    assert course_data.get_course("CSCI", 1100).sections[1].rem == 3
+    # Unchanged courses keep sharing rows with the previous index, which itself is untouched.
+    assert course_data.index.course("MATH", 2010) is old_index.course("MATH", 2010)
+    assert old_index.crn(10002)[1]["rem"] == 0
+
+
+def test_diff_detects_structural_changes(quacs_data):
+    index = CourseIndex(quacs_data["courses"])
+    updated = copy.deepcopy(quacs_data["courses"])
+    del updated[1]["courses"][0]["sections"][1]
+    assert index.diff(updated)[2]
+
+
+@pytest.mark.asyncio
+async def test_structural_refresh_still_reports_seat_changes(quacs_data, tmp_path):
+    from conftest import make_section
+
+    course_data = CourseData()
+    course_data.snapshots = SnapshotStore(tmp_path)
+    assert await course_data.load(FakeSession(quacs_data))
+
+    updated = copy.deepcopy(quacs_data)
+    updated["courses"][0]["courses"][0]["sections"].append(
+        make_section(10009, "CSCI", 1100, "03", ["W"], 1600, 1750, title="COMPUTER SCIENCE I")
+    )
+    updated["courses"][1]["courses"][0]["sections"][0]["rem"] = 0
+    updated["courses"][0]["courses"][0]["sections"][1]["rem"] = 4
+
+    seat_changes, _, structural = course_data.index.diff(updated["courses"])
+    assert structural
+    assert sorted((c.crn, c.new_rem) for c in seat_changes) == [(10002, 4), (20001, 0)]
+
+    changes = await course_data.refresh(FakeSession(updated))
+    assert sorted((c.crn, c.old_rem, c.new_rem) for c in changes) == [(10002, 0, 4), (20001, 10, 0)]
+    assert course_data.get_course_by_crn(10009)[1].sec == "03"
+
+
+@pytest.mark.asyncio
+async def test_refresh_updates_conflicts_and_search(quacs_data, tmp_path):
+    course_data = CourseData()
+    course_data.snapshots = SnapshotStore(tmp_path)
+    assert await course_data.load(FakeSession(quacs_data))
+    old_conflicts, old_search = course_data.conflicts, course_data.search
+    assert course_data.conflicts.conflicts_with(10003, [10002]) == []
+
+    updated = copy.deepcopy(quacs_data)
+    # CSCI-1100 section 02 moves onto CSCI-1200's Monday slot.
+    updated["courses"][0]["courses"][0]["sections"][1]["timeslots"][0]["days"] = ["M"]
+    updated["courses"][0]["courses"][0]["sections"][1]["timeslots"][0]["timeStart"] = 1100
+    updated["courses"][1]["courses"][0]["title"] = "VECTOR CALCULUS"
+    # Without a catalog name, search shows the QuACS title.
+    del course_data.catalog_data["MATH-2010"]
+    await course_data.refresh(FakeSession(updated))
+
+    assert course_data.conflicts.conflicts_with(10003, [10002]) == [10002]
+    assert old_conflicts.conflicts_with(10003, [10002]) == []
+    assert course_data.search.search("vector calculus")[0].title == "VECTOR CALCULUS"
+    assert old_search.search("vector calculus")[0].title == "Multivariable Calculus and Matrix Algebra"
+
+
+@pytest.mark.asyncio
+async def test_registry_loads_terms_on_demand_and_evicts(monkeypatch):
+    started = []
+    monkeypatch.setattr(CourseDataRegistry, "_start_load", lambda self, course_data: started.append(course_data.term))
+    registry = CourseDataRegistry(active_term="202409", max_terms=2, idle_timeout=60)
+
+    active = registry.active
+    assert registry.get() is active
+    assert registry.get("202501").term == "202501"
+    assert started == ["202409", "202501"]
+
+    # Over max_terms: the least recently used non-active term goes, the active term never does.
+    registry.get("202505")
+    assert sorted(registry.terms) == ["202409", "202505"]
+
+    registry._last_used["202505"] -= 120
+    registry.evict()
+    assert registry.terms == ["202409"]
+
+    with pytest.raises(ValueError):
+        registry.get("../../etc")
+
+    # SIS block pages are cached and evicted on their own, without loading the term's course data.
+    loads = len(started)
+    blocks = registry.block_location("202505")
+    assert registry.block_location("202505") is blocks
+    assert registry.terms == ["202409"] and len(started) == loads
+    registry._block_last_used["202505"] -= 120
+    registry.evict()
+    assert registry.block_location("202505") is not blocks
+
+    # peek never registers or loads a term.
+    assert registry.peek("202409") is active
+    assert registry.peek("202609") is None and registry.peek("../../etc") is None
+    assert registry.terms == ["202409"] and "202609" not in started
+
+
+def test_prereqs_are_compiled_once(quacs_data):
+    course_data = make_course_data(quacs_data)
+
+    compiled = course_data.get_compiled_prereqs(10003)
+    assert compiled is course_data.get_compiled_prereqs("10003")
+    assert compiled.text == "CSCI 1100 (min grade: D) and (MATH 1010 (min grade: D) or MATH 1500 (min grade: D))"
+    assert compiled.restrictions_text == "Must be classified as: Undergraduate"
+    assert compiled.summary.endswith("**Restrictions:** Must be classified as: Undergraduate")
+
+    assert course_data.get_compiled_prereqs(20001).restrictions_text == "None"
+    assert course_data.get_compiled_prereqs(10001) is None
+
+
+def test_prereq_expressions_are_normalized():
+    leaf = {"type": "course", "course": "MATH 1010", "min_grade": "D"}
+    tree = compile_expression({
+        "type": "and",
+        "nested": [leaf, {"type": "and", "nested": [leaf, {"type": "course", "course": "PHYS 1100", "min_grade": "C"}]}],
+    })
+    assert tree.render() == "MATH 1010 (min grade: D) and PHYS 1100 (min grade: C)"
+    assert compile_expression({"type": "or", "nested": [leaf]}).render() == "MATH 1010 (min grade: D)"
+    assert compile_expression({}) is None
+
+
+def test_get_courses_by_crns(quacs_data):
+    course_data = make_course_data(quacs_data)
+    resolved = course_data.get_courses_by_crns([10003, 99999, 20001])
+    assert set(resolved) == {10003, 20001}
+    assert resolved[10003][0].id == "CSCI-1200"
+    assert resolved[20001][1] is course_data.get_course_by_crn(20001)[1]
+
+
+class CatalogDownSession(FakeSession):
+    def get(self, url, headers=None):
+        if url.endswith("catalog.json"):
+            raise aiohttp.ClientConnectionError("catalog.json is down")
+        return super().get(url, headers)
+
+
+@pytest.mark.asyncio
+async def test_partial_cold_start(quacs_data, tmp_path):
+    course_data = CourseData()
+    course_data.snapshots = SnapshotStore(tmp_path)
+    assert await course_data.load(CatalogDownSession(quacs_data))
+    assert course_data.is_ready and not course_data.is_complete
+    # Lookups work without the catalog instead of failing on a missing file.
+    assert course_data.get_course_catalog("CSCI", 1100) is None
+    assert course_data.get_course("CSCI", 1100) is not None
+
+    assert await course_data.load(FakeSession(quacs_data))
+    assert course_data.is_complete
+    assert course_data.get_course_catalog("CSCI", 1100) is not None
+
+
+def test_snapshot_metadata_must_match_its_body(tmp_path):
+    store = SnapshotStore(tmp_path)
+    store.write("courses", b"[]", etag='"old"')
+    assert store.conditional_headers("courses") == {"If-None-Match": '"old"'}
+
+    # The body was replaced without its metadata, e.g. a crash between the two writes.
+    (tmp_path / "courses.json").write_bytes(b'[{"code": "CSCI"}]')
+    assert store.conditional_headers("courses") == {}
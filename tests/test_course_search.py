@@ -0,0 +1,25 @@
+from core.rpi.course_search import CourseSearchIndex
+
+
+def test_search_by_id_and_title(quacs_data):
+    search = CourseSearchIndex(quacs_data["courses"], quacs_data["catalog"])
+
+    assert search.match_subjects("cs") == ["CSCI"]
+    assert [entry.id for entry in search.search("csci-12")] == ["CSCI-1200"]
+    assert [entry.id for entry in search.search("CSCI 1")] == ["CSCI-1100", "CSCI-1200"]
+    assert [entry.crse for entry in search.course_numbers("math", "20")] == [2010]
+
+    # Titles match fuzzily, typos included.
+    assert search.search("data struct")[0].id == "CSCI-1200"
+    assert search.search("multivariable calclus")[0].id == "MATH-2010"
+    assert search.search("data struct")[0].label == "CSCI-1200 · Data Structures"
+    assert search.search("zzzzzz") == []
+
+
+def test_search_index_follows_published_data(quacs_data):
+    from core.rpi.course_data import CourseData
+
+    course_data = CourseData()
+    assert course_data.search.search("data") == []
+    course_data.publish(quacs_data)
+    assert course_data.search.search("data structures")[0].id == "CSCI-1200"
@@ -0,0 +1,28 @@
+from peewee import SqliteDatabase
+
+from core import database, migrations
+
+
+def test_build_indexes_on_a_legacy_table(tmp_path, monkeypatch):
+    legacy = SqliteDatabase(str(tmp_path / "legacy.db"))
+    monkeypatch.setattr(database, "db", legacy)
+    with legacy.bind_ctx([database.ClassSchedule]):
+        legacy.execute_sql(
+            "CREATE TABLE classschedule (id INTEGER PRIMARY KEY, discord_id INTEGER NOT NULL, crn INTEGER NOT NULL)"
+        )
+        database.ClassSchedule.insert_many(
+            [(1, 10001), (1, 10001), (1, 10002), (2, 10001), (1, 10001)],
+            fields=[database.ClassSchedule.discord_id, database.ClassSchedule.crn],
+        ).execute()
+
+        migrations.build_indexes({"ClassSchedule": database.ClassSchedule})
+
+        assert {index.name for index in legacy.get_indexes("classschedule")} >= {
+            "classschedule_crn", "classschedule_discord_id_crn"
+        }
+        # The oldest of each duplicate is kept.
+        assert list(database.ClassSchedule.select(database.ClassSchedule.id).order_by(database.ClassSchedule.id).tuples()) == [
+            (1,), (3,), (4,)
+        ]
+        # Running it again finds nothing to do.
+        migrations.build_indexes({"ClassSchedule": database.ClassSchedule})
@@ -0,0 +1,40 @@
+import pytest
+from aiohttp import web
+
+from core.http_session import HTTPSessionManager
+
+
+@pytest.mark.asyncio
+async def test_retries_transient_statuses():
+    calls = []
+
+    async def flaky(request):
+        calls.append(request.method)
+        if len(calls) < 3:
+            return web.Response(status=503)
+        return web.json_response({"ok": True})
+
+    app = web.Application()
+    app.router.add_route("*", "/", flaky)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    url = f"http://127.0.0.1:{runner.addresses[0][1]}/"
+
+    http = HTTPSessionManager(backoff=0)
+    try:
+        async with http.get(url) as response:
+            assert response.status == 200
+            assert await response.json() == {"ok": True}
+        assert calls == ["GET"] * 3
+
+        # POSTs aren't retried unless asked to.
+        calls.clear()
+        async with http.post(url) as response:
+            assert response.status == 503
+        assert calls == ["POST"]
+    finally:
+        await http.close()
+        await runner.cleanup()
+    assert http.closed
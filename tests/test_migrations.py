@@ -0,0 +1,56 @@
+import pytest
+from peewee import SqliteDatabase
+
+from core import database, migrations
+
+MODELS = list(database.tables.values()) + [database.SchemaVersion]
+
+
+class CountingDatabase(SqliteDatabase):
+    queries = 0
+
+    def execute_sql(self, sql, params=None, commit=None):
+        self.queries += 1
+        return super().execute_sql(sql, params)
+
+
+@pytest.fixture
+def scratch_db(tmp_path, monkeypatch):
+    db = CountingDatabase(str(tmp_path / "scratch.db"))
+    monkeypatch.setattr(database, "db", db)
+    with db.bind_ctx(MODELS):
+        yield db
+
+
+def test_fresh_database_then_fast_path(scratch_db):
+    assert migrations.migrate()
+    assert {model._meta.table_name for model in database.tables.values()} <= set(scratch_db.get_tables())
+    recorded = database.SchemaVersion.get()
+    assert recorded.version == migrations.latest_version()
+    assert recorded.fingerprint == migrations.fingerprint(database.tables)
+
+    scratch_db.queries = 0
+    assert not migrations.migrate()
+    assert scratch_db.queries == 1
+
+
+def test_legacy_database_is_migrated(scratch_db):
+    scratch_db.execute_sql("CREATE TABLE seatwatch (id INTEGER PRIMARY KEY, discord_id INTEGER NOT NULL, crn INTEGER NOT NULL)")
+    scratch_db.execute_sql("INSERT INTO seatwatch (discord_id, crn) VALUES (1, 10001)")
+    scratch_db.execute_sql("CREATE TABLE classschedule (id INTEGER PRIMARY KEY, discord_id INTEGER NOT NULL, crn INTEGER NOT NULL)")
+
+    assert migrations.migrate()
+    # Missing columns with a default are added, existing rows get the default.
+    assert "created_at" in {column.name for column in scratch_db.get_columns("seatwatch")}
+    assert database.SeatWatch.get().created_at is not None
+    assert "classschedule_discord_id_crn" in {index.name for index in scratch_db.get_indexes("classschedule")}
+    assert "seatwatch_discord_id_crn" in {index.name for index in scratch_db.get_indexes("seatwatch")}
+    # Predates migrations, so every migration ran and was recorded after the baseline.
+    versions = [row.version for row in database.SchemaVersion.select().order_by(database.SchemaVersion.version)]
+    assert versions == [0] + [pending.version for pending in migrations.MIGRATIONS]
+
+
+def test_model_changes_change_the_fingerprint():
+    before = migrations.fingerprint(database.tables)
+    assert before == migrations.fingerprint(dict(database.tables))
+    assert before != migrations.fingerprint({**database.tables, "SchemaVersion": database.SchemaVersion})
@@ -0,0 +1,26 @@
+import pytest
+
+from core.rpi.quacs_base import CompactCourse, CompactRestriction, Course, Restriction, days_to_mask, mask_to_days
+
+
+def test_compact_models_render_like_plain_models(quacs_data):
+    for subject in quacs_data["courses"]:
+        for course in subject["courses"]:
+            assert str(CompactCourse(**course)) == str(Course(**course))
+
+    restriction = {"classification": {"must_be": ["Undergraduate"]}}
+    assert str(CompactRestriction(**restriction)) == str(Restriction(**restriction))
+
+
+def test_compact_models_are_immutable_and_interned(quacs_data):
+    row = quacs_data["courses"][0]["courses"][0]
+    first, second = CompactCourse(**row), CompactCourse(**row)
+
+    with pytest.raises(AttributeError):
+        first.title = "Something else"
+    with pytest.raises(AttributeError):
+        first.sections[0].timeslots[0].extra = 1
+
+    assert first.sections[0].timeslots[0].instructor is second.sections[1].timeslots[0].instructor
+    assert first.sections[0].timeslots[0].days == ["M", "R"]
+    assert mask_to_days(days_to_mask(["F", "M", "W"])) == ["M", "W", "F"]
@@ -0,0 +1,54 @@
+import pytest
+
+from core.rpi.course_data import CourseData
+from utils.rpicord28.quacs_util import RegistrationCog
+
+
+def test_rendered_responses_are_cached_per_version(quacs_data):
+    cog = RegistrationCog(None)
+    term_data = CourseData()
+    term_data.publish(quacs_data)
+    renders = []
+
+    def render():
+        renders.append(1)
+        return cog._render_crn(term_data, 10003)
+
+    first = cog._rendered(term_data, ("crn_lookup", 10003), render)
+    second = cog._rendered(term_data, ("crn_lookup", 10003), render)
+    assert len(renders) == 1
+    assert first[0] is not second[0]
+    assert first[0].to_dict() == second[0].to_dict()
+    assert first[0].title == "CSCI-1200 (DATA STRUCTURES) Section 01 (10003)"
+
+    # New data means a new version, and a fresh render.
+    term_data.publish(quacs_data)
+    cog._rendered(term_data, ("crn_lookup", 10003), render)
+    assert len(renders) == 2
+    # So does the same term loaded again after an eviction, its versions never repeat the old instance's.
+    term_data = CourseData(term_data.term)
+    term_data.publish(quacs_data)
+    cog._rendered(term_data, ("crn_lookup", 10003), render)
+    assert len(renders) == 3
+
+    assert cog._render_class_info(term_data, "ARTS", 1000, None, "Basic") == "No Course Found"
+    assert [embed.title for embed in cog._render_class_info(term_data, "CSCI", 1100, None, "Sections")] == ["CSCI 1100 | COMPUTER SCIENCE I"]
+
+
+@pytest.mark.asyncio
+async def test_schedule_queries(quacs_data, tmp_path, monkeypatch):
+    from peewee import SqliteDatabase
+
+    from core import database
+
+    scratch = SqliteDatabase(str(tmp_path / "schedules.db"))
+    monkeypatch.setattr(database, "db", scratch)
+    cog = RegistrationCog(None)
+    with scratch.bind_ctx([database.ClassSchedule]):
+        with database.connection():
+            scratch.create_tables([database.ClassSchedule])
+            for discord_id, crn in ((1, 10003), (1, 10001), (2, 10001)):
+                database.ClassSchedule.create(discord_id=discord_id, crn=crn)
+
+        assert await cog._schedule_crns(1, 2, 3) == {1: [10003, 10001], 2: [10001], 3: []}
+    assert scratch.is_closed()
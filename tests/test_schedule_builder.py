@@ -0,0 +1,30 @@
+from core.rpi.course_data import CourseData
+from core.rpi.schedule_builder import SectionGroup, build_for_courses, build_schedules, parse_course_ids
+
+
+def test_build_for_courses(quacs_data):
+    course_data = CourseData()
+    course_data.publish(quacs_data)
+
+    result = build_for_courses(course_data, ["CSCI-1100", "MATH-2010"])
+    combos = sorted(sorted(crn for group in schedule for crn in group.crns) for schedule in result.schedules)
+    assert combos == [[10001, 20002], [10002, 20001], [10002, 20002]]
+    assert result.count == 3 and not result.timed_out
+
+    # 10002 is full, so only MATH-2010's TF section is left around 10001.
+    assert build_for_courses(course_data, ["CSCI-1100", "MATH-2010"], open_only=True).count == 1
+    assert build_for_courses(course_data, ["CSCI-1200", "MATH-2010", "CSCI-1100"]).count == 1
+    assert build_for_courses(course_data, ["CSCI-1100", "ARTS-9999"]).missing == ["ARTS-9999"]
+
+
+def test_build_schedules_merges_and_stops():
+    courses = [[SectionGroup(f"C-{i}", 1 << (2 * j + i % 2), (j,)) for j in range(20)] for i in range(8)]
+    schedules, count, timed_out = build_schedules(courses, limit=5, time_budget=0)
+    assert timed_out and len(schedules) <= 5
+
+    assert build_schedules([[SectionGroup("A", 1, (1,))], [SectionGroup("B", 1, (2,))]]) == ([], 0, False)
+
+
+def test_parse_course_ids():
+    assert parse_course_ids("CSCI 1200, math-2010 CSCI1100, CSCI-1200") == (["CSCI-1200", "MATH-2010", "CSCI-1100"], [])
+    assert parse_course_ids("CSCI-1200, data structures") == (["CSCI-1200"], ["data", "structures"])
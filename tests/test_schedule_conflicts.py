@@ -0,0 +1,29 @@
+from conftest import make_section
+from core.rpi.schedule_conflicts import NUM_WORDS, ConflictMatrix
+
+
+def test_conflicts(quacs_data):
+    conflicts = ConflictMatrix(quacs_data["courses"])
+    assert conflicts.masks.shape == (5, NUM_WORDS)
+
+    assert conflicts.conflicts_with(10001, [10002, 10003, 20001, 20002]) == [10003, 20001]
+    assert conflicts.conflicts_with(10002, [20002]) == []
+    assert conflicts.conflicts_with(99999, [10001]) == []
+    assert conflicts.conflicts_with(10001, [10001, 99999]) == []
+
+    assert conflicts.conflicting_pairs([10001, 10002, 10003, 20002]) == [(10001, 10003)]
+    assert conflicts.conflicting_pairs([10002, 20002]) == []
+
+
+def test_back_to_back_and_tba_sections():
+    sections = [
+        make_section(1, "TEST", 1000, "01", ["W"], 900, 950),
+        make_section(2, "TEST", 1000, "02", ["W"], 950, 1040),
+        make_section(3, "TEST", 1000, "03", ["W"], 945, 1000),
+        make_section(4, "TEST", 1000, "04", [], -1, -1),
+    ]
+    courses = [{"code": "TEST", "courses": [{"crse": 1000, "sections": sections}]}]
+    conflicts = ConflictMatrix(courses)
+
+    assert conflicts.conflicts_with(1, [2, 3, 4]) == [3]
+    assert conflicts.conflicts_with(4, [1, 2, 3]) == []
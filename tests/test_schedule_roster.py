@@ -0,0 +1,18 @@
+from core.rpi.schedule_roster import ScheduleRoster
+
+
+def test_roster_write_through():
+    roster = ScheduleRoster()
+    roster.load([(1, 10001), (1, 10003), (2, 10001), (3, 10003), (3, 20001)])
+
+    assert roster.classmates(1) == {10001: {2}, 10003: {3}}
+    assert roster.classmates(1, candidates={2}) == {10001: {2}}
+
+    roster.add(2, 10003)
+    roster.remove(3, 10003)
+    assert roster.classmates(1) == {10001: {2}, 10003: {2}}
+
+    roster.clear(2)
+    assert roster.classmates(1) == {}
+    assert 10001 in roster.members and 2 not in roster.schedules
+    assert roster.classmates(99) == {}
@@ -0,0 +1,77 @@
+import asyncio
+
+import discord
+import pytest
+
+from core.rpi.seat_alerts import SeatAlertDispatcher
+
+
+class FakeUser:
+    def __init__(self, sent):
+        self.sent = sent
+
+    async def send(self, message):
+        self.sent.append(message)
+
+
+class FakeBot:
+    def __init__(self):
+        self.sent = {}
+
+    def get_user(self, discord_id):
+        return FakeUser(self.sent.setdefault(discord_id, []))
+
+
+@pytest.mark.asyncio
+async def test_alerts_are_deduplicated_and_batched_per_user():
+    bot = FakeBot()
+    dispatcher = SeatAlertDispatcher(bot, per_second=1000)
+
+    dispatcher.notify(10001, "CSCI-1100 Section 01 (10001): 1/30 seats open.", {1, 2})
+    # The same section opening again before the alerts go out replaces its line.
+    dispatcher.notify(10001, "CSCI-1100 Section 01 (10001): 2/30 seats open.", {2, 3})
+    dispatcher.notify(10003, "CSCI-1200 Section 01 (10003): 5/30 seats open.", {1})
+    assert dispatcher.pending == 4
+
+    dispatcher.start()
+    await asyncio.sleep(0.05)
+    dispatcher.stop()
+
+    assert dispatcher.pending == 0
+    assert sorted(bot.sent) == [1, 2, 3]
+    assert len(bot.sent[1]) == 1
+    assert "2/30" in bot.sent[1][0] and "5/30" in bot.sent[1][0]
+    assert "1/30" not in bot.sent[1][0]
+
+
+class FakeResponse:
+    status = 403
+    reason = "Forbidden"
+
+
+class FailingBot(FakeBot):
+    def get_user(self, discord_id):
+        if discord_id == 1:
+            raise RuntimeError("gateway hiccup")
+        if discord_id == 2:
+            raise discord.Forbidden(FakeResponse(), "Cannot send messages to this user")
+        return super().get_user(discord_id)
+
+
+@pytest.mark.asyncio
+async def test_failed_alerts_keep_their_watches_and_do_not_stop_the_rest():
+    bot = FailingBot()
+    done = {}
+
+    async def on_sent(discord_id, crns):
+        done[discord_id] = crns
+
+    dispatcher = SeatAlertDispatcher(bot, per_second=1000, on_sent=on_sent)
+    dispatcher.notify(10001, "CSCI-1100 Section 01 (10001): 1/30 seats open.", {1, 2, 3})
+    dispatcher.start()
+    await asyncio.sleep(0.05)
+    dispatcher.stop()
+
+    assert sorted(bot.sent) == [3]
+    # Delivered and undeliverable alerts are done with, the one that might work later isn't.
+    assert done == {2: [10001], 3: [10001]}
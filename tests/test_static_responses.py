@@ -0,0 +1,23 @@
+from core.rpi.course_data import CourseData
+from core.rpi.static_responses import MESSAGE_LIMIT, departments_messages, split_message
+
+
+def test_split_message_keeps_lines_whole():
+    text = "".join(f"DEPT{i}: Department number {i}\n" for i in range(500))
+    messages = split_message(text)
+    assert len(messages) > 1
+    assert all(len(message) <= MESSAGE_LIMIT for message in messages)
+    assert "".join(messages) == text
+    assert all(message.endswith("\n") for message in messages)
+
+    assert [len(message) for message in split_message("x" * 4500)] == [2000, 2000, 500]
+
+
+def test_responses_are_built_with_the_data(quacs_data):
+    course_data = CourseData()
+    course_data.publish(quacs_data)
+
+    responses = course_data.responses
+    assert responses.departments == departments_messages(quacs_data["schools"])
+    assert responses.departments[0].startswith("**Departments and Codes:**")
+    assert responses.registration_dates.startswith("**Registration Dates:**\nOpens: 2024-04-08 | <t:")
@@ -8,7 +8,7 @@ from discord import app_commands
 from discord.ext import commands
 from dotenv import load_dotenv
 
-from core import database
+from core import async_db, database
 from core.checks import (
     slash_is_bot_admin_4,
     slash_is_bot_admin,
@@ -44,66 +44,22 @@ class CoreBotConfig(commands.Cog):
     @PM.command(description="Lists all permit levels and users.")
     @slash_is_bot_admin()
     async def list(self, interaction: discord.Interaction):
-        adminList = []
-
-        query1 = database.Administrators.select().where(
-            database.Administrators.TierLevel == 1
-        )
-        for admin in query1:
-            user = self.bot.get_user(admin.discordID)
-            if user is None:
-                try:
-                    user = await self.bot.fetch_user(admin.discordID)
-                except:
-                    continue
-            adminList.append(f"`{user.name}` -> `{user.id}`")
-
-        adminLEVEL1 = "\n".join(adminList)
-
-        adminList = []
-        query2 = database.Administrators.select().where(
-            database.Administrators.TierLevel == 2
-        )
-        for admin in query2:
-            user = self.bot.get_user(admin.discordID)
-            if user is None:
-                try:
-                    user = await self.bot.fetch_user(admin.discordID)
-                except:
-                    continue
-            adminList.append(f"`{user.name}` -> `{user.id}`")
-
-        adminLEVEL2 = "\n".join(adminList)
-
-        adminList = []
-        query3 = database.Administrators.select().where(
-            database.Administrators.TierLevel == 3
-        )
-        for admin in query3:
-            user = self.bot.get_user(admin.discordID)
-            if user is None:
-                try:
-                    user = await self.bot.fetch_user(admin.discordID)
-                except:
-                    continue
-            adminList.append(f"`{user.name}` -> `{user.id}`")
-
-        adminLEVEL3 = "\n".join(adminList)
-
-        adminList = []
-        query4 = database.Administrators.select().where(
-            database.Administrators.TierLevel == 4
+        admins = await async_db.fetch(
+            database.Administrators.select(database.Administrators.discordID, database.Administrators.TierLevel)
         )
-        for admin in query4:
+        adminLists = {level: [] for level in (1, 2, 3, 4)}
+        for admin in admins:
+            if admin.TierLevel not in adminLists:
+                continue
             user = self.bot.get_user(admin.discordID)
             if user is None:
                 try:
                     user = await self.bot.fetch_user(admin.discordID)
                 except:
                     continue
-            adminList.append(f"`{user.name}` -> `{user.id}`")
+            adminLists[admin.TierLevel].append(f"`{user.name}` -> `{user.id}`")
 
-        adminLEVEL4 = "\n".join(adminList)
+        adminLEVEL1, adminLEVEL2, adminLEVEL3, adminLEVEL4 = ("\n".join(adminLists[level]) for level in (1, 2, 3, 4))
 
         embed = discord.Embed(
             title="Bot Administrators",
@@ -130,32 +86,22 @@ class CoreBotConfig(commands.Cog):
     )
     @slash_is_bot_admin_4()
     async def remove(self, interaction: discord.Interaction, user: discord.User):
-        database.db.connect(reuse_if_open=True)
-
-        query = database.Administrators.select().where(
-            database.Administrators.discordID == user.id
+        deleted = await async_db.execute(
+            database.Administrators.delete().where(database.Administrators.discordID == user.id)
         )
-        if query.exists():
-            query = query.get()
-
-            query.delete_instance()
-
+        if deleted:
             embed = discord.Embed(
                 title="Successfully Removed User!",
                 description=f"{user.name} has been removed from the database!",
                 color=discord.Color.green(),
             )
-            await interaction.response.send_message(embed=embed)
-
         else:
             embed = discord.Embed(
                 title="Invalid User!",
                 description="Invalid Provided: (No Record Found)",
                 color=discord.Color.red(),
             )
-            await interaction.response.send_message(embed=embed)
-
-        database.db.close()
+        await interaction.response.send_message(embed=embed)
 
     @PM.command(description="Add a user to the Bot Administrators list.")
     @app_commands.describe(
@@ -165,11 +111,7 @@ class CoreBotConfig(commands.Cog):
     async def add(
         self, interaction: discord.Interaction, user: discord.User, level: int
     ):
-        database.db.connect(reuse_if_open=True)
-        q: database.Administrators = database.Administrators.create(
-            discordID=user.id, TierLevel=level
-        )
-        q.save()
+        await async_db.run(database.Administrators.create, discordID=user.id, TierLevel=level)
         embed = discord.Embed(
             title="Successfully Added User!",
             description=f"{user.name} has been added successfully with permit level `{str(level)}`.",
@@ -177,8 +119,6 @@ class CoreBotConfig(commands.Cog):
         )
         await interaction.response.send_message(embed=embed)
 
-        database.db.close()
-
     @staticmethod
     async def _force_restart(interaction: discord.Interaction, host_dir):
         p = subprocess.run(
@@ -6,18 +6,18 @@ from datetime import timedelta
 from typing import TYPE_CHECKING
 
 import discord
-import openai
 import psutil
 from discord import app_commands, FFmpegPCMAudio
 from discord.ext import commands
 from dotenv import load_dotenv
 from gtts import gTTS
 
-from core import database
+from core import async_db, database
 from core.common import (
     Emoji,
     TicTacToe,
 )
+from core.http_session import get_http_session
 from core.logging_module import get_log
 
 if TYPE_CHECKING:
@@ -25,17 +25,17 @@ if TYPE_CHECKING:
 
 _log = get_log(__name__)
 
-openai.api_key = os.getenv("OPENAI_API_KEY")
 load_dotenv()
 
+OPENAI_CHAT_URL = "https://api.openai.com/v1/chat/completions"
+
 
 class MiscCMD(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.__cog_name__ = "General"
         self.bot: commands.Bot = bot
-        self.client = openai.OpenAI(
-            api_key=os.getenv("OPENAPI_KEY"),
-        )
+        self.http = get_http_session(bot)
+        self.openai_key = os.getenv("OPENAPI_KEY") or os.getenv("OPENAI_API_KEY")
         self.interaction = []
 
     @property
@@ -51,8 +51,6 @@ class MiscCMD(commands.Cog):
     @app_commands.command(name="ping", description="Pong!")
     @app_commands.guilds(1216429016760717322, 1161339749487870062)
     async def ping(self, interaction: discord.Interaction):
-        database.db.connect(reuse_if_open=True)
-
         current_time = float(time.time())
         difference = int(round(current_time - float(self.bot.start_time)))
         text = str(timedelta(seconds=difference))
@@ -81,7 +79,6 @@ class MiscCMD(commands.Cog):
         )
 
         await interaction.response.send_message(embed=pingembed)
-        database.db.close()
 
     @app_commands.command(description="Play a game of TicTacToe with someone!")
     @app_commands.describe(user="The user you want to play with.")
@@ -135,25 +132,35 @@ class MiscCMD(commands.Cog):
         # Remove the output file after playing
         os.remove('output.mp3')
 
+    async def chat_completion(self, messages, model="gpt-3.5-turbo-0125"):
+        headers = {"Authorization": f"Bearer {self.openai_key}"}
+        # Not idempotent: a retry after a timeout could be answered (and billed) twice.
+        async with self.http.post(
+                OPENAI_CHAT_URL, json={"model": model, "messages": messages}, headers=headers, retries=0
+        ) as response:
+            response.raise_for_status()
+            data = await response.json()
+        return data["choices"][0]["message"]["content"]
+
     @QC.command(name="me", description="Ask a question")
     @app_commands.describe(question="Information is not guaranteed to be accurate. | be_nice defaulted to false")
     @app_commands.describe(be_nice="If you want the AI to be nice or not. Defaulted to false/no.")
     async def me(self, interaction: discord.Interaction, *, question: str, be_nice: bool = False):
-        database.db.connect(reuse_if_open=True)
-
         messages = []
 
         # Add global context if it exists
-        global_query = database.AIContext.select().where(database.AIContext.global_context == True)
-        if global_query.exists():
-            global_context = global_query.get().context
-            messages.append({"role": "system", "content": global_context})
+        global_context = await async_db.first(
+            database.AIContext.select().where(database.AIContext.global_context == True)
+        )
+        if global_context is not None:
+            messages.append({"role": "system", "content": global_context.context})
 
         # Add user-specific context if it exists
-        user_query = database.AIContext.select().where(database.AIContext.discord_id == interaction.user.id)
-        if user_query.exists():
-            user_context = user_query.get().context
-            messages.append({"role": "system", "content": "Specific Context for this user: " + user_context})
+        user_context = await async_db.first(
+            database.AIContext.select().where(database.AIContext.discord_id == interaction.user.id)
+        )
+        if user_context is not None:
+            messages.append({"role": "system", "content": "Specific Context for this user: " + user_context.context})
 
         # Default context if none found
         if not messages:
@@ -164,91 +171,87 @@ class MiscCMD(commands.Cog):
         messages.append({"role": "user", "content": question})
 
         # Generate the response
-        response = self.client.chat.completions.create(
-            model="gpt-3.5-turbo-0125",
-            messages=messages
-        )
+        await interaction.response.defer(thinking=True)
+        response = await self.chat_completion(messages)
 
-        await interaction.response.send_message(response.choices[0].message.content)
-        database.db.close()
+        await interaction.followup.send(response)
 
     @QC.command(name="config", description="Configure the AI Context")
     @app_commands.describe(context="The context you want to set for the AI.")
     async def config(self, interaction: discord.Interaction, context: str, discord_user: discord.Member = None):
-        q = database.Administrators.select().where(database.Administrators.discordID == interaction.user.id)
-        if q.exists():
-            database.db.connect(reuse_if_open=True)
-            if discord_user is None:
-                query = database.AIContext.select().where(database.AIContext.global_context == True)
-                if query.exists():
-                    query.get().context = context
-                    query.get().save()
-                    await interaction.response.send_message("edited global context")
-                else:
-                    query = database.AIContext.create(context=context, global_context=True)
-                    query.save()
-                    await interaction.response.send_message("set global context")
-            else:
-                query = database.AIContext.select().where(database.AIContext.discord_id == discord_user.id)
-                if query.exists():
-                    query.get().context = context
-                    query.get().save()
-                    await interaction.response.send_message(f"edited context for {discord_user.mention}")
-                else:
-                    query = database.AIContext.create(discord_id=discord_user.id, context=context, global_context=False)
-                    query.save()
-                    await interaction.response.send_message(f"set context for {discord_user.mention}")
-            database.db.close()
+        if not await self._is_administrator(interaction.user.id):
+            return await interaction.response.send_message("who even are you lil bro")
 
+        if discord_user is None:
+            created = await async_db.run(self._set_context, context)
+            await interaction.response.send_message("set global context" if created else "edited global context")
         else:
-            await interaction.response.send_message("who even are you lil bro")
+            created = await async_db.run(self._set_context, context, discord_user.id)
+            await interaction.response.send_message(
+                f"{'set' if created else 'edited'} context for {discord_user.mention}"
+            )
 
     @QC.command(name="get", description="Get the AI Context")
     @app_commands.describe(discord_user="The user you want to get the context for.")
     async def get(self, interaction: discord.Interaction, discord_user: discord.Member = None):
-        database.db.connect(reuse_if_open=True)
-        q = database.Administrators.select().where(database.Administrators.discordID == interaction.user.id)
-        if q.exists():
-            if discord_user is None:
-                query = database.AIContext.select().where(database.AIContext.global_context == True)
-                if query.exists():
-                    context = query.get().context
-                else:
-                    context = "No context set."
-            else:
-                query = database.AIContext.select().where(database.AIContext.discord_id == discord_user.id)
-                if query.exists():
-                    context = query.get().context
-                else:
-                    context = "No context set."
-            database.db.close()
-            await interaction.response.send_message(context)
-        else:
-            await interaction.response.send_message("who even are you lil bro")
+        if not await self._is_administrator(interaction.user.id):
+            return await interaction.response.send_message("who even are you lil bro")
+
+        row = await async_db.first(self._context_query(discord_user.id if discord_user else None))
+        await interaction.response.send_message(row.context if row is not None else "No context set.")
 
     @QC.command(name="delete", description="Delete the AI Context")
     @app_commands.describe(discord_user="The user you want to delete the context for.")
     async def delete(self, interaction: discord.Interaction, discord_user: discord.Member):
-        q = database.Administrators.select().where(database.Administrators.discordID == interaction.user.id)
-        if q.exists():
-            database.db.connect(reuse_if_open=True)
-            if discord_user is None:
-                await interaction.response.send_message("not permitted")
-
-            else:
-                query = database.AIContext.select().where(database.AIContext.discord_id == discord_user.id)
-                if query.exists():
-                    query.get().delete_instance()
-            database.db.close()
-        else:
-            await interaction.response.send_message("who even are you lil bro")
+        if not await self._is_administrator(interaction.user.id):
+            return await interaction.response.send_message("who even are you lil bro")
+        if discord_user is None:
+            return await interaction.response.send_message("not permitted")
+
+        deleted = await async_db.execute(
+            database.AIContext.delete().where(database.AIContext.discord_id == discord_user.id)
+        )
+        await interaction.response.send_message(
+            f"deleted context for {discord_user.mention}" if deleted else "No context set."
+        )
+
+    @staticmethod
+    async def _is_administrator(user_id: int) -> bool:
+        return await async_db.exists(
+            database.Administrators.select().where(database.Administrators.discordID == user_id)
+        )
+
+    @staticmethod
+    def _context_query(discord_id: int = None):
+        """:return: A query for the global AI context, or a user's context if discord_id is given"""
+        if discord_id is None:
+            return database.AIContext.select().where(database.AIContext.global_context == True)
+        return database.AIContext.select().where(database.AIContext.discord_id == discord_id)
+
+    @classmethod
+    def _set_context(cls, context: str, discord_id: int = None) -> bool:
+        """
+        Create or overwrite an AI context. Runs on the database pool.
+        :return: True if a new context was created
+        """
+        with database.db.atomic():
+            row = cls._context_query(discord_id).first()
+            if row is None:
+                if discord_id is None:
+                    database.AIContext.create(context=context, global_context=True)
+                else:
+                    database.AIContext.create(discord_id=discord_id, context=context, global_context=False)
+                return True
+            row.context = context
+            row.save()
+            return False
 
 
     @app_commands.command(name="impersonate", description="do something weird but not by you")
     @app_commands.guilds(1216429016760717322, 1161339749487870062)
     async def impersonate(self, interaction: discord.Interaction, person: discord.Member, message: str):
         q = database.Administrators.select().where(database.Administrators.discordID == interaction.user.id)
-        if q.exists():
+        if await async_db.exists(q):
             webhook = await interaction.channel.create_webhook(name=person.display_name)
             avatar_url = person.display_avatar.url
             msg = await webhook.send(content=message, username=person.display_name, avatar_url=avatar_url)
@@ -261,7 +264,7 @@ class MiscCMD(commands.Cog):
     @app_commands.guilds(1216429016760717322, 1161339749487870062)
     async def say(self, interaction: discord.Interaction, message: str):
         q = database.Administrators.select().where(database.Administrators.discordID == interaction.user.id)
-        if q.exists():
+        if await async_db.exists(q):
             await interaction.response.send_message("Sent!", ephemeral=True)
             await interaction.channel.send(message)
         else:
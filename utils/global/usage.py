@@ -0,0 +1,98 @@
+from datetime import datetime, timedelta
+from typing import Literal
+
+import discord
+from discord import app_commands
+from discord.ext import commands, tasks
+
+from core import async_db
+from core import command_analytics
+from core.checks import slash_is_bot_admin
+from core.logging_module import get_log
+
+_log = get_log(__name__)
+
+WINDOWS = {
+    "day": timedelta(days=1),
+    "week": timedelta(days=7),
+    "month": timedelta(days=30),
+}
+
+
+class UsageCog(commands.Cog):
+    """Keeps the CommandAnalytics rollups current and reports on them."""
+
+    def __init__(self, bot: commands.Bot):
+        self.__cog_name__ = "Usage"
+        self.bot = bot
+
+    @property
+    def display_emoji(self) -> str:
+        return "📊"
+
+    UG = app_commands.Group(
+        name="usage",
+        description="Command usage statistics.",
+        guild_ids=[1216429016760717322, 1161339749487870062]
+    )
+
+    async def cog_load(self):
+        self.analytics_maintenance.start()
+
+    async def cog_unload(self):
+        self.analytics_maintenance.cancel()
+
+    @tasks.loop(minutes=10)
+    async def analytics_maintenance(self):
+        """Rolls up new CommandAnalytics rows, and once an hour deletes raw rows past the retention window."""
+        try:
+            if self.analytics_maintenance.current_loop % 6 == 0:
+                deleted = await async_db.run(command_analytics.compact, timeout=None)
+                if deleted:
+                    _log.info(f"Compacted {deleted} CommandAnalytics rows into the rollups.")
+            else:
+                await async_db.run(command_analytics.rollup, timeout=None)
+        except Exception as e:
+            _log.exception(f"Failed to roll up command analytics: {e}")
+
+    @UG.command(name="report", description="Most used commands over a time window.")
+    @app_commands.describe(
+        window="How far back to count",
+        command="Only count this command",
+        all_guilds="Count every server instead of just this one",
+    )
+    @slash_is_bot_admin()
+    async def report(
+        self,
+        interaction: discord.Interaction,
+        window: Literal["day", "week", "month", "all"] = "week",
+        command: str = None,
+        all_guilds: bool = False,
+    ):
+        await interaction.response.defer(thinking=True)
+        since = datetime.now() - WINDOWS[window] if window in WINDOWS else datetime.min
+        guild_id = None if all_guilds else (interaction.guild_id or 0)
+
+        # Count whatever came in since the last scheduled rollup, then read the rollups only.
+        await async_db.run(command_analytics.rollup, timeout=None)
+        total, top = await async_db.run(
+            command_analytics.usage_report, since, guild_id=guild_id, command=command, limit=15
+        )
+
+        scope = "all servers" if all_guilds else (interaction.guild.name if interaction.guild else "DMs")
+        embed = discord.Embed(
+            title=f"Command usage: {scope}, {'all time' if window == 'all' else f'past {window}'}",
+            color=discord.Colour.gold(),
+        )
+        if top:
+            width = max(len(name) for name, _ in top)
+            lines = [f"{name.ljust(width)}  {uses}" for name, uses in top]
+            embed.description = f"```\n{chr(10).join(lines)}\n```"
+        else:
+            embed.description = "No commands recorded."
+        embed.set_footer(text=f"{total} uses in total")
+        await interaction.followup.send(embed=embed)
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(UsageCog(bot))
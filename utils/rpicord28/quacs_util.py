@@ -1,72 +1,40 @@
-import time
+import asyncio
+import functools
 import traceback
 from datetime import datetime
 from typing import Literal
 
 import discord
-import requests
 from discord import app_commands
-from discord.ext import commands
+from discord.ext import commands, tasks
 from pytz import timezone
 
-from core import database
-from core.rpi.course_data import CourseData, BlockLocation
-from core.rpi.quacs_base import Prerequisite, Restriction
-
-# URLs to fetch the JSON files from GitHub
-GITHUB_BASE_URL = 'https://raw.githubusercontent.com/quacs/quacs-data/master/semester_data/202409/'
-
-FILE_URLS = {
-    'catalog': GITHUB_BASE_URL + 'catalog.json',
-    'courses': GITHUB_BASE_URL + 'courses.json',
-    'reg_dates': GITHUB_BASE_URL + 'registration_dates.json',
-    'schools': GITHUB_BASE_URL + 'schools.json',
-    'prereqs': GITHUB_BASE_URL + 'prerequisites.json'
-}
-
-def fetch_data(file_urls):
-    data = {}
-    for key, url in file_urls.items():
-        response = requests.get(url)
-        if response.status_code == 200:
-            data[key] = response.json()
-        else:
-            print(f"Failed to fetch {key}: {response.status_code}")
-    return data
-
-def parse_prereqs(prereqs):
-    def recurse(nested):
-        if isinstance(nested, list):
-            return ' and '.join(recurse(item) for item in nested)
-        elif isinstance(nested, dict):
-            if 'nested' in nested:
-                if nested['type'] == 'and':
-                    return ' and '.join(recurse(item) for item in nested['nested'])
-                elif nested['type'] == 'or':
-                    return ' or '.join(recurse(item) for item in nested['nested'])
-            else:
-                course = nested.get('course', 'Unknown Course')
-                grade = nested.get('min_grade', 'Unknown Grade')
-                return f"{course} (min grade: {grade})"
-        elif isinstance(nested, Prerequisite):
-            if isinstance(nested.course, list):
-                nested_str = ' and '.join(str(item) for item in nested.course) if nested.type == 'and' else ' or '.join(str(item) for item in nested.course)
-                return f"({nested_str})"
-            else:
-                return str(nested)
-        elif isinstance(nested, tuple) and isinstance(nested[0], Prerequisite) and isinstance(nested[1], Restriction):
-            prereq_str = str(nested[0])
-            restriction_str = str(nested[1])
-            return f"{prereq_str}\n\n**Restrictions:** {restriction_str}"
-        else:
-            return "Unknown prerequisite format"
-    return recurse(prereqs)
+from core import async_db, database
+from core.cache import LRUCache
+from core.http_session import get_http_session
+from core.logging_module import get_log
+from core.rpi.course_data import CourseDataRegistry
+from core.rpi.schedule_builder import build_for_courses, parse_course_ids
+from core.rpi.schedule_roster import ScheduleRoster
+from core.rpi.seat_alerts import SeatAlertDispatcher
+
+_log = get_log(__name__)
+
+TERM_DESCRIPTION = "The term code, e.g. 202409. Defaults to the current term."
+MAX_BUILD_COURSES = 8
+MAX_SEAT_WATCHES = 10
 
 
 class RegistrationCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.course_data = CourseData()
+        self.http = get_http_session(bot)
+        self.courses = CourseDataRegistry(http=self.http)
+        self.seat_alerts = SeatAlertDispatcher(bot, on_sent=self._drop_seat_watches)
+        # Who is in which section, kept in sync with ClassSchedule by add/remove/clear.
+        self.roster = ScheduleRoster()
+        # Ready-to-send class_info/crn_lookup responses, keyed by term and data version.
+        self.render_cache = LRUCache(maxsize=1024)
         self.ap_credit_mapping = {
             "Art and Design 2-D": {4: "ARTS-2220", 5: "ARTS-2220"},
             "Art and Design 3-D": {4: "ARTS-2210", 5: "ARTS-2210"},
@@ -99,6 +67,132 @@ class RegistrationCog(commands.Cog):
             "Physics 1: Algebra-Based": {4: "PHYS-1100", 5: "PHYS-1100"},
             "Statistics": {4: "MGMT-2100", 5: "MGMT-2100"}
         }
+        # help and ap_credit never change, render them once.
+        self.ap_credit_responses = {
+            (subject, score): f"With a score of {score} in {subject}, you receive credit for {course}."
+            for subject, scores in self.ap_credit_mapping.items()
+            for score, course in scores.items()
+        }
+        self.help_embed = self._help_embed()
+
+    @property
+    def course_data(self):
+        """The course data for the active term."""
+        return self.courses.active
+
+    async def cog_load(self):
+        # Don't hold up setup_hook (and the gateway login) on the QuACS downloads,
+        # the active term loads in the background.
+        self.courses.get()
+        self.course_data_refresh.start()
+        self.seat_alerts.start()
+        self.roster.load(await async_db.fetch(
+            database.ClassSchedule.select(database.ClassSchedule.discord_id, database.ClassSchedule.crn).tuples(),
+            timeout=None
+        ))
+
+    async def cog_unload(self):
+        self.course_data_refresh.cancel()
+        self.seat_alerts.stop()
+        self.courses.close()
+
+    @tasks.loop(minutes=5)
+    async def course_data_refresh(self):
+        """Keeps seat availability current during registration and evicts terms nobody is using."""
+        try:
+            changes = await self.courses.refresh()
+            for term, seat_changes in changes.items():
+                if seat_changes:
+                    _log.info(f"Seat counts changed for {len(seat_changes)} sections in {term}.")
+
+            # Watches are for the active term's sections.
+            opened = [
+                change for change in changes.get(self.courses.active_term, [])
+                if change.old_rem <= 0 < change.new_rem
+            ]
+            if not opened:
+                return
+            watchers = await async_db.run(self._seat_watchers, [change.crn for change in opened])
+        except Exception as e:
+            _log.exception(f"Failed to refresh course data: {e}")
+            return
+
+        for change in opened:
+            if change.crn in watchers:
+                message = f"{self._describe_crn(change.crn)}: {change.new_rem}/{change.new_cap} seats open."
+                self.seat_alerts.notify(change.crn, message, watchers[change.crn])
+
+    @staticmethod
+    def _seat_watchers(crns):
+        """:return: A dict of {CRN: set of discord IDs watching it}"""
+        watchers = {}
+        query = database.SeatWatch.select(database.SeatWatch.crn, database.SeatWatch.discord_id).where(
+            database.SeatWatch.crn.in_(crns)
+        ).tuples()
+        for crn, discord_id in query:
+            watchers.setdefault(crn, set()).add(discord_id)
+        return watchers
+
+    async def _drop_seat_watches(self, discord_id, crns):
+        """Alerts are one-shot, a user's watches are deleted once their alert is delivered."""
+        await async_db.execute(
+            database.SeatWatch.delete().where(
+                database.SeatWatch.discord_id == discord_id, database.SeatWatch.crn.in_(crns)
+            )
+        )
+
+    async def _get_course_data(self, interaction: discord.Interaction, term: str = None):
+        """
+        Gets the course data for a term, telling the user what went wrong if it's invalid or still loading.
+
+        :return: The CourseData if it's ready, otherwise None
+        """
+        try:
+            term_data = self.courses.get(term)
+        except ValueError:
+            message = f"`{term}` isn't a valid term, use a term code like `{self.courses.active_term}`."
+        else:
+            if await term_data.wait_until_ready(timeout=2):
+                return term_data
+            message = f"Course data for {term_data.term} is still loading, try again in a few seconds."
+
+        if interaction.response.is_done():
+            await interaction.followup.send(message, ephemeral=True)
+        else:
+            await interaction.response.send_message(message, ephemeral=True)
+        return None
+
+    async def term_autocomplete(self, interaction: discord.Interaction, current: str):
+        terms = sorted(set(self.courses.terms) | {self.courses.active_term}, reverse=True)
+        return [app_commands.Choice(name=term, value=term) for term in terms if term.startswith(current)][:25]
+
+    def _search_index(self, interaction: discord.Interaction):
+        # Autocomplete has to answer within Discord's 3 seconds, so never wait on a term that's still loading,
+        # and never register one either: only running a command loads a term.
+        term_data = self.courses.peek(getattr(interaction.namespace, "term", None))
+        return term_data.search if term_data is not None and term_data.is_ready else None
+
+    async def course_key_autocomplete(self, interaction: discord.Interaction, current: str):
+        search = self._search_index(interaction)
+        if search is None:
+            return []
+        choices = [app_commands.Choice(name=subj, value=subj) for subj in search.match_subjects(current, limit=5)]
+        choices += [
+            app_commands.Choice(name=entry.label, value=entry.id)
+            for entry in search.search(current, limit=25 - len(choices))
+        ]
+        return choices
+
+    async def course_num_autocomplete(self, interaction: discord.Interaction, current: str):
+        search = self._search_index(interaction)
+        course_key = getattr(interaction.namespace, "course_key", None)
+        if search is None or not course_key:
+            return []
+        subj = course_key.split("-")[0]
+        return [
+            app_commands.Choice(name=f"{entry.crse} · {entry.title}"[:100], value=entry.crse)
+            for entry in search.course_numbers(subj, current)
+        ]
 
     QC = app_commands.Group(
         name="quacs",
@@ -112,6 +206,89 @@ class RegistrationCog(commands.Cog):
         guild_ids=[1216429016760717322, 1161339749487870062]
     )
 
+    async def _schedule_crns(self, *discord_ids):
+        """
+        Fetch the schedules of one or more users in a single query.
+
+        :return: A dict of {discord_id: list of CRNs}, in the order they were added
+        """
+        schedules = {discord_id: [] for discord_id in discord_ids}
+        query = database.ClassSchedule.select(
+            database.ClassSchedule.discord_id, database.ClassSchedule.crn
+        ).where(
+            database.ClassSchedule.discord_id.in_(list(schedules))
+        ).order_by(database.ClassSchedule.id).tuples()
+        for discord_id, crn in await async_db.fetch(query):
+            schedules[discord_id].append(crn)
+        return schedules
+
+    def _describe_schedule(self, crns):
+        """One line per CRN, resolved against the active term in a single pass."""
+        resolved = self.course_data.get_courses_by_crns(crns)
+        classes = []
+        for crn in crns:
+            if crn in resolved:
+                course_data, section_data = resolved[crn]
+                classes.append(f"**{course_data.id}** ({course_data.title}) Section `{section_data.sec}`: {crn}")
+            else:
+                classes.append(str(crn))
+        return classes
+
+    def _describe_crn(self, crn):
+        course_data, section_data = self.course_data.get_course_by_crn(crn)
+        if course_data is None:
+            return str(crn)
+        return f"{course_data.id} Section {section_data.sec} ({crn})"
+
+    @staticmethod
+    def _help_embed():
+        embed = discord.Embed(title="Help - Available Commands", description="List of available commands",
+                              color=0x00ff00)
+        embed.add_field(name="/class_info",
+                        value="Get information about a class.\nUsage: /class_info course_key=<course_key> course_num=<course_num> [section_num=<section_num>] [info_view=<info_view>]",
+                        inline=False)
+        embed.add_field(name="/crn_lookup", value="Get a class by a CRN.\nUsage: /crn_lookup crn=<crn>", inline=False)
+        embed.add_field(name="/reg_dates", value="Get registration dates.\nUsage: /reg_dates", inline=False)
+        embed.add_field(name="/departments", value="List all departments and their codes.\nUsage: /departments",
+                        inline=False)
+        embed.add_field(name="/add", value="Add a class to your schedule.\nUsage: /add crn=<crn>", inline=False)
+        embed.add_field(name="/remove", value="Remove a class from your schedule.\nUsage: /remove crn=<crn>",
+                        inline=False)
+        embed.add_field(name="/list",
+                        value="List all classes you have added to your schedule.\nUsage: /list [quick_paste=<True/False>]",
+                        inline=False)
+        embed.add_field(name="/clear", value="Clear all classes from your schedule.\nUsage: /clear", inline=False)
+        embed.add_field(name="/compare", value="Compare your classes with a friend.\nUsage: /compare user=<user>",
+                        inline=False)
+        embed.add_field(name="/build",
+                        value="Find section combinations that don't conflict.\nUsage: /build courses=<CSCI-1200, MATH-2010> [open_only=<True/False>]",
+                        inline=False)
+        embed.add_field(name="/classmates", value="See who else in the server is in your sections.\nUsage: /classmates",
+                        inline=False)
+        embed.add_field(name="/watch", value="Get a DM when a full section opens up.\nUsage: /watch crn=<crn>",
+                        inline=False)
+        embed.add_field(name="/unwatch", value="Stop watching a section.\nUsage: /unwatch crn=<crn>", inline=False)
+        return embed.to_dict()
+
+    def _rendered(self, term_data, key, render):
+        """
+        Render a response once per course data version.
+        Embeds are cached as dicts and rebuilt on every send since discord.Embed is mutable.
+        :param term_data: The CourseData the response is rendered from
+        :param key: What identifies the response within that data, e.g. ("crn_lookup", crn)
+        :param render: Builds the response, returning a message string or a list of embeds
+
+        :return: The message string or a fresh list of embeds
+        """
+        def build():
+            result = render()
+            return result if isinstance(result, str) else [embed.to_dict() for embed in result]
+
+        payload = self.render_cache.get_or_create((term_data.term, term_data.version) + key, build)
+        if isinstance(payload, str):
+            return payload
+        return [discord.Embed.from_dict(data) for data in payload]
+
     def split_into_chunks(self, sections, chunk_size):
         for i in range(0, len(sections), chunk_size):
             yield sections[i:i + chunk_size]
@@ -151,29 +328,48 @@ class RegistrationCog(commands.Cog):
 
 
     @QC.command(name='class_info', description='Get information about a class')
-    @app_commands.describe(course_num='The course code, e.g., CSCI-1100')
-    async def class_info(self, interaction: discord.Interaction, course_key: str, course_num: int, section_num: int = None, info_view: Literal["Basic", "Sections"]= "Basic"):
+    @app_commands.describe(course_key='The subject code or course, e.g., CSCI or CSCI-1100', course_num='The course number, e.g., 1100', term=TERM_DESCRIPTION)
+    @app_commands.autocomplete(course_key=course_key_autocomplete, course_num=course_num_autocomplete, term=term_autocomplete)
+    async def class_info(self, interaction: discord.Interaction, course_key: str, course_num: int = None, section_num: int = None, info_view: Literal["Basic", "Sections"]= "Basic", term: str = None):
         await interaction.response.defer(thinking=True)
-        course_data = self.course_data.get_course(course_key, course_num)
-        if course_data == None:
+        term_data = await self._get_course_data(interaction, term)
+        if term_data is None:
+            return
+        course_key = course_key.strip().upper()
+        if "-" in course_key:
+            course_key, _, number = course_key.partition("-")
+            course_num = int(number) if number.isdigit() else course_num
+        if course_num is None:
             return await interaction.followup.send("No Course Found")
-        catalog_data = self.course_data.get_course_catalog(course_key, course_num)
+        rendered = self._rendered(
+            term_data, ("class_info", course_key, course_num, section_num, info_view),
+            lambda: self._render_class_info(term_data, course_key, course_num, section_num, info_view)
+        )
+        if isinstance(rendered, str):
+            return await interaction.followup.send(rendered)
+        for embed in rendered:
+            await interaction.followup.send(embed=embed)
+
+    def _render_class_info(self, term_data, course_key, course_num, section_num, info_view):
+        course_data = term_data.get_course(course_key, course_num)
+        if course_data == None:
+            return "No Course Found"
+        catalog_data = term_data.get_course_catalog(course_key, course_num)
 
         if section_num:
-            section = next((sec for sec in course_data.sections if sec.sec == str(section_num).zfill(2)), None)
-            if section:
-                timeslots = "\n".join(str(timeslot) for timeslot in section.timeslots)
-                embed = discord.Embed(title=f"{course_key} {course_num} | {course_data.title}",
-                                      description=catalog_data.description, color=0xde1f1f)
-                embed.add_field(name=f"Section {section.sec}: {section.title} ({section.crn})",
-                                value=f"Seats: {section.rem}/{section.cap}\nCredits: {section.cred_min}")
-                embed.add_field(name="Time Met", value=f"{timeslots}")
-                await interaction.followup.send(embed=embed)
-            else:
-                await interaction.followup.send("Section not found.")
+            section = term_data.get_section(course_key, course_num, section_num)
+            if not section:
+                return "Section not found."
+            timeslots = "\n".join(str(timeslot) for timeslot in section.timeslots)
+            embed = discord.Embed(title=f"{course_key} {course_num} | {course_data.title}",
+                                  description=catalog_data.description if catalog_data else None, color=0xde1f1f)
+            embed.add_field(name=f"Section {section.sec}: {section.title} ({section.crn})",
+                            value=f"Seats: {section.rem}/{section.cap}\nCredits: {section.cred_min}")
+            embed.add_field(name="Time Met", value=f"{timeslots}")
+            return [embed]
         elif info_view == "Basic":
             embed = discord.Embed(title=f"{course_key} {course_num} | {course_data.title}",
-                                  description=catalog_data.description, color=0xde1f1f)
+                                  description=catalog_data.description if catalog_data else None, color=0xde1f1f)
             if course_data.sections[0].cred_min == course_data.sections[0].cred_max:
                 credits = course_data.sections[0].cred_min
             else:
@@ -184,47 +380,53 @@ class RegistrationCog(commands.Cog):
                 if section.rem > 0:
                     class_free = True
 
-            prereqs_raw = self.course_data.get_prereqs(course_data.sections[0].crn)
-            prereqs = parse_prereqs(prereqs_raw) if prereqs_raw else "None"
+            compiled = term_data.get_compiled_prereqs(course_data.sections[0].crn)
+            prereqs = compiled.summary if compiled else "None"
 
             embed.add_field(name="Basic Information",
                             value=f"**Credits:** {credits}\n**Total Sections:** {len(course_data.sections)} sections.\n**Spots Available?:** {class_free}")
             embed.add_field(name="Prerequisites", value=f"{prereqs}")
-            await interaction.followup.send(embed=embed)
+            return [embed]
         else:
-            try:
-                sections = course_data.sections
-                chunks = list(self.split_into_chunks(sections, 25))
-                for i, chunk in enumerate(chunks):
-                    embed = discord.Embed(title=f"{course_key} {course_num} | {course_data.title}",
-                                          description=catalog_data.description if i == 0 else None,
-                                          color=0xde1f1f)
-                    for section in chunk:
-                        timeslots = "\n".join(str(timeslot) for timeslot in section.timeslots)
-                        embed.add_field(name=f"Section {section.sec} ({section.crn}): {section.rem}/{section.cap}",
-                                        value=f"{str(timeslots)}")
-                    await interaction.followup.send(embed=embed)
-            except Exception as e:
-                print(e)
+            embeds = []
+            chunks = list(self.split_into_chunks(course_data.sections, 25))
+            for i, chunk in enumerate(chunks):
+                embed = discord.Embed(title=f"{course_key} {course_num} | {course_data.title}",
+                                      description=catalog_data.description if i == 0 and catalog_data else None,
+                                      color=0xde1f1f)
+                for section in chunk:
+                    timeslots = "\n".join(str(timeslot) for timeslot in section.timeslots)
+                    embed.add_field(name=f"Section {section.sec} ({section.crn}): {section.rem}/{section.cap}",
+                                    value=f"{str(timeslots)}")
+                embeds.append(embed)
+            return embeds
 
     @QC.command(name="crn_lookup", description="Get a class by a CRN")
-    @app_commands.describe(crn="The CRN of the class")
-    async def get_by_crn(self, interaction: discord.Interaction, crn: int):
-        course_data, section_data = self.course_data.get_course_by_crn(crn)
-        if not course_data:
-            await interaction.response.send_message("Invalid CRN")
+    @app_commands.describe(crn="The CRN of the class", term=TERM_DESCRIPTION)
+    @app_commands.autocomplete(term=term_autocomplete)
+    async def get_by_crn(self, interaction: discord.Interaction, crn: int, term: str = None):
+        term_data = await self._get_course_data(interaction, term)
+        if term_data is None:
             return
+        rendered = self._rendered(term_data, ("crn_lookup", crn), lambda: self._render_crn(term_data, crn))
+        if isinstance(rendered, str):
+            return await interaction.response.send_message(rendered)
+        await interaction.response.send_message(embed=rendered[0])
 
-        course_key, course_num = course_data.id.split("-")
-        catalog_data = self.course_data.get_course_catalog(course_key, course_num)
+    def _render_crn(self, term_data, crn):
+        course_data, section_data = term_data.get_course_by_crn(crn)
+        if not course_data:
+            return "Invalid CRN"
 
-        prereqs, restrictions = self.course_data.get_prereqs(crn)
-        prereqs_str = parse_prereqs(prereqs) if prereqs else "None"
-        restrictions_str = str(restrictions) if restrictions else "None"
+        catalog_data = term_data.get_course_catalog(course_data.subj, course_data.crse)
+
+        compiled = term_data.get_compiled_prereqs(crn)
+        prereqs_str = compiled.text if compiled else "None"
+        restrictions_str = compiled.restrictions_text if compiled else "None"
 
         embed = discord.Embed(
             title=f"{course_data.id} ({course_data.title}) Section {section_data.sec} ({crn})",
-            description=catalog_data.description,
+            description=catalog_data.description if catalog_data else None,
             color=0xde1f1f
         )
 
@@ -245,62 +447,55 @@ class RegistrationCog(commands.Cog):
             name="Restrictions",
             value=restrictions_str
         )
-
-        await interaction.response.send_message(embed=embed)
-
+        return [embed]
 
     @QC.command(name='reg_dates', description='Get registration dates')
-    async def reg_dates(self, interaction: discord.Interaction):
-        try:
-            open_date, close_date = self.course_data.get_registration_dates()
-            s_date_obj = datetime.strptime(open_date, '%Y-%m-%d')
-            e_date_obj = datetime.strptime(close_date, '%Y-%m-%d')
-            s_unix_timestamp = int(time.mktime(s_date_obj.timetuple()))
-            e_unix_timestamp = int(time.mktime(e_date_obj.timetuple()))
-            s_discord_timestamp = f"<t:{s_unix_timestamp}:R>"
-            e_discord_timestamp = f"<t:{e_unix_timestamp}:R>"
-
-            await interaction.response.send_message(f"**Registration Dates:**\nOpens: {open_date} | {s_discord_timestamp}\nCloses: {close_date} | {e_discord_timestamp}")
-        except Exception as e:
-            tb = e.__traceback__
-            etype = type(e)
-            exception = traceback.format_exception(etype, e, tb, chain=True)
-            exception_msg = ""
-            for line in exception:
-                print(line)
+    @app_commands.describe(term=TERM_DESCRIPTION)
+    @app_commands.autocomplete(term=term_autocomplete)
+    async def reg_dates(self, interaction: discord.Interaction, term: str = None):
+        term_data = await self._get_course_data(interaction, term)
+        if term_data is None:
+            return
+        await interaction.response.send_message(term_data.responses.registration_dates)
 
     @QC.command(name='departments', description='List all departments and their codes')
-    async def departments(self, interaction: discord.Interaction):
-        try:
-            dept_message = "**Departments and Codes:**\n"
-            school_data = self.course_data.get_schools()
-            for school in school_data:
-                dept_message += f"\n**{school['name']}**\n"
-                for dept in school['depts']:
-                    dept_message += f"{dept['code']}: {dept['name']}\n"
-            await interaction.response.send_message(dept_message)
-        except Exception as e:
-            tb = e.__traceback__
-            etype = type(e)
-            exception = traceback.format_exception(etype, e, tb, chain=True)
-            exception_msg = ""
-            for line in exception:
-                print(line)
+    @app_commands.describe(term=TERM_DESCRIPTION)
+    @app_commands.autocomplete(term=term_autocomplete)
+    async def departments(self, interaction: discord.Interaction, term: str = None):
+        term_data = await self._get_course_data(interaction, term)
+        if term_data is None:
+            return
+        first, *rest = term_data.responses.departments or ["No departments found."]
+        await interaction.response.send_message(first)
+        for message in rest:
+            await interaction.followup.send(message)
 
     @CR.command(name='add', description='Add a class to your schedule')
     @app_commands.describe(crn="The CRN of the class to add. (NOT IN THE FORMAT OF CSCI-1100 and etc)")
     async def add(self, interaction: discord.Interaction, crn: int):
+        if await self._get_course_data(interaction) is None:
+            return
         try:
             course_data, section_data = self.course_data.get_course_by_crn(crn)
             if course_data is not None:
-                database.db.connect(reuse_if_open=True)
-                q: database.ClassSchedule = database.ClassSchedule.create(
-                    discord_id=interaction.user.id, crn=crn
+                existing = (await self._schedule_crns(interaction.user.id))[interaction.user.id]
+                if crn in existing:
+                    return await interaction.response.send_message(
+                        f"{course_data.id} Section {section_data.sec} is already on your schedule.", ephemeral=True
+                    )
+                # (discord_id, crn) is unique, a double submitted add is ignored rather than stored twice.
+                await async_db.execute(
+                    database.ClassSchedule.insert(discord_id=interaction.user.id, crn=crn).on_conflict_ignore()
                 )
-                q.save()
-                database.db.close()
-
-                await interaction.response.send_message(f"Added {course_data.id} ({course_data.title}) Section {section_data.sec} to your schedule!", ephemeral=True)
+                self.roster.add(interaction.user.id, crn)
+
+                message = f"Added {course_data.id} ({course_data.title}) Section {section_data.sec} to your schedule!"
+                conflicts = self.course_data.conflicts.conflicts_with(crn, existing)
+                if conflicts:
+                    message += "\n⚠️ This section overlaps with " + ", ".join(
+                        self._describe_crn(conflict) for conflict in conflicts
+                    ) + "."
+                await interaction.response.send_message(message, ephemeral=True)
             else:
                 await interaction.response.send_message("Invalid CRN", ephemeral=True)
         except Exception as e:
@@ -314,14 +509,12 @@ class RegistrationCog(commands.Cog):
     @CR.command(name='remove', description='Remove a class from your schedule')
     @app_commands.describe(crn="The CRN of the class to remove. (NOT IN THE FORMAT OF CSCI-1100 and etc)")
     async def remove(self, interaction: discord.Interaction, crn: int):
-        database.db.connect(reuse_if_open=True)
-        query = database.ClassSchedule.select().where(
+        deleted = await async_db.execute(database.ClassSchedule.delete().where(
             database.ClassSchedule.discord_id == interaction.user.id,
             database.ClassSchedule.crn == crn
-        )
-        if query.exists():
-            query = query.get()
-            query.delete_instance()
+        ))
+        if deleted:
+            self.roster.remove(interaction.user.id, crn)
 
             course_data, section_data = self.course_data.get_course_by_crn(crn)
             if course_data is not None:
@@ -330,40 +523,27 @@ class RegistrationCog(commands.Cog):
                 await interaction.response.send_message(f"Removed {crn} from your schedule!", ephemeral=True)
         else:
             await interaction.response.send_message("CRN not found in your schedule!", ephemeral=True)
-        database.db.close()
 
     @CR.command(name='list', description='List all classes you have added to your schedule')
     @app_commands.describe(quick_paste="Whether to just comma separate the CRN's to easily copy them.")
     async def list(self, interaction: discord.Interaction, quick_paste: bool = False):
         try:
+            crns = (await self._schedule_crns(interaction.user.id))[interaction.user.id]
+            if not crns:
+                return await interaction.response.send_message("No classes found in your schedule!", ephemeral=True)
             if quick_paste:
-                database.db.connect(reuse_if_open=True)
-                query = database.ClassSchedule.select().where(
-                    database.ClassSchedule.discord_id == interaction.user.id
-                )
-                if query.exists():
-                    crns = [row.crn for row in query]
-                    await interaction.response.send_message("\n".join(str(crn) for crn in crns), ephemeral=True)
-                else:
-                    await interaction.response.send_message("No classes found in your schedule!", ephemeral=True)
-                database.db.close()
-            else:
-                database.db.connect(reuse_if_open=True)
-                query = database.ClassSchedule.select().where(
-                    database.ClassSchedule.discord_id == interaction.user.id
-                )
-                if query.exists():
-                    classes = []
-                    for row in query:
-                        course_data, section_data = self.course_data.get_course_by_crn(row.crn)
-                        if course_data is not None:
-                            classes.append(f"**{course_data.id}** ({course_data.title}) Section `{section_data.sec}`: {row.crn}")
-                        else:
-                            classes.append(str(row.crn))
-                    await interaction.response.send_message("\n".join(classes), ephemeral=True)
-                else:
-                    await interaction.response.send_message("No classes found in your schedule!", ephemeral=True)
-                database.db.close()
+                return await interaction.response.send_message("\n".join(str(crn) for crn in crns), ephemeral=True)
+
+            overlaps = {}
+            for first, second in self.course_data.conflicts.conflicting_pairs(crns):
+                overlaps.setdefault(first, []).append(second)
+                overlaps.setdefault(second, []).append(first)
+            classes = []
+            for crn, line in zip(crns, self._describe_schedule(crns)):
+                if crn in overlaps:
+                    line += f" ⚠️ conflicts with {', '.join(str(other) for other in overlaps[crn])}"
+                classes.append(line)
+            await interaction.response.send_message("\n".join(classes), ephemeral=True)
         except Exception as e:
             tb = e.__traceback__
             etype = type(e)
@@ -374,13 +554,11 @@ class RegistrationCog(commands.Cog):
 
     @CR.command(name='clear', description='Clear all classes from your schedule')
     async def clear(self, interaction: discord.Interaction):
-        database.db.connect(reuse_if_open=True)
-        query = database.ClassSchedule.select().where(
+        deleted = await async_db.execute(database.ClassSchedule.delete().where(
             database.ClassSchedule.discord_id == interaction.user.id
-        )
-        if query.count() > 0:
-            for row in query:
-                row.delete_instance()
+        ))
+        if deleted:
+            self.roster.clear(interaction.user.id)
             await interaction.response.send_message("Cleared all classes from your schedule!", ephemeral=True)
         else:
             await interaction.response.send_message("No classes found in your schedule!", ephemeral=True)
@@ -388,70 +566,141 @@ class RegistrationCog(commands.Cog):
     @CR.command(name='compare', description='Compare your classes with a friend!')
     @app_commands.describe(user="The user to compare classes with")
     async def compare(self, interaction: discord.Interaction, user: discord.Member):
-        database.db.connect(reuse_if_open=True)
-        query = database.ClassSchedule.select().where(
-            database.ClassSchedule.discord_id == interaction.user.id
-        )
-        query2 = database.ClassSchedule.select().where(
-            database.ClassSchedule.discord_id == user.id
-        )
-        if query.exists() and query2.exists():
-            crns = [row.crn for row in query]
-            crns2 = [row.crn for row in query2]
-            common = set(crns).intersection(crns2)
+        schedules = await self._schedule_crns(interaction.user.id, user.id)
+        if schedules[interaction.user.id] and schedules[user.id]:
+            common = sorted(set(schedules[interaction.user.id]).intersection(schedules[user.id]))
             if common:
-                classes = []
-                for crn in common:
-                    course_data, section_data = self.course_data.get_course_by_crn(crn)
-                    if course_data is not None:
-                        classes.append(f"**{course_data.id}** ({course_data.title}) Section `{section_data.sec}`: {crn}")
-                    else:
-                        classes.append(str(crn))
+                classes = self._describe_schedule(common)
                 await interaction.response.send_message(f"Common classes with {user.mention}:\n\n" + "\n".join(classes), ephemeral=True)
             else:
                 await interaction.response.send_message(f"No common classes found with {user.mention}!", ephemeral=True)
         else:
             await interaction.response.send_message("No classes found in your/their schedule!", ephemeral=True)
-        database.db.close()
+
+    @CR.command(name='classmates', description='See who else in this server is in your sections')
+    async def classmates(self, interaction: discord.Interaction):
+        if not self.roster.schedules.get(interaction.user.id):
+            return await interaction.response.send_message("No classes found in your schedule!", ephemeral=True)
+        shared = self.roster.classmates(interaction.user.id)
+        if interaction.guild:
+            # Check only the roster hits against the member cache, never walk the whole server.
+            guild = interaction.guild
+            shared = {
+                crn: here for crn, others in shared.items()
+                if (here := {discord_id for discord_id in others if guild.get_member(discord_id) is not None})
+            }
+        if not shared:
+            return await interaction.response.send_message("Nobody else here has added your sections yet!", ephemeral=True)
+
+        crns = sorted(shared)
+        lines = [
+            f"{line}\n> {' '.join(f'<@{discord_id}>' for discord_id in sorted(shared[crn]))}"
+            for crn, line in zip(crns, self._describe_schedule(crns))
+        ]
+        message = "\n".join(lines)
+        if len(message) > 2000:
+            message = message[:1997] + "..."
+        await interaction.response.send_message(message, ephemeral=True, allowed_mentions=discord.AllowedMentions.none())
+
+    @CR.command(name='watch', description='Get a DM when a full section opens up')
+    @app_commands.describe(crn="The CRN of the full section to watch")
+    async def watch(self, interaction: discord.Interaction, crn: int):
+        if await self._get_course_data(interaction) is None:
+            return
+        course_data, section_data = self.course_data.get_course_by_crn(crn)
+        if course_data is None:
+            return await interaction.response.send_message("Invalid CRN", ephemeral=True)
+        if section_data.rem > 0:
+            return await interaction.response.send_message(f"{self._describe_crn(crn)} already has {section_data.rem} open seats!", ephemeral=True)
+
+        watched = await async_db.fetch(
+            database.SeatWatch.select(database.SeatWatch.crn).where(
+                database.SeatWatch.discord_id == interaction.user.id
+            ).tuples()
+        )
+        if (crn,) in watched:
+            message = f"You're already watching {self._describe_crn(crn)}."
+        elif len(watched) >= MAX_SEAT_WATCHES:
+            message = f"You can watch at most {MAX_SEAT_WATCHES} sections, use /schedule unwatch to make room."
+        else:
+            # (discord_id, crn) is unique, a watch that raced in meanwhile is kept as is.
+            await async_db.execute(
+                database.SeatWatch.insert(discord_id=interaction.user.id, crn=crn).on_conflict_ignore()
+            )
+            message = f"I'll DM you when a seat opens in {self._describe_crn(crn)}. Make sure your DMs are open!"
+        await interaction.response.send_message(message, ephemeral=True)
+
+    @CR.command(name='unwatch', description='Stop watching a section')
+    @app_commands.describe(crn="The CRN of the section to stop watching")
+    async def unwatch(self, interaction: discord.Interaction, crn: int):
+        deleted = await async_db.execute(database.SeatWatch.delete().where(
+            database.SeatWatch.discord_id == interaction.user.id,
+            database.SeatWatch.crn == crn
+        ))
+        if deleted:
+            await interaction.response.send_message(f"Stopped watching {crn}.", ephemeral=True)
+        else:
+            await interaction.response.send_message("You aren't watching that CRN!", ephemeral=True)
+
+    @CR.command(name='build', description='Find section combinations that fit together')
+    @app_commands.describe(courses="The courses to take, e.g. CSCI-1200, MATH 2010", open_only="Only use sections with open seats")
+    async def build(self, interaction: discord.Interaction, courses: str, open_only: bool = False):
+        course_ids, leftover = parse_course_ids(courses)
+        if leftover:
+            return await interaction.response.send_message(
+                f"`{' '.join(leftover)[:100]}` isn't a course, list courses like `CSCI-1200, MATH 2010`.", ephemeral=True
+            )
+        if not course_ids:
+            return await interaction.response.send_message("List some courses, e.g. `CSCI-1200, MATH-2010`.", ephemeral=True)
+        if len(course_ids) > MAX_BUILD_COURSES:
+            return await interaction.response.send_message(f"You can build with at most {MAX_BUILD_COURSES} courses.", ephemeral=True)
+
+        await interaction.response.defer(thinking=True, ephemeral=True)
+        term_data = await self._get_course_data(interaction)
+        if term_data is None:
+            return
+        # The search is CPU bound and bounded by its own time budget, keep it off the event loop.
+        result = await asyncio.get_running_loop().run_in_executor(
+            None, functools.partial(build_for_courses, term_data, course_ids, open_only)
+        )
+        if result.missing:
+            return await interaction.followup.send(f"Couldn't find {', '.join(result.missing)}.")
+        if not result.count:
+            message = "No conflict-free schedules found." if not result.timed_out else "Couldn't find a schedule in time, try fewer courses."
+            return await interaction.followup.send(message)
+
+        total = f"{result.count}+" if result.timed_out else str(result.count)
+        embed = discord.Embed(title=f"{total} conflict-free schedules", color=0xde1f1f)
+        for i, schedule in enumerate(result.schedules[:10], start=1):
+            lines = [
+                f"**{group.course_id}**: {', '.join(str(crn) for crn in group.crns)}"
+                for group in sorted(schedule)
+            ]
+            embed.add_field(name=f"Option {i}", value="\n".join(lines)[:1024], inline=False)
+        if result.count > 10:
+            embed.set_footer(text="Showing the first 10. Sections listed together meet at the same times.")
+        await interaction.followup.send(embed=embed)
 
     @QC.command(name='help', description='Get information about available commands')
     async def help_command(self, interaction: discord.Interaction):
-        embed = discord.Embed(title="Help - Available Commands", description="List of available commands",
-                              color=0x00ff00)
-        embed.add_field(name="/class_info",
-                        value="Get information about a class.\nUsage: /class_info course_key=<course_key> course_num=<course_num> [section_num=<section_num>] [info_view=<info_view>]",
-                        inline=False)
-        embed.add_field(name="/crn_lookup", value="Get a class by a CRN.\nUsage: /crn_lookup crn=<crn>", inline=False)
-        embed.add_field(name="/reg_dates", value="Get registration dates.\nUsage: /reg_dates", inline=False)
-        embed.add_field(name="/departments", value="List all departments and their codes.\nUsage: /departments",
-                        inline=False)
-        embed.add_field(name="/add", value="Add a class to your schedule.\nUsage: /add crn=<crn>", inline=False)
-        embed.add_field(name="/remove", value="Remove a class from your schedule.\nUsage: /remove crn=<crn>",
-                        inline=False)
-        embed.add_field(name="/list",
-                        value="List all classes you have added to your schedule.\nUsage: /list [quick_paste=<True/False>]",
-                        inline=False)
-        embed.add_field(name="/clear", value="Clear all classes from your schedule.\nUsage: /clear", inline=False)
-        embed.add_field(name="/compare", value="Compare your classes with a friend.\nUsage: /compare user=<user>",
-                        inline=False)
-        await interaction.response.send_message(embed=embed)
+        await interaction.response.send_message(embed=discord.Embed.from_dict(self.help_embed))
 
     @QC.command(name='ap_credit', description='Get RPI course credit for an AP subject and score')
     @app_commands.describe(subject='The AP subject', score='The score received')
     async def ap_credit(self, interaction: discord.Interaction, subject: str, score: int):
-        subject = subject.strip()
-        if subject in self.ap_credit_mapping and score in self.ap_credit_mapping[subject]:
-            course = self.ap_credit_mapping[subject][score]
-            await interaction.response.send_message(f"With a score of {score} in {subject}, you receive credit for {course}.", ephemeral=True)
-        else:
-            await interaction.response.send_message("No matching course found for the given subject and score.", ephemeral=True)
+        message = self.ap_credit_responses.get((subject.strip(), score))
+        await interaction.response.send_message(message or "No matching course found for the given subject and score.", ephemeral=True)
 
     @QC.command(name='identify_blocks', description='Get what type of class each block is.')
-    @app_commands.describe(crn="The CRN of the class", view="Choose between desktop and mobile view", private="Whether to send the response privately")
-    async def identify_blocks(self, interaction: discord.Interaction, crn: int, view: Literal["desktop", "mobile"] = "desktop", private: bool = True):
+    @app_commands.describe(crn="The CRN of the class", view="Choose between desktop and mobile view", private="Whether to send the response privately", term=TERM_DESCRIPTION)
+    @app_commands.autocomplete(term=term_autocomplete)
+    async def identify_blocks(self, interaction: discord.Interaction, crn: int, view: Literal["desktop", "mobile"] = "desktop", private: bool = True, term: str = None):
+        try:
+            block_location = self.courses.block_location(term)
+        except ValueError:
+            return await interaction.response.send_message(f"`{term}` isn't a valid term, use a term code like `{self.courses.active_term}`.", ephemeral=True)
         await interaction.response.defer(thinking=True)
 
-        block_location = BlockLocation()
         class_types = await block_location.find_class_type(str(crn))
 
         if isinstance(class_types, list):
@@ -3,7 +3,7 @@ from discord import app_commands
 from discord.components import SelectOption
 from discord.ext import commands
 
-from core import database
+from core import async_db, database
 
 MAJOR_SHORT_NAMES = {
     "Architecture": "Arch",
@@ -70,6 +70,14 @@ def split_majors(majors, chunk_size):
     for i in range(0, len(majors), chunk_size):
         yield majors[i:i + chunk_size]
 
+def take_verification_codes(discord_id):
+    """Fetch and delete a user's pending verification codes, each code can only be tried once."""
+    with database.db.atomic():
+        records = list(database.EmailVerification.select().where(database.EmailVerification.discord_id == discord_id))
+        database.EmailVerification.delete().where(database.EmailVerification.discord_id == discord_id).execute()
+    return records
+
+
 class EmailVerificationCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
@@ -103,20 +111,18 @@ class EmailVerificationCog(commands.Cog):
         class_year = 0
         email = ""
 
-        expected_code = database.EmailVerification.select().where(database.EmailVerification.discord_id == interaction.user.id)
-        if expected_code.exists():
-            for record in expected_code:
-                codes.append(record.verification_code)
-                class_year = record.class_year
-                email = record.email
-                record.delete_instance()
-
-        check = database.FinalizedEmailVerification.select().where(database.FinalizedEmailVerification.email == email)
-        if check.exists():
-            for record in check:
-                if record.discord_id != interaction.user.id:
-                    await interaction.response.send_message("This email has already been used for verification. Please use a different email.", ephemeral=True)
-                    return
+        for record in await async_db.run(take_verification_codes, interaction.user.id):
+            codes.append(record.verification_code)
+            class_year = record.class_year
+            email = record.email
+
+        used_elsewhere = await async_db.exists(database.FinalizedEmailVerification.select().where(
+            database.FinalizedEmailVerification.email == email,
+            database.FinalizedEmailVerification.discord_id != interaction.user.id
+        ))
+        if used_elsewhere:
+            await interaction.response.send_message("This email has already been used for verification. Please use a different email.", ephemeral=True)
+            return
 
         if code in codes:
             await interaction.response.send_message("Verification successful! Please select your major from the dropdown.", ephemeral=True)
@@ -149,9 +155,10 @@ class EmailVerificationCog(commands.Cog):
                 if major == "Other":
                     await interaction.followup.send("Looks like we don't have your major yet.\n> **Please ping an admin to manually add your major!**", ephemeral=True)
 
-                finalized: database.FinalizedEmailVerification = database.FinalizedEmailVerification.create(
-                    discord_id=interaction.user.id, email=email, class_year=class_year)
-                finalized.save()
+                await async_db.run(
+                    database.FinalizedEmailVerification.create,
+                    discord_id=interaction.user.id, email=email, class_year=class_year
+                )
 
         class MajorSelectView(discord.ui.View):
             def __init__(self):